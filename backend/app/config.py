@@ -12,13 +12,77 @@ class Settings(BaseSettings):
     neo4j_user: str = Field("neo4j", description="Neo4j username")
     neo4j_password: str = Field("neo4jpassword", description="Neo4j password")
     neo4j_database: str | None = Field(None, description="Optional database name")
-    request_timeout: float = Field(10.0, description="Neo4j request timeout seconds")
+    request_timeout: float = Field(
+        10.0, description="Transaction timeout seconds of API reads without their own budget"
+    )
+    neo4j_max_connection_pool_size: int = Field(
+        100, description="Connections each Neo4j driver (API and ingestion) may open"
+    )
+    neo4j_connection_acquisition_timeout: float = Field(
+        10.0, description="Seconds a query waits for a free pooled connection"
+    )
+    neo4j_query_timeouts: dict[str, float] = Field(
+        default_factory=dict,
+        description='Per-query timeout overrides in seconds, e.g. {"attack_paths.search": 60}',
+    )
+    neo4j_fetch_size: int = Field(
+        1000, description="Records pulled per round trip when streaming query results"
+    )
+    neo4j_slow_query_seconds: float = Field(
+        1.0, description="Log queries slower than this with their plan; 0 disables"
+    )
+    graph_engine_enabled: bool = Field(
+        True, description="Answer attack path queries from in-memory graph snapshots"
+    )
+    graph_engine_max_edges: int = Field(
+        5_000_000, description="Generations with more edges are searched in Neo4j instead"
+    )
+    risk_damping: float = Field(
+        0.5, description="Weight of each further hop in asset risk scores, below 1"
+    )
+    risk_max_hops: int = Field(6, description="Hops of downstream reach counted in risk scores")
+    choke_points_timeout_seconds: float = Field(
+        120.0, description="Give up a generation's choke-point analysis after this long"
+    )
     enable_api_key: bool = Field(False, description="Require API key header if true")
     api_key: str | None = Field(None, description="Static API key in simple deployments")
     storage_dir: str = Field("storage", description="Base directory for local storage")
     kubeconfig_dir: str = Field(
         "storage/kubeconfigs", description="Directory for uploaded kubeconfigs"
     )
+    k8s_list_page_size: int = Field(
+        500, description="Objects requested per Kubernetes list page"
+    )
+    k8s_collect_workers: int = Field(
+        5, description="Kubernetes listings collected concurrently"
+    )
+    k8s_watch_timeout_seconds: int = Field(
+        5, description="How long incremental runs watch each resource for changes"
+    )
+    k8s_raw_listing: bool = Field(
+        True, description="Parse list responses as raw JSON instead of client models"
+    )
+    k8s_metadata_only_secrets: bool = Field(
+        True, description="List secrets as metadata-only tables without their data"
+    )
+    ingestion_queue_size: int = Field(
+        64, description="Batches buffered between the collect and write stages"
+    )
+    ingestion_writer_workers: int = Field(
+        4, description="Concurrent graph writer workers draining the ingestion queue"
+    )
+    ingestion_deferred_edge_limit: int = Field(
+        50_000, description="Edges awaiting missing endpoints that trigger another retry"
+    )
+    ingestion_batch_target_seconds: float = Field(
+        0.5, description="Write transaction latency graph writer batch sizes aim for"
+    )
+    ingestion_batch_max_bytes: int = Field(
+        4_000_000, description="Upper bound on the encoded size of one write batch"
+    )
+    ingestion_checkpoints: bool = Field(
+        True, description="Save collected batches so failed ingestion jobs can be resumed"
+    )
     ingestion_job_retention_hours: int = Field(
         24, description="How long to retain ingestion job records"
     )
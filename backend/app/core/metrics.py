@@ -0,0 +1,95 @@
+from time import perf_counter
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Process-wide metrics, served in Prometheus text format at /api/system/metrics.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by router and route",
+    ["router", "method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+NEO4J_QUERY_SECONDS = Histogram(
+    "neo4j_query_duration_seconds",
+    "Cypher transaction latency by the repository method that issued it",
+    ["query", "mode"],
+    buckets=LATENCY_BUCKETS,
+)
+NEO4J_QUERY_ERRORS = Counter(
+    "neo4j_query_errors_total",
+    "Failed Cypher transactions by query and error type",
+    ["query", "error"],
+)
+NEO4J_SLOW_QUERIES = Counter(
+    "neo4j_slow_queries_total",
+    "Cypher transactions slower than NEO4J_SLOW_QUERY_SECONDS",
+    ["query"],
+)
+
+INGESTION_ROWS = Counter(
+    "ingestion_rows_total", "Nodes and edges written by graph ingestion", ["kind"]
+)
+INGESTION_BATCHES = Counter(
+    "ingestion_batches_total", "Write batches committed by graph ingestion", ["kind"]
+)
+INGESTION_WRITE_RETRIES = Counter(
+    "ingestion_write_retries_total", "Ingestion writes retried after a transient error"
+)
+INGESTION_WRITE_FAILURES = Counter(
+    "ingestion_write_failures_total", "Ingestion writes that failed for good"
+)
+INGESTION_JOBS = Counter(
+    "ingestion_jobs_total", "Finished ingestion jobs by mode and outcome", ["mode", "status"]
+)
+
+CHOKE_POINT_SECONDS = Histogram(
+    "choke_point_analysis_seconds",
+    "Time to compute one generation's choke points",
+    buckets=LATENCY_BUCKETS + (120, 300),
+)
+
+
+def render() -> tuple[bytes, str]:
+    """Current metrics and their content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class RequestMetricsMiddleware:
+    """Observe each HTTP request into ``HTTP_REQUEST_SECONDS``.
+
+    A plain ASGI middleware rather than ``BaseHTTPMiddleware`` so handlers
+    keep seeing client disconnects. Requests are labelled with the matched
+    route template, never the raw path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            tags = getattr(route, "tags", None)
+            HTTP_REQUEST_SECONDS.labels(
+                tags[0] if tags else "root",
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(perf_counter() - started)
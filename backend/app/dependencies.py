@@ -1,6 +1,20 @@
-from fastapi import Header, HTTPException, status
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, TypeVar
+
+import orjson
+from fastapi import Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 from app.config import get_settings
+from app.core.logger import logger
+
+T = TypeVar("T")
+
+# How often a running query checks whether its HTTP client is still there.
+DISCONNECT_POLL_SECONDS = 0.5
+CLIENT_CLOSED_REQUEST = 499
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 def verify_api_key(x_api_key: str | None = Header(default=None)):
@@ -12,3 +26,63 @@ def verify_api_key(x_api_key: str | None = Header(default=None)):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
         )
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, cancelling it if the HTTP client disconnects first.
+
+    Cancelling a Neo4j call closes its connection, so the server rolls the
+    transaction back instead of finishing a result nobody will read.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client left %s; cancelling its query", request.url.path)
+                raise HTTPException(
+                    status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request"
+                )
+    finally:
+        task.cancel()
+
+
+async def ndjson_response(request: Request, items: AsyncIterator[Any]) -> StreamingResponse:
+    """Stream ``items`` to the client as newline-delimited JSON.
+
+    The first item is awaited before the response starts, so a query that
+    fails up front (bad syntax, timeout) still gets a proper error status.
+    A failure after lines have been sent ends the body with an
+    ``{"error": ...}`` line. Starlette stops iterating when the client
+    disconnects, which closes the underlying query.
+    """
+    iterator = aiter(items)
+    try:
+        first = await cancel_on_disconnect(request, anext(iterator))
+    except StopAsyncIteration:
+        return StreamingResponse(iter(()), media_type=NDJSON_MEDIA_TYPE)
+
+    async def body():
+        yield _ndjson_line(first)
+        try:
+            async for item in iterator:
+                yield _ndjson_line(item)
+        except Exception as exc:  # noqa: BLE001 - headers are already sent
+            logger.warning("Stream for %s failed: %s", request.url.path, exc)
+            yield _ndjson_line({"error": str(exc)})
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _ndjson_line(item: Any) -> bytes:
+    return orjson.dumps(item, default=_json_default) + b"\n"
+
+
+def _json_default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    if hasattr(value, "iso_format"):  # neo4j.time temporal types
+        return value.iso_format()
+    return str(value)
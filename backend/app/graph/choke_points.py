@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import perf_counter
+
+import numpy as np
+
+from app.graph.engine import AttackGraph, frontier_edges
+from app.graph.reachability import HIGH_VALUE_TYPES, reverse_csr
+
+# Nodes and edges kept per generation; requests take the first ones.
+CHOKE_POINT_LIMIT = 100
+
+
+class AnalysisTimeout(Exception):
+    """The analysis ran past its deadline."""
+
+
+@dataclass(frozen=True)
+class ChokePointAnalysis:
+    # Nodes that reach a high-value target, the targets themselves excluded.
+    exposed: int
+    # (node, assets cut off) and (edge position, assets cut off), most first.
+    nodes: list[tuple[int, int]]
+    edges: list[tuple[int, int]]
+    seconds: float
+
+
+def choke_points(
+    graph: AttackGraph, *, limit: int, deadline: float | None = None
+) -> ChokePointAnalysis:
+    """The nodes and edges every attack path of the most assets goes through.
+
+    Every Master/Credential gets an edge to a virtual sink, and the
+    post-dominator tree of that sink is built: ``d`` post-dominates ``v``
+    when every path from ``v`` to any target passes ``d``, so removing ``d``
+    cuts off ``v`` and everything else in its subtree. An edge cuts off
+    its source's subtree when every other edge of the source leads back into
+    that subtree. Paths end at the first target they reach.
+
+    The tree comes from the iterative algorithm of Cooper, Harvey and
+    Kennedy, which converges in a few passes over the edges; ``deadline``
+    (a ``perf_counter`` value) is checked between passes.
+    """
+    started = perf_counter()
+    node_count = graph.node_count
+    sink = node_count
+    targets = graph.select(types=HIGH_VALUE_TYPES)
+
+    # Nodes that reach a target, by breadth-first search backwards from all of them.
+    reverse_indptr, reverse_indices = reverse_csr(graph)
+    useful = targets.copy()
+    frontier = np.flatnonzero(targets)
+    while len(frontier):
+        positions, _ = frontier_edges(reverse_indptr, frontier)
+        predecessors = np.unique(reverse_indices[positions])
+        frontier = predecessors[~useful[predecessors]]
+        useful[frontier] = True
+
+    # Edges that lead on to a target, plus target -> sink, as CSR both ways.
+    sources = graph.edge_sources()
+    kept = (
+        useful[sources]
+        & ~targets[sources]
+        & useful[graph.indices]
+        & (sources != graph.indices)
+    )
+    target_nodes = np.flatnonzero(targets)
+    edge_sources = np.concatenate([sources[kept], target_nodes])
+    edge_targets = np.concatenate([graph.indices[kept], np.full(len(target_nodes), sink)])
+    edge_positions = np.concatenate([np.flatnonzero(kept), np.full(len(target_nodes), -1)])
+    forward = np.argsort(edge_sources, kind="stable")
+    forward_indptr = np.zeros(node_count + 2, dtype=np.int64)
+    np.cumsum(np.bincount(edge_sources, minlength=node_count + 1), out=forward_indptr[1:])
+    backward = np.argsort(edge_targets, kind="stable")
+    backward_indptr = np.zeros(node_count + 2, dtype=np.int64)
+    np.cumsum(np.bincount(edge_targets, minlength=node_count + 1), out=backward_indptr[1:])
+
+    successors = edge_targets[forward].tolist()
+    successor_starts = forward_indptr.tolist()
+    predecessors = edge_sources[backward].tolist()
+    predecessor_starts = backward_indptr.tolist()
+
+    # Postorder of a depth-first search from the sink along reversed edges.
+    number = [-1] * (node_count + 1)
+    postorder: list[int] = []
+    visited = bytearray(node_count + 1)
+    visited[sink] = 1
+    work = [(sink, predecessor_starts[sink])]
+    while work:
+        node, position = work[-1]
+        if position < predecessor_starts[node + 1]:
+            work[-1] = (node, position + 1)
+            child = predecessors[position]
+            if not visited[child]:
+                visited[child] = 1
+                work.append((child, predecessor_starts[child]))
+            continue
+        work.pop()
+        number[node] = len(postorder)
+        postorder.append(node)
+
+    dominator = [-1] * (node_count + 1)
+    dominator[sink] = sink
+    changed = True
+    while changed:
+        if deadline is not None and perf_counter() > deadline:
+            raise AnalysisTimeout()
+        changed = False
+        for node in reversed(postorder[:-1]):
+            new = -1
+            for successor in successors[successor_starts[node] : successor_starts[node + 1]]:
+                if dominator[successor] == -1:
+                    continue
+                if new == -1:
+                    new = successor
+                    continue
+                finger, other = successor, new
+                while finger != other:
+                    while number[finger] < number[other]:
+                        finger = dominator[finger]
+                    while number[other] < number[finger]:
+                        other = dominator[other]
+                new = finger
+            if dominator[node] != new:
+                dominator[node] = new
+                changed = True
+
+    # Subtree sizes and preorder positions; a node's dominator always comes
+    # later in postorder, so one pass each way over it is enough.
+    size = [1] * (node_count + 1)
+    for node in postorder[:-1]:
+        size[dominator[node]] += size[node]
+    first = [0] * (node_count + 1)
+    cursor = [0] * (node_count + 1)
+    cursor[sink] = 1
+    for node in reversed(postorder[:-1]):
+        parent = dominator[node]
+        first[node] = cursor[parent]
+        cursor[parent] += size[node]
+        cursor[node] = first[node] + 1
+    sizes = np.asarray(size, dtype=np.int64)
+    starts = np.asarray(first, dtype=np.int64)
+
+    candidates = useful & ~targets
+    cut_nodes = np.flatnonzero(candidates & (sizes[:node_count] > 1))
+    node_cuts = sizes[cut_nodes] - 1
+    # Edges back into the source's own subtree only lead back to the source,
+    # so an edge cuts the subtree off when it is the source's only edge out of it.
+    tails, heads = edge_sources[forward], edge_targets[forward]
+    leaving = candidates[tails] & (
+        (starts[heads] < starts[tails]) | (starts[heads] >= starts[tails] + sizes[tails])
+    )
+    exits = np.bincount(tails[leaving], minlength=node_count)
+    single = np.flatnonzero(leaving & (exits[tails] == 1))
+    edge_cuts = sizes[tails[single]]
+    cut_edges = edge_positions[forward][single]
+    return ChokePointAnalysis(
+        exposed=int(candidates.sum()),
+        nodes=_top(cut_nodes, node_cuts, limit),
+        edges=_top(cut_edges, edge_cuts, limit),
+        seconds=perf_counter() - started,
+    )
+
+
+def _top(items: np.ndarray, cuts: np.ndarray, limit: int) -> list[tuple[int, int]]:
+    order = np.argsort(-cuts, kind="stable")[:limit]
+    return list(zip(items[order].tolist(), cuts[order].tolist()))
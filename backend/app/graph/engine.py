@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from threading import Event, Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+import numpy as np
+
+from app.models.domain import NodeType
+
+if TYPE_CHECKING:
+    from app.graph.reachability import ReachabilityIndex
+
+# Path scores match the Cypher search: each hop adds the edge's confidence
+# (0.2 when unknown) plus a weight for the criticality of the node it enters.
+DEFAULT_CONFIDENCE = 0.2
+CRITICALITY_WEIGHTS = {"HIGH": 2.0, "MEDIUM": 1.0}
+DEFAULT_CRITICALITY_WEIGHT = 0.5
+
+NODE_TYPES = list(NodeType)
+NODE_TYPE_CODES = {node_type.value: code for code, node_type in enumerate(NODE_TYPES)}
+UNKNOWN_TYPE = -1
+
+# Target filters whose upper-bound tables each graph keeps.
+BOUNDS_CACHE_SIZE = 16
+BOUND_SLACK = 1e-6
+
+
+@dataclass(frozen=True)
+class ScoredPath:
+    score: float
+    nodes: tuple[int, ...]
+    edges: tuple[int, ...]
+
+
+class SearchBudget:
+    """Limits on one search: wall-clock seconds and node expansions.
+
+    Shared by every graph a search covers. ``cancel`` stops the search from
+    another thread; ``exceeded`` then says why it stopped early.
+    """
+
+    def __init__(self, *, seconds: float | None = None, max_expansions: int | None = None):
+        self.deadline = None if seconds is None else perf_counter() + seconds
+        self.max_expansions = max_expansions
+        self.expansions = 0
+        self.exceeded: str | None = None
+        self._cancelled = Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def spend(self) -> bool:
+        """Count one expansion; False once the search has to stop."""
+        if self._cancelled.is_set():
+            self.exceeded = "cancelled"
+        elif self.max_expansions is not None and self.expansions >= self.max_expansions:
+            self.exceeded = "expansions"
+        elif self.deadline is not None and perf_counter() > self.deadline:
+            self.exceeded = "time"
+        else:
+            self.expansions += 1
+        return self.exceeded is None
+
+
+class AttackGraph:
+    """One cluster generation's ``ATTACK_REL`` graph in CSR form.
+
+    Node ``i``'s outgoing edges are positions ``indptr[i]:indptr[i + 1]`` of
+    ``indices`` (target node), ``weight`` (score the hop adds) and
+    ``technique``; ``node_weight`` is the criticality weight of each node.
+    Only what search and scoring need is kept; node and edge properties for
+    the paths returned are read back from Neo4j.
+    """
+
+    def __init__(
+        self,
+        *,
+        gen_key: str,
+        ids: list[str],
+        node_type: np.ndarray,
+        namespace: np.ndarray,
+        namespaces: list[str],
+        node_weight: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weight: np.ndarray,
+        technique: np.ndarray,
+        techniques: list[str],
+    ):
+        self.gen_key = gen_key
+        self.ids = ids
+        self.index = {node_id: position for position, node_id in enumerate(ids)}
+        self.node_type = node_type
+        self.namespace = namespace
+        self.namespaces = namespaces
+        self.node_weight = node_weight
+        self.indptr = indptr
+        self.indices = indices
+        self.weight = weight
+        self.technique = technique
+        self.techniques = techniques
+        # Set by ReachabilityIndex.build once the graph is loaded.
+        self.reachability: "ReachabilityIndex | None" = None
+        self._bounds: OrderedDict[tuple, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._bounds_lock = Lock()
+
+    @classmethod
+    def build(
+        cls,
+        gen_key: str,
+        nodes: Iterable[tuple[str, str | None, str | None, str | None]],
+        edges: Iterable[tuple[str, str, float | None, str | None]],
+    ) -> "AttackGraph":
+        """Build from ``(id, type, namespace, criticality)`` and
+        ``(source, target, confidence, technique)`` rows.
+
+        Edges whose endpoints are not among ``nodes`` are dropped.
+        """
+        ids: list[str] = []
+        index: dict[str, int] = {}
+        types: list[int] = []
+        namespace_codes: list[int] = []
+        namespaces: dict[str, int] = {"": 0}
+        node_weights: list[float] = []
+        for node_id, node_type, namespace, criticality in nodes:
+            index[node_id] = len(ids)
+            ids.append(node_id)
+            types.append(NODE_TYPE_CODES.get(node_type, UNKNOWN_TYPE))
+            namespace_codes.append(namespaces.setdefault(namespace or "", len(namespaces)))
+            node_weights.append(
+                CRITICALITY_WEIGHTS.get(criticality, DEFAULT_CRITICALITY_WEIGHT)
+            )
+
+        sources: list[int] = []
+        targets: list[int] = []
+        confidences: list[float] = []
+        technique_codes: list[int] = []
+        techniques: dict[str, int] = {}
+        for source, target, confidence, technique in edges:
+            source_index = index.get(source)
+            target_index = index.get(target)
+            if source_index is None or target_index is None:
+                continue
+            sources.append(source_index)
+            targets.append(target_index)
+            confidences.append(DEFAULT_CONFIDENCE if confidence is None else confidence)
+            technique_codes.append(techniques.setdefault(technique or "", len(techniques)))
+
+        node_count = len(ids)
+        source_array = np.asarray(sources, dtype=np.int32)
+        order = np.argsort(source_array, kind="stable")
+        indices = np.asarray(targets, dtype=np.int32)[order]
+        node_weight = np.asarray(node_weights, dtype=np.float32)
+        weight = np.asarray(confidences, dtype=np.float32)[order] + node_weight[indices]
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source_array, minlength=node_count), out=indptr[1:])
+        return cls(
+            gen_key=gen_key,
+            ids=ids,
+            node_type=np.asarray(types, dtype=np.int8),
+            namespace=np.asarray(namespace_codes, dtype=np.int32),
+            namespaces=list(namespaces),
+            node_weight=node_weight,
+            indptr=indptr,
+            indices=indices,
+            weight=weight,
+            technique=np.asarray(technique_codes, dtype=np.int16)[order],
+            techniques=list(techniques),
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def edge_sources(self) -> np.ndarray:
+        """Source node of every edge, aligned with ``indices``."""
+        return np.repeat(np.arange(self.node_count), np.diff(self.indptr))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            array.nbytes
+            for array in (
+                self.node_type,
+                self.namespace,
+                self.node_weight,
+                self.indptr,
+                self.indices,
+                self.weight,
+                self.technique,
+            )
+        )
+
+    def select(
+        self,
+        *,
+        node_id: str | None = None,
+        types: Iterable[NodeType] | None = None,
+        namespace: str | None = None,
+    ) -> np.ndarray:
+        """Boolean mask of the nodes matching every given filter."""
+        mask = np.ones(self.node_count, dtype=bool)
+        if node_id is not None:
+            mask[:] = False
+            if node_id in self.index:
+                mask[self.index[node_id]] = True
+        if types is not None:
+            codes = [NODE_TYPE_CODES[node_type.value] for node_type in types]
+            mask &= np.isin(self.node_type, codes)
+        if namespace is not None:
+            try:
+                code = self.namespaces.index(namespace)
+            except ValueError:
+                mask[:] = False
+            else:
+                mask &= self.namespace == code
+        return mask
+
+    def top_paths(
+        self,
+        starts: np.ndarray,
+        *,
+        target_types: Iterable[NodeType] | None,
+        namespace: str | None,
+        max_depth: int,
+        limit: int,
+    ) -> list[ScoredPath]:
+        """The ``limit`` best-scoring paths of 1..``max_depth`` hops from a
+        start node to a target node, best first.
+
+        Like Cypher's variable-length match, a path may revisit a node but
+        never reuses an edge. Partial paths are expanded best-first by their
+        score plus the ``upper_bounds`` of what the remaining hops can add, so
+        complete paths come off the queue in score order and the search
+        stops after the ``limit``-th instead of enumerating every path.
+        """
+        return list(
+            islice(
+                self.iter_paths(
+                    starts, target_types=target_types, namespace=namespace, max_depth=max_depth
+                ),
+                limit,
+            )
+        )
+
+    def iter_paths(
+        self,
+        starts: np.ndarray,
+        *,
+        target_types: Iterable[NodeType] | None,
+        namespace: str | None,
+        max_depth: int,
+        budget: SearchBudget | None = None,
+    ) -> Iterator[ScoredPath]:
+        """``top_paths`` without a limit: every path, best first, each one
+        found only when asked for. Ends early once ``budget`` is spent."""
+        targets, bounds = self.targets(target_types, namespace, max_depth)
+        return self._best_first(
+            np.flatnonzero(starts).tolist(), targets, bounds, max_depth=max_depth, budget=budget
+        )
+
+    def top_paths_by_start(
+        self,
+        starts: np.ndarray,
+        *,
+        target_types: Iterable[NodeType] | None,
+        namespace: str | None,
+        max_depth: int,
+        limit: int,
+    ) -> dict[int, list[ScoredPath]]:
+        """The ``limit`` best paths of every start node; starts without a
+        path are left out.
+
+        Each start gets its own queue, so it stops at its own ``limit``-th
+        path, but all of them share one bounds table: a single pass over the
+        edges, after which each search only touches the paths it returns.
+        """
+        targets, bounds = self.targets(target_types, namespace, max_depth)
+        by_start: dict[int, list[ScoredPath]] = {}
+        for start in np.flatnonzero(starts).tolist():
+            paths = list(
+                islice(self._best_first([start], targets, bounds, max_depth=max_depth), limit)
+            )
+            if paths:
+                by_start[start] = paths
+        return by_start
+
+    def _best_first(
+        self,
+        starts: list[int],
+        targets: np.ndarray,
+        bounds: np.ndarray,
+        *,
+        max_depth: int,
+        budget: SearchBudget | None = None,
+    ) -> Iterator[ScoredPath]:
+        target_flags = targets.tobytes()
+        indptr, indices, weight = self.indptr, self.indices, self.weight
+        # (-priority, partial?, tiebreak, node, score, nodes, edges); a
+        # complete path sorts before a partial one with the same priority.
+        queue: list[tuple[float, int, int, int, float, tuple[int, ...], tuple[int, ...]]] = []
+        counter = 0
+        reachable = bounds[max_depth]
+        for start_node in starts:
+            if reachable[start_node] == -np.inf:
+                continue
+            counter += 1
+            queue.append(
+                (-float(reachable[start_node]), 1, counter, start_node, 0.0, (start_node,), ())
+            )
+        heapq.heapify(queue)
+
+        while queue:
+            _, partial, _, node, score, nodes, edges = heapq.heappop(queue)
+            if not partial:
+                yield ScoredPath(score, nodes, edges)
+                continue
+            if budget is not None and not budget.spend():
+                return
+            remaining = max_depth - len(edges) - 1
+            bound_after = bounds[remaining]
+            start, end = int(indptr[node]), int(indptr[node + 1])
+            neighbours = indices[start:end].tolist()
+            weights = weight[start:end].tolist()
+            for offset, neighbour in enumerate(neighbours):
+                edge = start + offset
+                if edge in edges:
+                    continue
+                hop_score = score + weights[offset]
+                hop_nodes = nodes + (neighbour,)
+                hop_edges = edges + (edge,)
+                if target_flags[neighbour]:
+                    counter += 1
+                    heapq.heappush(
+                        queue, (-hop_score, 0, counter, neighbour, hop_score, hop_nodes, hop_edges)
+                    )
+                if remaining and bound_after[neighbour] > -np.inf:
+                    counter += 1
+                    heapq.heappush(
+                        queue,
+                        (
+                            -(hop_score + bound_after[neighbour]),
+                            1,
+                            counter,
+                            neighbour,
+                            hop_score,
+                            hop_nodes,
+                            hop_edges,
+                        ),
+                    )
+
+    def targets(
+        self, types: Iterable[NodeType] | None, namespace: str | None, max_depth: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Target mask for ``types`` and ``namespace`` and its ``upper_bounds``, cached."""
+        key = (tuple(types) if types is not None else None, namespace, max_depth)
+        with self._bounds_lock:
+            cached = self._bounds.get(key)
+            if cached is not None:
+                self._bounds.move_to_end(key)
+                return cached
+        targets = self.select(types=types, namespace=namespace)
+        cached = targets, self.upper_bounds(targets, max_depth)
+        with self._bounds_lock:
+            self._bounds[key] = cached
+            while len(self._bounds) > BOUNDS_CACHE_SIZE:
+                self._bounds.popitem(last=False)
+        return cached
+
+    def upper_bounds(self, targets: np.ndarray, max_depth: int) -> np.ndarray:
+        """``bounds[d][v]``: the highest score a walk of 1..``d`` hops from
+        ``v`` to a target can reach, or -inf if no target is that close.
+
+        Walks may repeat edges, so this bounds every path from above; it is
+        computed for all nodes at once, one hop count per pass over the edges.
+        """
+        bounds = np.full((max_depth + 1, self.node_count), -np.inf)
+        if not self.edge_count:
+            return bounds
+        stop = np.where(targets, 0.0, -np.inf)
+        has_edges = np.diff(self.indptr) > 0
+        row_starts = self.indptr[:-1][has_edges]
+        weight = self.weight.astype(np.float64)
+        for depth in range(1, max_depth + 1):
+            best_after = np.maximum(stop, bounds[depth - 1])
+            values = weight + best_after[self.indices]
+            bounds[depth][has_edges] = np.maximum.reduceat(values, row_starts)
+        # Summation order differs from the search's; never let rounding make a
+        # bound undercut the path it bounds.
+        bounds += BOUND_SLACK
+        return bounds
+
+    def shortest_path(self, start: int, target: int, *, max_depth: int) -> ScoredPath | None:
+        """A path with the fewest hops from ``start`` to ``target``, expanding
+        one breadth-first level at a time over the whole frontier."""
+        if start == target:
+            return None
+        parent_edge = np.full(self.node_count, -1, dtype=np.int64)
+        parent = np.full(self.node_count, -1, dtype=np.int64)
+        seen = np.zeros(self.node_count, dtype=bool)
+        seen[start] = True
+        frontier = np.asarray([start], dtype=np.int64)
+        for _ in range(max_depth):
+            positions, sources = frontier_edges(self.indptr, frontier)
+            if not len(positions):
+                return None
+            reached = self.indices[positions]
+            fresh = ~seen[reached]
+            reached, first = np.unique(reached[fresh], return_index=True)
+            if not len(reached):
+                return None
+            parent[reached] = sources[fresh][first]
+            parent_edge[reached] = positions[fresh][first]
+            seen[reached] = True
+            if seen[target]:
+                return self._trace(start, target, parent, parent_edge)
+            frontier = reached
+        return None
+
+    def _trace(
+        self, start: int, target: int, parent: np.ndarray, parent_edge: np.ndarray
+    ) -> ScoredPath:
+        nodes = [target]
+        edges = []
+        while nodes[-1] != start:
+            edges.append(int(parent_edge[nodes[-1]]))
+            nodes.append(int(parent[nodes[-1]]))
+        nodes.reverse()
+        edges.reverse()
+        score = float(self.weight[edges].sum())
+        return ScoredPath(score, tuple(nodes), tuple(edges))
+
+
+def frontier_edges(indptr: np.ndarray, frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """CSR positions of every edge leaving ``frontier``, and each one's source node."""
+    lows = indptr[frontier]
+    counts = indptr[frontier + 1] - lows
+    total = int(counts.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(lows, counts) + offsets, np.repeat(frontier, counts)
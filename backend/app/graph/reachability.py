@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+
+from app.graph.engine import AttackGraph, frontier_edges
+from app.models.domain import NodeType
+
+# Targets the index tracks: what analysts ask "who can reach" about.
+HIGH_VALUE_TYPES = (NodeType.MASTER, NodeType.CREDENTIAL)
+# Stored hop distances are uint8; this one means "cannot reach".
+UNREACHABLE = np.iinfo(np.uint8).max
+# Bitsets take components x targets bits; beyond this, reachable targets are
+# found by a breadth-first search per lookup instead.
+MAX_BITSET_BYTES = 128 * 2**20
+
+
+def strongly_connected_components(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Component id of every node (iterative Tarjan).
+
+    Components are numbered in reverse topological order: every component
+    reachable from another one has a lower id.
+    """
+    node_count = len(indptr) - 1
+    starts = indptr.tolist()
+    targets = indices.tolist()
+    order = [-1] * node_count
+    low = [0] * node_count
+    on_stack = bytearray(node_count)
+    component = [-1] * node_count
+    stack: list[int] = []
+    counter = 0
+    components = 0
+    for root in range(node_count):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, starts[root])]
+        while work:
+            node, position = work[-1]
+            if position < starts[node + 1]:
+                work[-1] = (node, position + 1)
+                successor = targets[position]
+                if order[successor] == -1:
+                    order[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = 1
+                    work.append((successor, starts[successor]))
+                elif on_stack[successor] and order[successor] < low[node]:
+                    low[node] = order[successor]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component[member] = components
+                    if member == node:
+                        break
+                components += 1
+    return np.asarray(component, dtype=np.int32)
+
+
+class ReachabilityIndex:
+    """Which high-value targets each node of an ``AttackGraph`` can reach.
+
+    Built by collapsing strongly connected components: every node of a
+    component reaches the same targets, so one bitset per component (bit
+    ``j`` for ``targets[j]``) answers "which targets" with a lookup, and
+    per-type hop distances to the nearest target answer "how far". Reach
+    means a path of at least one hop, of any length.
+    """
+
+    def __init__(
+        self,
+        *,
+        component: np.ndarray,
+        targets: np.ndarray,
+        bits: np.ndarray | None,
+        distances: dict[NodeType, np.ndarray],
+        graph: AttackGraph,
+    ):
+        self.graph = graph
+        self.component = component
+        self.targets = targets
+        self.bits = bits
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph: AttackGraph) -> "ReachabilityIndex":
+        distances = {
+            node_type: nearest_distances(graph, graph.select(types=[node_type]))
+            for node_type in HIGH_VALUE_TYPES
+        }
+        component = strongly_connected_components(graph.indptr, graph.indices)
+        component_count = int(component.max()) + 1 if graph.node_count else 0
+        targets = np.flatnonzero(graph.select(types=HIGH_VALUE_TYPES))
+        words = max(1, -(-len(targets) // 64))
+        if component_count * words * 8 > MAX_BITSET_BYTES:
+            return cls(
+                component=component, targets=targets, bits=None, distances=distances, graph=graph
+            )
+
+        # Condensed DAG: distinct edges between different components.
+        edge_sources = component[graph.edge_sources()]
+        edge_targets = component[graph.indices]
+        crossing = edge_sources != edge_targets
+        pairs = np.unique(
+            edge_sources[crossing].astype(np.int64) * max(component_count, 1)
+            + edge_targets[crossing]
+        )
+        dag_sources = pairs // max(component_count, 1)
+        dag_indptr = np.zeros(component_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dag_sources, minlength=component_count), out=dag_indptr[1:])
+        dag_targets = (pairs % max(component_count, 1)).tolist()
+        dag_starts = dag_indptr.tolist()
+
+        # A component reaches itself only through a cycle inside it.
+        sizes = np.bincount(component, minlength=component_count)
+        self_loops = edge_sources[~crossing]
+        cyclic = (sizes > 1) | np.isin(np.arange(component_count), self_loops)
+
+        own = [0] * component_count
+        for bit, node in enumerate(targets.tolist()):
+            own[component[node]] |= 1 << bit
+        # Successors have lower ids, so one ascending pass sees them first.
+        reach = [0] * component_count
+        cyclic_flags = cyclic.tolist()
+        for current in range(component_count):
+            bits = own[current] if cyclic_flags[current] else 0
+            for successor in dag_targets[dag_starts[current] : dag_starts[current + 1]]:
+                bits |= own[successor] | reach[successor]
+            reach[current] = bits
+
+        packed = np.frombuffer(
+            b"".join(bits.to_bytes(words * 8, "little") for bits in reach), dtype="<u8"
+        ).reshape(component_count, words)
+        return cls(
+            component=component, targets=targets, bits=packed, distances=distances, graph=graph
+        )
+
+    def covers(self, types: Iterable[NodeType]) -> bool:
+        return all(node_type in self.distances for node_type in types)
+
+    def within(self, types: Iterable[NodeType], max_depth: int | None = None) -> np.ndarray:
+        """Mask of the nodes that reach a target of one of ``types`` in at
+        most ``max_depth`` hops (any number if None)."""
+        limit = UNREACHABLE - 1 if max_depth is None else min(max_depth, UNREACHABLE - 1)
+        mask = np.zeros(len(self.component), dtype=bool)
+        for node_type in types:
+            mask |= self.distances[node_type] <= limit
+        return mask
+
+    def reachable_targets(self, node: int) -> np.ndarray:
+        """Graph indexes of the targets ``node`` can reach."""
+        if self.bits is None:
+            return self.targets[reachable_from(self.graph, node)[self.targets]]
+        row = self.bits[self.component[node]]
+        flags = np.unpackbits(row.view(np.uint8), bitorder="little")[: len(self.targets)]
+        return self.targets[flags.astype(bool)]
+
+    def reaches(self, node: int, target: int) -> bool | None:
+        """Whether ``node`` reaches ``target``; None if ``target`` is not indexed."""
+        bit = np.searchsorted(self.targets, target)
+        if bit == len(self.targets) or self.targets[bit] != target:
+            return None
+        if self.bits is None:
+            return bool(reachable_from(self.graph, node)[target])
+        word, offset = divmod(int(bit), 64)
+        return bool(int(self.bits[self.component[node], word]) >> offset & 1)
+
+
+def nearest_distances(graph: AttackGraph, targets: np.ndarray) -> np.ndarray:
+    """Hops (at least one) from every node to its nearest node in the
+    ``targets`` mask, by breadth-first search backwards from all of them at once."""
+    reverse_indptr, reverse_indices = reverse_csr(graph)
+
+    # Hops to the nearest target, zero on the targets themselves.
+    to_target = np.full(graph.node_count, UNREACHABLE, dtype=np.uint8)
+    to_target[targets] = 0
+    frontier = np.flatnonzero(targets)
+    for hops in range(1, UNREACHABLE):
+        positions, _ = frontier_edges(reverse_indptr, frontier)
+        predecessors = np.unique(reverse_indices[positions])
+        frontier = predecessors[to_target[predecessors] == UNREACHABLE]
+        if not len(frontier):
+            break
+        to_target[frontier] = hops
+
+    # Paths of at least one hop: one more than the best successor.
+    distances = np.full(graph.node_count, UNREACHABLE, dtype=np.uint8)
+    has_edges = np.diff(graph.indptr) > 0
+    if graph.edge_count:
+        best = np.minimum.reduceat(
+            to_target[graph.indices].astype(np.int32), graph.indptr[:-1][has_edges]
+        )
+        distances[has_edges] = np.minimum(best + 1, UNREACHABLE)
+    return distances
+
+
+def reverse_csr(graph: AttackGraph) -> tuple[np.ndarray, np.ndarray]:
+    """``indptr`` and ``indices`` of the graph with every edge reversed."""
+    order = np.argsort(graph.indices, kind="stable")
+    reverse_indptr = np.zeros(graph.node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(graph.indices, minlength=graph.node_count), out=reverse_indptr[1:])
+    reverse_indices = graph.edge_sources()[order]
+    return reverse_indptr, reverse_indices
+
+
+def reachable_from(graph: AttackGraph, node: int) -> np.ndarray:
+    """Mask of the nodes reachable from ``node`` in at least one hop."""
+    reached = np.zeros(graph.node_count, dtype=bool)
+    frontier = np.asarray([node], dtype=np.int64)
+    while len(frontier):
+        positions, _ = frontier_edges(graph.indptr, frontier)
+        successors = np.unique(graph.indices[positions])
+        frontier = successors[~reached[successors]]
+        reached[frontier] = True
+    return reached
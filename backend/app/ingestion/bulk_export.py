@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import csv
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable
+
+import orjson
+
+from app.ingestion.models import IngestionResult
+from app.ingestion.payloads import edge_to_payload, node_to_payload
+from app.ingestion.records import AssetRecord, EdgeRecord
+from app.repositories.generation_repository import generation_key
+
+# Offline first load: instead of UNWIND/MERGE batches, write the files
+# ``neo4j-admin database import full`` reads. The import creates a new
+# database, so the result is a complete cluster generation plus its
+# AssetGeneration pointer; the backend adds its constraints and indexes on
+# startup as for any other database.
+
+ARRAY_DELIMITER = ";"
+ASSET_ID_SPACE = "Asset"
+GENERATION_ID_SPACE = "AssetGeneration"
+RELATIONSHIP_TYPE = "ATTACK_REL"
+
+# Edge payload fields stored under another name, as the writer's MERGE key does.
+EDGE_PROPERTY_NAMES = {"source": "sourceId", "target": "targetId"}
+
+
+@dataclass
+class BulkExportSummary:
+    directory: Path
+    node_files: list[Path]
+    relationship_files: list[Path]
+    nodes: int = 0
+    edges: int = 0
+    duplicate_nodes: int = 0
+    dropped_edges: int = 0
+    multiline: bool = False
+    counts_by_type: dict[str, int] = field(default_factory=dict)
+
+    def import_command(self, database: str = "neo4j") -> list[str]:
+        """``neo4j-admin`` arguments that import the exported files into ``database``."""
+        command = [
+            "neo4j-admin",
+            "database",
+            "import",
+            "full",
+            f"--array-delimiter={ARRAY_DELIMITER}",
+        ]
+        if self.multiline:
+            command.append("--multiline-fields=true")
+        command += [f"--nodes={path}" for path in self.node_files]
+        command += [f"--relationships={path}" for path in self.relationship_files]
+        command.append(database)
+        return command
+
+
+class BulkCsvExport:
+    """Stream assets and edges of one cluster generation into neo4j-admin CSV files.
+
+    ``add`` has the collector's ``BatchSink`` signature and, like any sink,
+    is called from the collector's listing threads. Rows are spooled to
+    per-type NDJSON files while the column set and column types are learned,
+    and ``finish`` turns the spools into CSV files with typed headers, so
+    memory stays bounded by the ids seen rather than by the rows.
+    """
+
+    def __init__(self, directory: Path, *, cluster: str, generation: int = 1):
+        self.directory = directory
+        self.cluster = cluster
+        self.generation = generation
+        self.gen_key = generation_key(cluster, generation)
+        self._spool_dir = directory / ".spool"
+        self._spool_dir.mkdir(parents=True, exist_ok=True)
+        self._node_spools: dict[str, Any] = {}
+        self._node_columns: dict[str, dict[str, str]] = {}
+        self._edge_spool = (self._spool_dir / "edges.ndjson").open("wb")
+        self._edge_columns: dict[str, str] = {}
+        self._node_ids: set[str] = set()
+        self._edge_keys: set[tuple[str, str, str]] = set()
+        self._multiline = False
+        self._duplicate_nodes = 0
+        self._counts: dict[str, int] = {}
+        self._lock = Lock()
+
+    def add(self, assets: Iterable[AssetRecord], edges: Iterable[EdgeRecord]) -> None:
+        with self._lock:
+            for asset in assets:
+                self.add_asset(asset)
+            for edge in edges:
+                self.add_edge(edge)
+
+    def add_asset(self, asset: AssetRecord) -> None:
+        if asset.id in self._node_ids:
+            self._duplicate_nodes += 1
+            return
+        self._node_ids.add(asset.id)
+        node_type = asset.type.value
+        props = node_to_payload(asset)["props"]
+        columns = self._node_columns.setdefault(node_type, {})
+        self._learn(columns, props)
+        spool = self._node_spools.get(node_type)
+        if spool is None:
+            spool = (self._spool_dir / f"nodes-{node_type}.ndjson").open("wb")
+            self._node_spools[node_type] = spool
+        spool.write(orjson.dumps(props) + b"\n")
+        self._counts[node_type] = self._counts.get(node_type, 0) + 1
+
+    def add_edge(self, edge: EdgeRecord) -> None:
+        key = edge.key
+        if key in self._edge_keys:
+            return
+        self._edge_keys.add(key)
+        props = edge_to_payload(edge)
+        self._learn(self._edge_columns, props)
+        self._edge_spool.write(orjson.dumps(props) + b"\n")
+
+    def finish(self) -> BulkExportSummary:
+        """Write the CSV files and remove the spools."""
+        for spool in self._node_spools.values():
+            spool.close()
+        self._edge_spool.close()
+
+        summary = BulkExportSummary(
+            directory=self.directory, node_files=[], relationship_files=[]
+        )
+        summary.node_files.append(self._write_generation())
+        for node_type, columns in self._node_columns.items():
+            path = self.directory / f"assets-{node_type.lower()}.csv"
+            summary.nodes += self._write_nodes(path, node_type, columns)
+            summary.node_files.append(path)
+        path = self.directory / "attack-rels.csv"
+        summary.edges, summary.dropped_edges = self._write_edges(path)
+        summary.relationship_files.append(path)
+
+        summary.duplicate_nodes = self._duplicate_nodes
+        summary.counts_by_type = dict(self._counts)
+        summary.multiline = self._multiline
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
+        return summary
+
+    def _write_generation(self) -> Path:
+        path = self.directory / "generations.csv"
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(
+                [f"cluster:ID({GENERATION_ID_SPACE})", ":LABEL", "current:long", "latest:long"]
+            )
+            writer.writerow(
+                [self.cluster, GENERATION_ID_SPACE, self.generation, self.generation]
+            )
+        return path
+
+    def _write_nodes(self, path: Path, node_type: str, columns: dict[str, str]) -> int:
+        names = [name for name in columns if name != "id"]
+        header = [f"id:ID({ASSET_ID_SPACE})", ":LABEL", "genKey", "generation:long"]
+        header += [_header(name, columns[name]) for name in names]
+        written = 0
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            for props in self._read_spool(f"nodes-{node_type}.ndjson"):
+                row = [props["id"], ASSET_ID_SPACE, self.gen_key, self.generation]
+                row += [self._cell(props.get(name), columns[name]) for name in names]
+                writer.writerow(row)
+                written += 1
+        return written
+
+    def _write_edges(self, path: Path) -> tuple[int, int]:
+        # Like the writer, leave out edges whose endpoints were never collected.
+        names = list(self._edge_columns)
+        header = [f":START_ID({ASSET_ID_SPACE})", f":END_ID({ASSET_ID_SPACE})", ":TYPE"]
+        header += [
+            _header(EDGE_PROPERTY_NAMES.get(name, name), self._edge_columns[name])
+            for name in names
+        ]
+        written = dropped = 0
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            for props in self._read_spool("edges.ndjson"):
+                if props["source"] not in self._node_ids or props["target"] not in self._node_ids:
+                    dropped += 1
+                    continue
+                row = [props["source"], props["target"], RELATIONSHIP_TYPE]
+                row += [self._cell(props.get(name), self._edge_columns[name]) for name in names]
+                writer.writerow(row)
+                written += 1
+        return written, dropped
+
+    def _read_spool(self, name: str):
+        path = self._spool_dir / name
+        if not path.exists():
+            return
+        with path.open("rb") as handle:
+            for line in handle:
+                yield orjson.loads(line)
+
+    def _learn(self, columns: dict[str, str], props: dict) -> None:
+        for name, value in props.items():
+            if value is None:
+                columns.setdefault(name, "")
+                continue
+            columns[name] = _merge_kinds(columns.get(name, ""), _kind(value))
+
+    def _cell(self, value: Any, kind: str) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (list, tuple)):
+            value = ARRAY_DELIMITER.join(str(item) for item in value)
+        elif kind != "string" or not isinstance(value, str):
+            return str(value)
+        if "\n" in value or "\r" in value:
+            self._multiline = True
+        return value
+
+
+def export_result(
+    result: IngestionResult, directory: Path, *, cluster: str, generation: int = 1
+) -> BulkExportSummary:
+    export = BulkCsvExport(directory, cluster=cluster, generation=generation)
+    export.add(result.assets, result.relationships)
+    return export.finish()
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "long"
+    if isinstance(value, float):
+        return "double"
+    if isinstance(value, (list, tuple)):
+        return "string[]"
+    return "string"
+
+
+def _merge_kinds(current: str, new: str) -> str:
+    if not current or current == new:
+        return new
+    if {current, new} == {"long", "double"}:
+        return "double"
+    return "string"
+
+
+def _header(name: str, kind: str) -> str:
+    # Columns that were only ever empty stay plain strings.
+    if kind in ("", "string"):
+        return name
+    return f"{name}:{kind}"
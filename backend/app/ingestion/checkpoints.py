@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from threading import Lock
+from typing import Iterator
+
+import orjson
+
+from app.core.logger import logger
+from app.ingestion.records import (
+    AssetRecord,
+    EdgeRecord,
+    asset_from_row,
+    asset_to_row,
+    edge_from_row,
+    edge_to_row,
+)
+
+
+class IngestionCheckpoint:
+    """Saved copy of one job's collected batches and the ones already committed.
+
+    ``batches.ndjson`` holds every batch handed to the writer, one line each,
+    ``committed.log`` the sequence numbers Neo4j has committed and
+    ``meta.json`` where the batches go (cluster, generation) and whether the
+    collection finished. A resumed job replays only the uncommitted batches.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._lock = Lock()
+        self._next_seq = 0
+        self.meta: dict = {}
+
+    @property
+    def collected(self) -> bool:
+        return bool(self.meta.get("collected"))
+
+    def add_batch(self, kind: str, items: list[AssetRecord] | list[EdgeRecord]) -> int:
+        to_row = asset_to_row if kind == "nodes" else edge_to_row
+        rows = [to_row(item) for item in items]
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            with self._path("batches.ndjson").open("ab") as handle:
+                handle.write(orjson.dumps({"seq": seq, "kind": kind, "rows": rows}) + b"\n")
+        return seq
+
+    def commit(self, seq: int) -> None:
+        with self._lock:
+            with self._path("committed.log").open("a", encoding="utf-8") as handle:
+                handle.write(f"{seq}\n")
+
+    def set_generation(self, generation: int) -> None:
+        with self._lock:
+            self.meta["generation"] = generation
+            self._write_meta()
+
+    def mark_collected(self, resource_versions: dict[str, str]) -> None:
+        with self._lock:
+            self.meta["collected"] = True
+            self.meta["resource_versions"] = resource_versions
+            self._write_meta()
+
+    def committed(self) -> set[int]:
+        path = self._path("committed.log")
+        if not path.exists():
+            return set()
+        return {int(line) for line in path.read_text(encoding="utf-8").split()}
+
+    def pending_batches(self) -> Iterator[tuple[int, str, list]]:
+        """Uncommitted batches in the order they were collected, as records."""
+        return self.batches(skip=self.committed())
+
+    def batches(self, skip: set[int] | None = None) -> Iterator[tuple[int, str, list]]:
+        """Saved batches in the order they were collected, as records."""
+        path = self._path("batches.ndjson")
+        if not path.exists():
+            return
+        with path.open("rb") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                batch = orjson.loads(line)
+                if skip and batch["seq"] in skip:
+                    continue
+                from_row = asset_from_row if batch["kind"] == "nodes" else edge_from_row
+                yield batch["seq"], batch["kind"], [from_row(row) for row in batch["rows"]]
+
+    def progress(self) -> tuple[int, int]:
+        """Committed and total batch counts."""
+        return len(self.committed()), self._next_seq
+
+    def _load(self) -> None:
+        self.meta = json.loads(self._path("meta.json").read_text(encoding="utf-8"))
+        path = self._path("batches.ndjson")
+        if path.exists():
+            with path.open("rb") as handle:
+                self._next_seq = sum(1 for line in handle if line.strip())
+
+    def _write_meta(self) -> None:
+        self._path("meta.json").write_text(json.dumps(self.meta), encoding="utf-8")
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+
+class CheckpointStore:
+    """Checkpoints of ingestion jobs, one directory per job id."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def create(
+        self,
+        job_id: str,
+        *,
+        config_id: str,
+        cluster: str,
+        mode: str,
+    ) -> IngestionCheckpoint:
+        directory = self.root / job_id
+        directory.mkdir(parents=True, exist_ok=True)
+        checkpoint = IngestionCheckpoint(directory)
+        checkpoint.meta = {
+            "job_id": job_id,
+            "config_id": config_id,
+            "cluster": cluster,
+            "mode": mode,
+            "generation": None,
+            "collected": False,
+            "resource_versions": {},
+        }
+        checkpoint._write_meta()
+        return checkpoint
+
+    def get(self, job_id: str) -> IngestionCheckpoint:
+        directory = self.root / job_id
+        if not (directory / "meta.json").exists():
+            raise FileNotFoundError(f"No checkpoint for job {job_id}")
+        checkpoint = IngestionCheckpoint(directory)
+        checkpoint._load()
+        return checkpoint
+
+    def adopt(self, job_id: str, new_job_id: str) -> IngestionCheckpoint:
+        """Hand the checkpoint of ``job_id`` over to the job resuming it."""
+        self.get(job_id)
+        (self.root / job_id).rename(self.root / new_job_id)
+        checkpoint = self.get(new_job_id)
+        checkpoint.meta["job_id"] = new_job_id
+        checkpoint._write_meta()
+        return checkpoint
+
+    def remove(self, job_id: str) -> None:
+        directory = self.root / job_id
+        if directory.exists():
+            shutil.rmtree(directory, ignore_errors=True)
+            logger.info("Removed checkpoint of job %s", job_id)
@@ -1,328 +1,708 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Iterator
 
-from kubernetes import client, config
+import orjson
+from kubernetes import client, config, watch
 from kubernetes.client import ApiException
 
 from app.core.logger import logger
-from app.ingestion.models import IngestionResult
-from app.models.domain import (
-    AssetNode,
-    AttackEdge,
-    AttackTechnique,
-    NodeType,
-)
+from app.ingestion.models import IngestionDelta, IngestionResult
+from app.ingestion.records import AssetRecord, EdgeRecord, intern, labels_to_tuple
+from app.models.domain import AttackTechnique, NodeType
+
+
+ProgressCallback = Callable[[str], None]
+BatchSink = Callable[[list[AssetRecord], list[EdgeRecord]], None]
+
+# Watched resource kind -> resource segment used in asset ids.
+RESOURCE_KINDS = {
+    "nodes": "node",
+    "serviceaccounts": "serviceaccount",
+    "secrets": "secret",
+    "pods": "pod",
+}
+
+
+# Ask for secrets as a server-side Table carrying only object metadata. The
+# Type column survives the projection; the data payload never leaves the
+# apiserver. Servers without Table support fall back to a regular list.
+SECRET_TABLE_ACCEPT = "application/json;as=Table;v=v1;g=meta.k8s.io,application/json"
+SECRET_TYPE_COLUMN = 1
+_TABLE_QUERY_PARAMS = {
+    "limit": "limit",
+    "_continue": "continue",
+    "resource_version": "resourceVersion",
+    "timeout_seconds": "timeoutSeconds",
+    "allow_watch_bookmarks": "allowWatchBookmarks",
+    "watch": "watch",
+}
+
+
+class ResourceVersionExpired(Exception):
+    """The apiserver no longer holds history back to a stored resourceVersion."""
+
+
+class CollectionBuffer:
+    """Assets and edges produced by a single listing.
+
+    Without a sink everything is kept until the listings are merged. With a
+    sink, ``flush()`` hands each page over and only the small join state
+    (service account secrets, secret ids, mounted service accounts) is kept.
+    """
+
+    def __init__(self, sink: BatchSink | None = None):
+        self.sink = sink
+        self.assets: Dict[str, AssetRecord] = {}
+        self.edges: list[EdgeRecord] = []
+        self.edge_keys: set[tuple[str, str, str]] = set()
+        # serviceaccount id -> namespace, for pods whose SA→secret edges are
+        # built in the join phase.
+        self.mounted_service_accounts: Dict[str, str] = {}
+        self.service_account_secrets: Dict[str, list[str]] = {}
+        self.secret_ids: set[str] = set()
+        self.deleted_ids: Dict[str, None] = {}
+
+    def flush(self):
+        if self.sink is None or not (self.assets or self.edges):
+            return
+        self.sink(list(self.assets.values()), self.edges)
+        self.assets = {}
+        self.edges = []
+        self.edge_keys = set()
+
+    def add_asset(self, asset: AssetRecord):
+        self.deleted_ids.pop(asset.id, None)
+        self.assets[asset.id] = asset
+
+    def discard(self, asset_id: str):
+        """Forget an object deleted after it was buffered, including the assets it owns."""
+        dropped = {
+            key
+            for key, asset in self.assets.items()
+            if key == asset_id or asset.meta("owner") == asset_id
+        }
+        for key in dropped:
+            del self.assets[key]
+        self.edges = [
+            edge
+            for edge in self.edges
+            if edge.source not in dropped and edge.target not in dropped
+        ]
+        self.edge_keys = {
+            key for key in self.edge_keys if key[0] not in dropped and key[1] not in dropped
+        }
+        self.mounted_service_accounts.pop(asset_id, None)
+        self.deleted_ids[asset_id] = None
+
+    def add_edge(self, edge: EdgeRecord):
+        key = edge.key
+        if key in self.edge_keys:
+            return
+        self.edge_keys.add(key)
+        self.edges.append(edge)
 
 
 class KubernetesCollector:
-    def __init__(self, kubeconfig_path: Path, cluster_name: str):
+    def __init__(
+        self,
+        kubeconfig_path: Path,
+        cluster_name: str,
+        *,
+        page_size: int = 500,
+        max_workers: int = 5,
+        watch_timeout: int = 5,
+        raw_listing: bool = True,
+        metadata_only_secrets: bool = True,
+        progress: ProgressCallback | None = None,
+    ):
         self.kubeconfig_path = kubeconfig_path
         self.cluster_name = cluster_name
-        self.assets: Dict[str, AssetNode] = {}
-        self.edges: list[AttackEdge] = []
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.watch_timeout = watch_timeout
+        self.raw_listing = raw_listing
+        self.metadata_only_secrets = metadata_only_secrets
+        self.progress = progress
+        self.assets: Dict[str, AssetRecord] = {}
+        self.edges: list[EdgeRecord] = []
         self.edge_keys: set[tuple[str, str, str]] = set()
+        # Resource kind -> resourceVersion the collected state is consistent with.
+        self.resource_versions: Dict[str, str] = {}
+        # One timestamp per run, shared by every record instead of one datetime each.
+        self.scan_time: datetime | None = None
         self.core_v1 = None
 
     def collect(self) -> IngestionResult:
-        logger.info("Loading kubeconfig from %s", self.kubeconfig_path)
-        config.load_kube_config(config_file=str(self.kubeconfig_path))
-        self.core_v1 = client.CoreV1Api()
+        """Run every listing and return what they found.
+
+        Assets and edges come in listing order (master, nodes, service
+        accounts, secrets, pods) however many workers run the listings. The
+        join-phase SA→secret edges come last, as ``stream()`` delivers them,
+        in the order their pods were listed; the serial collector used to
+        append them right after each pod's own edges.
+        """
+        buffers = self._run_listings(sink=None)
 
-        self._collect_master()
-        self._collect_nodes()
-        self._collect_service_accounts()
-        self._collect_secrets()
-        self._collect_pods()
+        # Merge in the serial listing order so the result does not depend on
+        # which listing finished first.
+        for buffer in buffers:
+            for asset in buffer.assets.values():
+                self._add_asset(asset)
+            for edge in buffer.edges:
+                self._add_edge(edge)
+        for edge in self._service_account_secret_edges(buffers):
+            self._add_edge(edge)
 
         return IngestionResult(
             assets=list(self.assets.values()),
             relationships=self.edges,
         )
 
-    def _collect_master(self):
+    def stream(self, sink: BatchSink) -> None:
+        """Collect like ``collect()`` but hand assets and edges to ``sink`` page by page.
+
+        ``sink`` is called from the listing threads. Join-phase edges are
+        delivered last, after every listing has finished.
+        """
+        buffers = self._run_listings(sink=sink)
+        join_edges = self._service_account_secret_edges(buffers)
+        if join_edges:
+            sink([], join_edges)
+
+    def _run_listings(self, sink: BatchSink | None) -> list[CollectionBuffer]:
+        self._connect()
+        self.scan_time = datetime.utcnow()
+
+        listings = [
+            self._collect_master,
+            self._collect_nodes,
+            self._collect_service_accounts,
+            self._collect_secrets,
+            self._collect_pods,
+        ]
+        buffers = [CollectionBuffer(sink) for _ in listings]
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="k8s-collect"
+        ) as pool:
+            futures = [
+                pool.submit(self._run_listing, listing, buffer)
+                for listing, buffer in zip(listings, buffers)
+            ]
+            for future in futures:
+                future.result()
+        return buffers
+
+    def _run_listing(self, listing: Callable, buffer: CollectionBuffer):
+        listing(buffer)
+        buffer.flush()
+
+    def collect_changes(self, resource_versions: Dict[str, str]) -> IngestionDelta:
+        """Fetch only the objects that changed since ``resource_versions``.
+
+        Every kind in ``RESOURCE_KINDS`` is watched from its stored version until
+        the watch times out. Raises ``ResourceVersionExpired`` when the apiserver
+        has compacted that history; callers then fall back to ``collect()``.
+        """
+        self._connect()
+        self.scan_time = datetime.utcnow()
+        missing = [kind for kind in RESOURCE_KINDS if kind not in resource_versions]
+        if missing:
+            raise ResourceVersionExpired(f"No stored resourceVersion for {', '.join(missing)}")
+
+        buffers = {kind: CollectionBuffer() for kind in RESOURCE_KINDS}
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="k8s-watch"
+        ) as pool:
+            futures = [
+                pool.submit(self._watch_changes, kind, resource_versions[kind], buffer)
+                for kind, buffer in buffers.items()
+            ]
+            for future in futures:
+                future.result()
+
+        delta = IngestionDelta()
+        edge_keys: set[tuple[str, str, str]] = set()
+        for buffer in buffers.values():
+            delta.assets.extend(buffer.assets.values())
+            for edge in buffer.edges:
+                key = edge.key
+                if key not in edge_keys:
+                    edge_keys.add(key)
+                    delta.relationships.append(edge)
+            delta.deleted_ids.extend(buffer.deleted_ids)
+            delta.mounted_service_accounts.extend(buffer.mounted_service_accounts)
+        return delta
+
+    def _watch_changes(self, kind: str, resource_version: str, buffer: CollectionBuffer):
+        list_fn, ingest = self._resources()[kind]
+        # "object" keeps events as plain JSON dicts instead of V1 models.
+        watcher = watch.Watch(return_type="object")
+        events = 0
+        try:
+            for event in watcher.stream(
+                list_fn,
+                resource_version=resource_version,
+                timeout_seconds=self.watch_timeout,
+                allow_watch_bookmarks=True,
+            ):
+                event_type = event["type"]
+                if event_type == "BOOKMARK":
+                    watcher.resource_version = event["raw_object"]["metadata"][
+                        "resourceVersion"
+                    ]
+                    continue
+                events += 1
+                obj = event["raw_object"]
+                if obj.get("kind") == "Table":
+                    # Metadata-only secret watches deliver one-row tables.
+                    for item in _list_items(obj):
+                        self._apply_event(kind, event_type, item, ingest, buffer)
+                else:
+                    self._apply_event(kind, event_type, obj, ingest, buffer)
+        except ApiException as exc:
+            if exc.status == 410:
+                raise ResourceVersionExpired(
+                    f"resourceVersion {resource_version} for {kind} expired"
+                ) from exc
+            raise
+        self.resource_versions[kind] = watcher.resource_version or resource_version
+        self._report(f"Watched {kind}: {events} changes since {resource_version}")
+
+    def _apply_event(
+        self,
+        kind: str,
+        event_type: str,
+        obj: dict,
+        ingest: Callable,
+        buffer: CollectionBuffer,
+    ):
+        if event_type != "DELETED":
+            ingest(buffer, obj)
+            return
+        metadata = obj.get("metadata")
+        if metadata:
+            buffer.discard(
+                self._build_id(
+                    RESOURCE_KINDS[kind], metadata.get("namespace"), metadata["name"]
+                )
+            )
+
+    def _connect(self):
+        logger.info("Loading kubeconfig from %s", self.kubeconfig_path)
+        config.load_kube_config(config_file=str(self.kubeconfig_path))
+        self.core_v1 = client.CoreV1Api()
+
+    def _resources(self) -> dict[str, tuple[Callable, Callable]]:
+        return {
+            "nodes": (self.core_v1.list_node, self._ingest_node),
+            "serviceaccounts": (
+                self.core_v1.list_service_account_for_all_namespaces,
+                self._ingest_service_account,
+            ),
+            "secrets": (self._secret_list_fn(), self._ingest_secret),
+            "pods": (self.core_v1.list_pod_for_all_namespaces, self._ingest_pod),
+        }
+
+    def _secret_list_fn(self) -> Callable:
+        if self.metadata_only_secrets:
+            return self._list_secret_metadata
+        return self.core_v1.list_secret_for_all_namespaces
+
+    def _list_secret_metadata(self, **kwargs):
+        """List or watch secrets as a metadata-only Table (raw response).
+
+        Takes the keyword arguments the generated list helpers accept, so it
+        works with ``_list_paged`` and ``watch.Watch().stream``.
+        """
+        query_params = [("includeObject", "Metadata")]
+        query_params.extend(
+            (_TABLE_QUERY_PARAMS[key], value)
+            for key, value in kwargs.items()
+            if key in _TABLE_QUERY_PARAMS and value is not None
+        )
+        return self.core_v1.api_client.call_api(
+            "/api/v1/secrets",
+            "GET",
+            query_params=query_params,
+            header_params={"Accept": SECRET_TABLE_ACCEPT},
+            auth_settings=["BearerToken"],
+            _return_http_data_only=True,
+            _preload_content=False,
+        )
+
+    def _collect_master(self, buffer: CollectionBuffer):
         master_id = self._build_id("master", None, "api-server")
-        self._add_asset(
-            AssetNode(
+        buffer.add_asset(
+            AssetRecord(
                 id=master_id,
                 type=NodeType.MASTER,
                 name=f"{self.cluster_name}-master",
                 namespace=None,
                 criticality="HIGH",
-                labels=[],
-                metadata={"cluster": self.cluster_name},
-                last_seen=datetime.utcnow(),
+                labels=(),
+                cluster=self.cluster_name,
+                last_seen=self.scan_time,
             )
         )
 
-    def _collect_nodes(self):
-        try:
-            nodes = self.core_v1.list_node().items
-        except ApiException as exc:
-            logger.error("Failed to list nodes: %s", exc)
+    def _collect_nodes(self, buffer: CollectionBuffer):
+        for node in self._list_paged(self.core_v1.list_node, "nodes", buffer):
+            self._ingest_node(buffer, node)
+
+    def _ingest_node(self, buffer: CollectionBuffer, node):
+        metadata = node.get("metadata")
+        if not metadata:
             return
-        for node in nodes:
-            metadata = node.metadata
-            if not metadata:
-                continue
-            node_id = self._build_id("node", None, metadata.name)
-            labels = _labels_to_list(metadata.labels)
-            self._add_asset(
-                AssetNode(
-                    id=node_id,
-                    type=NodeType.NODE,
-                    name=metadata.name,
-                    namespace=None,
-                    criticality="MEDIUM",
-                    labels=labels,
-                    metadata={
-                        "cluster": self.cluster_name,
-                        "k8sUid": metadata.uid,
-                        "kubeletVersion": node.status.node_info.kubelet_version
-                        if node.status and node.status.node_info
-                        else None,
-                        "osImage": node.status.node_info.os_image
-                        if node.status and node.status.node_info
-                        else None,
-                    },
-                    last_seen=datetime.utcnow(),
-                )
+        name = metadata["name"]
+        node_id = self._build_id("node", None, name)
+        node_info = (node.get("status") or {}).get("nodeInfo") or {}
+        labels = labels_to_tuple(metadata.get("labels"))
+        buffer.add_asset(
+            AssetRecord(
+                id=node_id,
+                type=NodeType.NODE,
+                name=name,
+                namespace=None,
+                criticality="MEDIUM",
+                labels=labels,
+                cluster=self.cluster_name,
+                metadata={
+                    "k8sUid": metadata.get("uid"),
+                    "kubeletVersion": intern(node_info.get("kubeletVersion")),
+                    "osImage": intern(node_info.get("osImage")),
+                },
+                last_seen=self.scan_time,
             )
+        )
 
-    def _collect_service_accounts(self):
-        try:
-            sas = self.core_v1.list_service_account_for_all_namespaces().items
-        except ApiException as exc:
-            logger.error("Failed to list service accounts: %s", exc)
+    def _collect_service_accounts(self, buffer: CollectionBuffer):
+        for sa in self._list_paged(
+            self.core_v1.list_service_account_for_all_namespaces, "serviceaccounts", buffer
+        ):
+            self._ingest_service_account(buffer, sa)
+
+    def _ingest_service_account(self, buffer: CollectionBuffer, sa):
+        metadata = sa.get("metadata")
+        if not metadata:
             return
-        for sa in sas:
-            metadata = sa.metadata
-            if not metadata:
-                continue
-            sa_id = self._build_id("serviceaccount", metadata.namespace, metadata.name)
-            labels = _labels_to_list(metadata.labels)
-            self._add_asset(
-                AssetNode(
-                    id=sa_id,
-                    type=NodeType.SERVICE_ACCOUNT,
-                    name=metadata.name,
-                    namespace=metadata.namespace,
-                    criticality="MEDIUM",
-                    labels=labels,
-                    metadata={
-                        "cluster": self.cluster_name,
-                        "k8sUid": metadata.uid,
-                        "secrets": [secret.name for secret in sa.secrets or []],
-                    },
-                    last_seen=datetime.utcnow(),
-                )
+        name = metadata["name"]
+        namespace = metadata.get("namespace")
+        sa_id = self._build_id("serviceaccount", namespace, name)
+        labels = labels_to_tuple(metadata.get("labels"))
+        secrets = [secret.get("name") for secret in sa.get("secrets") or []]
+        buffer.service_account_secrets[sa_id] = secrets
+        buffer.add_asset(
+            AssetRecord(
+                id=sa_id,
+                type=NodeType.SERVICE_ACCOUNT,
+                name=name,
+                namespace=namespace,
+                criticality="MEDIUM",
+                labels=labels,
+                cluster=self.cluster_name,
+                metadata={
+                    "k8sUid": metadata.get("uid"),
+                    "secrets": secrets,
+                },
+                last_seen=self.scan_time,
             )
+        )
 
-    def _collect_secrets(self):
-        try:
-            secrets = self.core_v1.list_secret_for_all_namespaces().items
-        except ApiException as exc:
-            logger.error("Failed to list secrets: %s", exc)
+    def _collect_secrets(self, buffer: CollectionBuffer):
+        for secret in self._list_paged(
+            self._secret_list_fn(),
+            "secrets",
+            buffer,
+            raw=self.raw_listing or self.metadata_only_secrets,
+        ):
+            self._ingest_secret(buffer, secret)
+
+    def _ingest_secret(self, buffer: CollectionBuffer, secret):
+        metadata = secret.get("metadata")
+        if not metadata:
             return
-        for secret in secrets:
-            metadata = secret.metadata
-            if not metadata:
-                continue
-            secret_id = self._build_id("secret", metadata.namespace, metadata.name)
-            labels = _labels_to_list(metadata.labels)
-            criticality = "HIGH" if secret.type == "kubernetes.io/service-account-token" else "MEDIUM"
-            self._add_asset(
-                AssetNode(
-                    id=secret_id,
-                    type=NodeType.SECRET,
-                    name=metadata.name,
-                    namespace=metadata.namespace,
-                    criticality=criticality,
-                    labels=labels,
+        name = metadata["name"]
+        namespace = metadata.get("namespace")
+        secret_id = self._build_id("secret", namespace, name)
+        labels = labels_to_tuple(metadata.get("labels"))
+        buffer.secret_ids.add(secret_id)
+        secret_type = secret.get("type")
+        criticality = "HIGH" if secret_type == "kubernetes.io/service-account-token" else "MEDIUM"
+        buffer.add_asset(
+            AssetRecord(
+                id=secret_id,
+                type=NodeType.SECRET,
+                name=name,
+                namespace=namespace,
+                criticality=criticality,
+                labels=labels,
+                cluster=self.cluster_name,
+                metadata={
+                    "k8sUid": metadata.get("uid"),
+                    "secretType": intern(secret_type),
+                },
+                last_seen=self.scan_time,
+            )
+        )
+        if secret_type == "kubernetes.io/service-account-token":
+            cred_id = f"{secret_id}:credential"
+            buffer.add_asset(
+                AssetRecord(
+                    id=cred_id,
+                    type=NodeType.CREDENTIAL,
+                    name=f"{name}-credential",
+                    namespace=namespace,
+                    criticality="HIGH",
+                    labels=(),
+                    cluster=self.cluster_name,
                     metadata={
-                        "cluster": self.cluster_name,
-                        "k8sUid": metadata.uid,
-                        "secretType": secret.type,
+                        "secret": name,
+                        "owner": secret_id,
                     },
-                    last_seen=datetime.utcnow(),
+                    last_seen=self.scan_time,
                 )
             )
-            if secret.type == "kubernetes.io/service-account-token":
-                cred_id = f"{secret_id}:credential"
-                self._add_asset(
-                    AssetNode(
-                        id=cred_id,
-                        type=NodeType.CREDENTIAL,
-                        name=f"{metadata.name}-credential",
-                        namespace=metadata.namespace,
-                        criticality="HIGH",
-                        labels=[],
-                        metadata={
-                            "cluster": self.cluster_name,
-                            "secret": metadata.name,
-                        },
-                        last_seen=datetime.utcnow(),
-                    )
-                )
-                self._add_edge(
-                    AttackEdge(
-                        source=secret_id,
-                        target=cred_id,
-                        technique=AttackTechnique.CLUSTER_CREDS.value,
-                        evidence="Service account token",
-                        confidence=0.7,
-                    )
+            buffer.add_edge(
+                EdgeRecord(
+                    source=secret_id,
+                    target=cred_id,
+                    technique=AttackTechnique.CLUSTER_CREDS.value,
+                    evidence="Service account token",
+                    confidence=0.7,
                 )
-                master_id = self._build_id("master", None, "api-server")
-                self._add_edge(
-                    AttackEdge(
-                        source=cred_id,
-                        target=master_id,
-                        technique=AttackTechnique.CLUSTER_CREDS.value,
-                        evidence="Token to master access",
-                        confidence=0.8,
-                    )
+            )
+            master_id = self._build_id("master", None, "api-server")
+            buffer.add_edge(
+                EdgeRecord(
+                    source=cred_id,
+                    target=master_id,
+                    technique=AttackTechnique.CLUSTER_CREDS.value,
+                    evidence="Token to master access",
+                    confidence=0.8,
                 )
+            )
 
-    def _collect_pods(self):
-        try:
-            pods = self.core_v1.list_pod_for_all_namespaces().items
-        except ApiException as exc:
-            logger.error("Failed to list pods: %s", exc)
+    def _collect_pods(self, buffer: CollectionBuffer):
+        for pod in self._list_paged(
+            self.core_v1.list_pod_for_all_namespaces, "pods", buffer
+        ):
+            self._ingest_pod(buffer, pod)
+
+    def _ingest_pod(self, buffer: CollectionBuffer, pod):
+        metadata = pod.get("metadata")
+        if not metadata:
             return
-        for pod in pods:
-            metadata = pod.metadata
-            if not metadata:
-                continue
-            pod_id = self._build_id("pod", metadata.namespace, metadata.name)
-            labels = _labels_to_list(metadata.labels)
-
-            self._add_asset(
-                AssetNode(
-                    id=pod_id,
-                    type=NodeType.POD,
-                    name=metadata.name,
-                    namespace=metadata.namespace,
-                    criticality="MEDIUM",
-                    labels=labels,
-                    metadata={
-                        "cluster": self.cluster_name,
-                        "k8sUid": metadata.uid,
-                        "nodeName": pod.spec.node_name if pod.spec else None,
-                    },
-                    last_seen=datetime.utcnow(),
-                )
+        name = metadata["name"]
+        namespace = metadata.get("namespace")
+        spec = pod.get("spec")
+        pod_id = self._build_id("pod", namespace, name)
+        labels = labels_to_tuple(metadata.get("labels"))
+
+        buffer.add_asset(
+            AssetRecord(
+                id=pod_id,
+                type=NodeType.POD,
+                name=name,
+                namespace=namespace,
+                criticality="MEDIUM",
+                labels=labels,
+                cluster=self.cluster_name,
+                metadata={
+                    "k8sUid": metadata.get("uid"),
+                    "nodeName": intern(spec.get("nodeName")) if spec else None,
+                },
+                last_seen=self.scan_time,
             )
-            if pod.spec and pod.spec.node_name:
-                node_id = self._build_id("node", None, pod.spec.node_name)
-                self._add_edge(
-                    AttackEdge(
-                        source=node_id,
-                        target=pod_id,
-                        technique=AttackTechnique.ROOT_ACCESS.value,
-                        evidence="Pod scheduled on node",
-                        confidence=0.5,
-                    )
-                )
-            if pod.spec and pod.spec.service_account_name:
-                sa_id = self._build_id(
-                    "serviceaccount", metadata.namespace, pod.spec.service_account_name
+        )
+        if spec and spec.get("nodeName"):
+            node_id = self._build_id("node", None, spec["nodeName"])
+            buffer.add_edge(
+                EdgeRecord(
+                    source=node_id,
+                    target=pod_id,
+                    technique=AttackTechnique.ROOT_ACCESS.value,
+                    evidence="Pod scheduled on node",
+                    confidence=0.5,
                 )
-                self._add_edge(
-                    AttackEdge(
-                        source=pod_id,
-                        target=sa_id,
-                        technique=AttackTechnique.PRIV_DISCOVERY.value,
-                        evidence="ServiceAccount mounted",
-                        confidence=0.6,
-                    )
+            )
+        if spec and spec.get("serviceAccountName"):
+            sa_id = self._build_id(
+                "serviceaccount", namespace, spec["serviceAccountName"]
+            )
+            buffer.add_edge(
+                EdgeRecord(
+                    source=pod_id,
+                    target=sa_id,
+                    technique=AttackTechnique.PRIV_DISCOVERY.value,
+                    evidence="ServiceAccount mounted",
+                    confidence=0.6,
                 )
-            if pod.spec:
-                for volume in pod.spec.volumes or []:
-                    if volume.host_path:
-                        volume_id = self._build_id(
-                            "volume", metadata.namespace, f"{metadata.name}-{volume.name}"
-                        )
-                        self._add_asset(
-                            AssetNode(
-                                id=volume_id,
-                                type=NodeType.VOLUME,
-                                name=volume.name,
-                                namespace=metadata.namespace,
-                                criticality="MEDIUM",
-                                labels=[],
-                                metadata={
-                                    "cluster": self.cluster_name,
-                                    "hostPath": volume.host_path.path,
-                                },
-                                last_seen=datetime.utcnow(),
-                            )
-                        )
-                        self._add_edge(
-                            AttackEdge(
-                                source=pod_id,
-                                target=volume_id,
-                                technique=AttackTechnique.MOUNT_DISCOVERY.value,
-                                evidence=volume.host_path.path,
-                                confidence=0.6,
-                            )
-                        )
-                for container in (pod.spec.containers or []) + (pod.spec.init_containers or []):
-                    container_id = self._build_id(
-                        "container", metadata.namespace, f"{metadata.name}-{container.name}"
+            )
+        if spec:
+            for volume in spec.get("volumes") or []:
+                host_path = volume.get("hostPath")
+                if host_path:
+                    volume_id = self._build_id(
+                        "volume", namespace, f"{name}-{volume['name']}"
                     )
-                    self._add_asset(
-                        AssetNode(
-                            id=container_id,
-                            type=NodeType.CONTAINER,
-                            name=container.name,
-                            namespace=metadata.namespace,
+                    buffer.add_asset(
+                        AssetRecord(
+                            id=volume_id,
+                            type=NodeType.VOLUME,
+                            name=volume["name"],
+                            namespace=namespace,
                             criticality="MEDIUM",
-                            labels=[],
+                            labels=(),
+                            cluster=self.cluster_name,
                             metadata={
-                                "cluster": self.cluster_name,
-                                "image": container.image,
+                                "hostPath": intern(host_path.get("path")),
+                                "owner": pod_id,
                             },
-                            last_seen=datetime.utcnow(),
+                            last_seen=self.scan_time,
                         )
                     )
-                    self._add_edge(
-                        AttackEdge(
-                            source=container_id,
-                            target=pod_id,
-                            technique=AttackTechnique.BELONGS_TO.value,
-                            evidence="Container part of Pod",
-                            confidence=0.9,
+                    buffer.add_edge(
+                        EdgeRecord(
+                            source=pod_id,
+                            target=volume_id,
+                            technique=AttackTechnique.MOUNT_DISCOVERY.value,
+                            evidence=host_path.get("path"),
+                            confidence=0.6,
                         )
                     )
+            for container in (spec.get("containers") or []) + (spec.get("initContainers") or []):
+                container_id = self._build_id(
+                    "container", namespace, f"{name}-{container['name']}"
+                )
+                buffer.add_asset(
+                    AssetRecord(
+                        id=container_id,
+                        type=NodeType.CONTAINER,
+                        name=container["name"],
+                        namespace=namespace,
+                        criticality="MEDIUM",
+                        labels=(),
+                        cluster=self.cluster_name,
+                        metadata={
+                            "image": intern(container.get("image")),
+                            "owner": pod_id,
+                        },
+                        last_seen=self.scan_time,
+                    )
+                )
+                buffer.add_edge(
+                    EdgeRecord(
+                        source=container_id,
+                        target=pod_id,
+                        technique=AttackTechnique.BELONGS_TO.value,
+                        evidence="Container part of Pod",
+                        confidence=0.9,
+                    )
+                )
+
+        if spec and spec.get("serviceAccountName") and namespace:
+            sa_id = self._build_id(
+                "serviceaccount", namespace, spec["serviceAccountName"]
+            )
+            buffer.mounted_service_accounts[sa_id] = namespace
 
-            if pod.spec and pod.spec.service_account_name and pod.metadata.namespace:
-                sa_id = self._build_id(
-                    "serviceaccount", pod.metadata.namespace, pod.spec.service_account_name
+    def _service_account_secret_edges(
+        self, buffers: list[CollectionBuffer]
+    ) -> list[EdgeRecord]:
+        """Join phase: SA→secret edges need both the SA and the secret listings."""
+        sa_secrets: Dict[str, list[str]] = {}
+        secret_ids: set[str] = set()
+        for buffer in buffers:
+            sa_secrets.update(buffer.service_account_secrets)
+            secret_ids.update(buffer.secret_ids)
+        edges = []
+        for buffer in buffers:
+            for sa_id, namespace in buffer.mounted_service_accounts.items():
+                if sa_id not in sa_secrets:
+                    continue
+                for secret_name in sa_secrets[sa_id]:
+                    secret_id = self._build_id("secret", namespace, secret_name)
+                    if secret_id in secret_ids:
+                        edges.append(service_account_secret_edge(sa_id, secret_id))
+        return edges
+
+    def _list_paged(
+        self,
+        list_fn,
+        resource: str,
+        buffer: CollectionBuffer,
+        raw: bool | None = None,
+    ) -> Iterator:
+        """Yield items page by page using ``limit``/``continue``.
+
+        Only one page of deserialized objects is alive at a time, so peak memory
+        follows ``page_size`` rather than the size of the cluster. ``buffer`` is
+        flushed after every page.
+        """
+        continue_token = None
+        page = 0
+        total = 0
+        while True:
+            try:
+                items, list_meta = self._fetch_page(
+                    list_fn, continue_token, self.raw_listing if raw is None else raw
                 )
-                sa = self.assets.get(sa_id)
-                if sa:
-                    secrets = sa.metadata.get("secrets", [])
-                    for secret_name in secrets:
-                        secret_id = self._build_id("secret", pod.metadata.namespace, secret_name)
-                        if secret_id in self.assets:
-                            self._add_edge(
-                                AttackEdge(
-                                    source=sa_id,
-                                    target=secret_id,
-                                    technique=AttackTechnique.CLUSTER_CREDS.value,
-                                    evidence="SA token secret",
-                                    confidence=0.7,
-                                )
-                            )
-
-    def _add_asset(self, asset: AssetNode):
+            except ApiException as exc:
+                logger.error("Failed to list %s: %s", resource, exc)
+                # A partial listing must not become the base of an incremental run.
+                self.resource_versions.pop(resource, None)
+                return
+            page += 1
+            total += len(items)
+            continue_token = list_meta.get("continue")
+            if page == 1 and list_meta.get("resourceVersion"):
+                # Every page of a chunked list shares the first page's snapshot.
+                self.resource_versions[resource] = list_meta["resourceVersion"]
+            yield from items
+            del items
+            buffer.flush()
+            self._report(f"Listed {resource} page {page} ({total} total)")
+            if not continue_token:
+                return
+
+    def _fetch_page(
+        self, list_fn, continue_token: str | None, raw: bool
+    ) -> tuple[list[dict], dict]:
+        """Return one page of items and its list metadata as plain JSON dicts.
+
+        The raw path skips the client's V1 model deserialization entirely; the
+        model path is kept for comparison and for clients that need it.
+        """
+        if raw:
+            response = list_fn(
+                limit=self.page_size, _continue=continue_token, _preload_content=False
+            )
+            try:
+                data = orjson.loads(response.data)
+            finally:
+                response.release_conn()
+            return _list_items(data), data.get("metadata") or {}
+        response = list_fn(limit=self.page_size, _continue=continue_token)
+        sanitize = self.core_v1.api_client.sanitize_for_serialization
+        return (
+            [sanitize(item) for item in response.items or []],
+            sanitize(response.metadata) or {},
+        )
+
+    def _report(self, message: str):
+        logger.info("[%s] %s", self.cluster_name, message)
+        if self.progress:
+            self.progress(message)
+
+    def _add_asset(self, asset: AssetRecord):
         self.assets[asset.id] = asset
 
-    def _add_edge(self, edge: AttackEdge):
-        key = (edge.source, edge.target, str(edge.technique))
+    def _add_edge(self, edge: EdgeRecord):
+        key = edge.key
         if key in self.edge_keys:
             return
         self.edge_keys.add(key)
@@ -333,7 +713,40 @@ class KubernetesCollector:
         return f"{self.cluster_name}:{resource}:{ns}:{name}"
 
 
-def _labels_to_list(labels: dict | None) -> list[str]:
-    if not labels:
-        return []
-    return [f"{key}={value}" for key, value in labels.items()]
+def asset_resource(asset_id: str, cluster: str) -> str:
+    """Resource of an asset id of ``cluster``.
+
+    Parsed after the cluster prefix, as cluster names may contain ':'.
+    Credential ids append ``:credential`` to their secret's id.
+    """
+    resource, _namespace, _name, *suffix = asset_id[len(cluster) + 1 :].split(":")
+    return suffix[0] if suffix else resource
+
+
+def service_account_secret_edge(sa_id: str, secret_id: str) -> EdgeRecord:
+    return EdgeRecord(
+        source=sa_id,
+        target=secret_id,
+        technique=AttackTechnique.CLUSTER_CREDS.value,
+        evidence="SA token secret",
+        confidence=0.7,
+    )
+
+
+def _list_items(data: dict) -> list[dict]:
+    """Items of a list response, turning metadata-only secret tables into secrets."""
+    if data.get("kind") != "Table":
+        return data.get("items") or []
+    columns = [column.get("name") for column in data.get("columnDefinitions") or []]
+    type_column = columns.index("Type") if "Type" in columns else SECRET_TYPE_COLUMN
+    items = []
+    for row in data.get("rows") or []:
+        cells = row.get("cells") or []
+        items.append(
+            {
+                "metadata": (row.get("object") or {}).get("metadata"),
+                "type": cells[type_column] if len(cells) > type_column else None,
+            }
+        )
+    return items
+
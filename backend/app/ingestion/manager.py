@@ -12,6 +12,7 @@ import yaml
 from fastapi import UploadFile
 
 from app.core.logger import logger
+from app.core.metrics import INGESTION_JOBS
 from app.ingestion.models import (
     IngestionJob,
     IngestionJobStatus,
@@ -77,13 +78,44 @@ class KubeconfigRegistry:
         return self.kubeconfig_dir / f"{config_id}.meta.json"
 
 
+class ResourceVersionStore:
+    """Last collected resourceVersion per resource kind, one file per kubeconfig."""
+
+    def __init__(self, state_dir: Path):
+        self.state_dir = state_dir
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+
+    def load(self, config_id: str) -> dict[str, str]:
+        path = self._path(config_id)
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as exc:  # pragma: no cover
+            logger.warning("Ignoring corrupt resource versions %s: %s", path, exc)
+            return {}
+
+    def save(self, config_id: str, versions: dict[str, str]) -> None:
+        with self._lock:
+            self._path(config_id).write_text(json.dumps(versions), encoding="utf-8")
+
+    def _path(self, config_id: str) -> Path:
+        return self.state_dir / f"{config_id}.json"
+
+
 class IngestionJobStore:
     def __init__(self, retention_hours: int = 24):
         self._jobs: Dict[str, dict] = {}
         self._lock = Lock()
         self._retention = timedelta(hours=retention_hours)
 
-    def create(self, config: KubeConfigInfo, mode: IngestionMode) -> IngestionJob:
+    def create(
+        self,
+        config: KubeConfigInfo,
+        mode: IngestionMode,
+        resumed_from: str | None = None,
+    ) -> IngestionJob:
         job_id = str(uuid.uuid4())
         job = {
             "id": job_id,
@@ -95,6 +127,8 @@ class IngestionJobStore:
             "started_at": None,
             "finished_at": None,
             "logs": [],
+            "timings": {},
+            "resumed_from": resumed_from,
         }
         with self._lock:
             self._jobs[job_id] = job
@@ -112,6 +146,8 @@ class IngestionJobStore:
         with self._lock:
             job = self._require(job_id)
             job["status"] = status
+            if status in (IngestionJobStatus.SUCCEEDED, IngestionJobStatus.FAILED):
+                INGESTION_JOBS.labels(job["mode"].value, status.value).inc()
             if started_at:
                 job["started_at"] = started_at
             if finished_at:
@@ -122,6 +158,11 @@ class IngestionJobStore:
             job = self._require(job_id)
             job["logs"].append(f"{datetime.utcnow().isoformat()} {message}")
 
+    def record_timings(self, job_id: str, timings: dict[str, float]):
+        with self._lock:
+            job = self._require(job_id)
+            job["timings"] = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+
     def get(self, job_id: str) -> IngestionJob:
         with self._lock:
             job = self._require(job_id)
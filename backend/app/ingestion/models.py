@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import List
 
 from pydantic import BaseModel, Field, ConfigDict
 
-from app.models.domain import AssetNode, AttackEdge
+from app.ingestion.records import AssetRecord, EdgeRecord
 
 
 class IngestionMode(str, Enum):
@@ -38,6 +39,10 @@ class IngestionJob(BaseModel):
     started_at: datetime | None = None
     finished_at: datetime | None = None
     logs: list[str] = Field(default_factory=list)
+    # Seconds spent per pipeline stage (collect, write, backpressure, ...).
+    timings: dict[str, float] = Field(default_factory=dict)
+    # Failed job whose checkpoint this job resumed.
+    resumed_from: str | None = None
 
 
 class IngestionRunRequest(BaseModel):
@@ -47,9 +52,21 @@ class IngestionRunRequest(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
 
-class IngestionResult(BaseModel):
-    assets: list[AssetNode]
-    relationships: list[AttackEdge]
+# Collector output stays internal to ingestion, so these are plain dataclasses
+# over slot records rather than validated pydantic models.
+@dataclass
+class IngestionResult:
+    assets: list[AssetRecord]
+    relationships: list[EdgeRecord]
+
+
+@dataclass
+class IngestionDelta:
+    assets: list[AssetRecord] = field(default_factory=list)
+    relationships: list[EdgeRecord] = field(default_factory=list)
+    deleted_ids: list[str] = field(default_factory=list)
+    # ServiceAccounts mounted by changed pods; their SA→secret edges are re-linked.
+    mounted_service_accounts: list[str] = field(default_factory=list)
 
 
 class CypherQueryRequest(BaseModel):
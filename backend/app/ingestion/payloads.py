@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import datetime
+from functools import lru_cache
+
+from app.ingestion.records import AssetRecord, EdgeRecord
+
+# Property flattening shared by the transactional writer and the offline CSV
+# export, so both produce the same Asset nodes and ATTACK_REL edges.
+
+
+def node_to_payload(node: AssetRecord) -> dict:
+    props = {
+        "id": node.id,
+        "name": node.name,
+        "namespace": node.namespace,
+        "type": node.type.value,
+        "criticality": node.criticality,
+        "labels": list(node.labels),
+        "lastSeen": isoformat(node.last_seen),
+        "cluster": node.cluster,
+        "meta_cluster": node.cluster,
+    }
+    for key, value in node.metadata:
+        if key == "owner":
+            # Only kept to find a changed object's children; not shown as metadata.
+            props["owner"] = value
+        else:
+            props[f"meta_{key}"] = value
+    return {"id": node.id, "props": props}
+
+
+def edge_to_payload(edge: EdgeRecord) -> dict:
+    return {
+        "source": edge.source,
+        "target": edge.target,
+        "technique": edge.technique,
+        "evidence": edge.evidence,
+        "confidence": edge.confidence,
+        "sequence": edge.sequence,
+        "discoveredAt": None,
+    }
+
+
+@lru_cache(maxsize=8)
+def isoformat(value: datetime | None) -> str | None:
+    # Records of a run share one scan timestamp; format it once.
+    return value.isoformat() if value else None
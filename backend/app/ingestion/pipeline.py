@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import count
+from queue import Empty, Full, Queue
+from threading import Condition, Event, Lock, Thread
+from time import perf_counter
+from typing import Callable
+
+from app.core.logger import logger
+from app.ingestion.checkpoints import IngestionCheckpoint
+from app.ingestion.collectors import KubernetesCollector, ProgressCallback
+from app.ingestion.models import IngestionMode
+from app.ingestion.records import AssetRecord, EdgeRecord
+from app.ingestion.writer import GraphWriter, edge_partition_key
+from app.repositories.generation_repository import Generation
+
+_STOP = object()
+
+# Edges held back for missing endpoints before they are queued again.
+DEFERRED_EDGE_LIMIT = 50_000
+
+
+@dataclass
+class PipelineStats:
+    nodes: int = 0
+    edges: int = 0
+    batches: int = 0
+    dropped_edges: int = 0
+    deferred_edges_peak: int = 0
+    swept_nodes: int = 0
+    swept_edges: int = 0
+    rows_per_second: float = 0.0
+    timings: dict[str, float] = field(default_factory=dict)
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def add_time(self, stage: str, seconds: float):
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def add_batch(self, *, nodes: int = 0, edges: int = 0):
+        with self._lock:
+            self.nodes += nodes
+            self.edges += edges
+            self.batches += 1
+
+
+class IngestionPipeline:
+    """Collect → write with bounded queues between the two stages.
+
+    Collector threads push node and edge batches into one queue ("lane") per
+    writer worker while the workers drain them, each in its own session, so
+    the apiserver and Neo4j are busy at the same time. Node batches go
+    round-robin; edges are partitioned on their hub endpoint
+    (``edge_partition_key``) so edges sharing e.g. the master node are written
+    by one worker instead of every worker queueing on that node's lock. Their
+    other endpoint (a pod, say) can still be locked by several workers in
+    different orders, so deadlocks are rarer, not impossible; the writer
+    retries the batch Neo4j aborts to break one. Batch sizes adapt to the
+    writer's measured latency. A full lane blocks the collector
+    (backpressure), which keeps memory at roughly ``queue_size`` batches.
+    An edge batch is written only after every node batch queued before it.
+    Edges whose endpoints another listing has not delivered yet are held
+    back and queued again whenever ``deferred_limit`` more of them have piled
+    up since the last retry, and once more after the collection has
+    finished; those still missing then are dropped. Until their endpoints
+    are listed such edges have to be held somewhere, so they are the floor
+    of what is deferred.
+
+    With a checkpoint every batch is saved before it is queued and marked
+    committed once written, so ``resume()`` can finish a failed run.
+
+    FULL runs write a new graph generation next to the current one, which
+    readers keep seeing until the write has completed. Only then is the new
+    generation made current and the old one swept; a failed run leaves the
+    current generation untouched.
+    """
+
+    def __init__(
+        self,
+        writer: GraphWriter,
+        *,
+        queue_size: int = 64,
+        workers: int = 2,
+        deferred_limit: int = DEFERRED_EDGE_LIMIT,
+        progress: ProgressCallback | None = None,
+    ):
+        self.writer = writer
+        self.queue_size = queue_size
+        self.workers = workers
+        self.deferred_limit = deferred_limit
+        self.progress = progress
+
+    def run(
+        self,
+        collector: KubernetesCollector,
+        *,
+        cluster: str,
+        mode: IngestionMode,
+        checkpoint: IngestionCheckpoint | None = None,
+    ) -> PipelineStats:
+        """Collect and write a cluster, recording every batch in ``checkpoint`` if given.
+
+        When the write stage fails with a checkpoint, the collection still runs
+        to completion into the checkpoint so the job can be resumed later.
+        """
+        self.writer.ensure_schema()
+        generation = self.writer.target_generation(cluster, mode)
+        if checkpoint:
+            checkpoint.set_generation(generation.number)
+
+        def produce(submit: Callable[[str, list, int | None], None]):
+            def sink(assets: list[AssetRecord], edges: list[EdgeRecord]):
+                for chunk in self.writer.node_batches.chunks(assets):
+                    submit("nodes", chunk, None)
+                partitions: list[list[EdgeRecord]] = [[] for _ in range(self.workers)]
+                for edge in edges:
+                    partitions[hash(edge_partition_key(edge, cluster)) % self.workers].append(edge)
+                for partition in partitions:
+                    for chunk in self.writer.edge_batches.chunks(partition):
+                        submit("edges", chunk, None)
+
+            collector.stream(sink)
+            if checkpoint:
+                checkpoint.mark_collected(collector.resource_versions)
+
+        return self._execute(produce, generation, checkpoint)
+
+    def resume(self, checkpoint: IngestionCheckpoint) -> PipelineStats:
+        """Write the batches of a collected checkpoint that were not committed yet."""
+        self.writer.ensure_schema()
+        generation = Generation(checkpoint.meta["cluster"], checkpoint.meta["generation"])
+        committed, total = checkpoint.progress()
+        if self.progress:
+            self.progress(
+                f"Resuming generation {generation.number}: {committed} of {total} "
+                "batches already committed"
+            )
+
+        def produce(submit: Callable[[str, list, int | None], None]):
+            for seq, kind, batch in checkpoint.pending_batches():
+                submit(kind, batch, seq)
+
+        return self._execute(produce, generation, checkpoint)
+
+    def _execute(
+        self,
+        produce: Callable[[Callable[[str, list, int | None], None]], None],
+        generation: Generation,
+        checkpoint: IngestionCheckpoint | None,
+    ) -> PipelineStats:
+        stats = PipelineStats()
+        started = perf_counter()
+
+        lanes: list[Queue] = [
+            Queue(maxsize=max(1, self.queue_size // self.workers))
+            for _ in range(self.workers)
+        ]
+        next_lane = count()
+        failed = Event()
+        errors: list[BaseException] = []
+        # Node batches are numbered as they are queued. An edge batch carries
+        # the number of node batches queued before it and is only written once
+        # all of those are, so its endpoints exist unless they were never
+        # collected or are still being listed.
+        queue_lock = Lock()
+        nodes_queued = 0
+        nodes_written: set[int] = set()
+        written_below = 0
+        progress = Condition()
+        # (node batches queued by then, checkpoint sequence, edges) whose
+        # endpoints were missing when written.
+        deferred: list[tuple[int, int | None, list[EdgeRecord]]] = []
+        deferred_rows = 0
+        # Held rows that trigger the next retry: ``deferred_limit`` more than
+        # the last retry took, so edges that keep failing are not retried
+        # on every batch.
+        retry_above = self.deferred_limit
+        deferred_lock = Lock()
+        # Set once every batch is written; edges still missing then are dropped.
+        finishing = Event()
+
+        def node_batch_written(ticket: int):
+            nonlocal written_below
+            with progress:
+                nodes_written.add(ticket)
+                while written_below in nodes_written:
+                    nodes_written.remove(written_below)
+                    written_below += 1
+                progress.notify_all()
+
+        def wait_for_nodes(ticket: int):
+            with progress:
+                while written_below < ticket and not failed.is_set():
+                    progress.wait(timeout=0.5)
+
+        def defer(seq: int | None, missing: list[EdgeRecord]):
+            nonlocal deferred_rows
+            if finishing.is_set():
+                with deferred_lock:
+                    stats.dropped_edges += len(missing)
+                return
+            # Saved as a batch of its own before the original batch counts
+            # as committed.
+            retry_seq = checkpoint.add_batch("edges", missing) if checkpoint else None
+            with deferred_lock:
+                deferred.append((nodes_queued, retry_seq, missing))
+                deferred_rows += len(missing)
+                stats.deferred_edges_peak = max(stats.deferred_edges_peak, deferred_rows)
+
+        def take_deferred(final: bool = False) -> list[tuple[int | None, list[EdgeRecord]]]:
+            """Deferred edges worth another try, once enough have piled up.
+
+            Only edges for which a node batch queued after they failed has been
+            written since are taken; trying the others again cannot succeed.
+            """
+            nonlocal deferred_rows, retry_above
+            with deferred_lock:
+                if not final and deferred_rows <= retry_above:
+                    return []
+                taken, kept = [], []
+                for entry in deferred:
+                    (taken if entry[0] < written_below else kept).append(entry)
+                deferred[:] = kept
+                taken_rows = sum(len(edges) for _, _, edges in taken)
+                deferred_rows -= taken_rows
+                retry_above = taken_rows + self.deferred_limit
+            return [(seq, edges) for _, seq, edges in taken]
+
+        def drain(queue: Queue):
+            while True:
+                try:
+                    item = queue.get(timeout=0.5)
+                except Empty:
+                    continue
+                if item is _STOP:
+                    return
+                try:
+                    if not failed.is_set():
+                        write(*item)
+                finally:
+                    queue.task_done()
+
+        def write(kind: str, batch: list, seq: int | None, ticket: int):
+            batch_started = perf_counter()
+            try:
+                if kind == "nodes":
+                    self.writer.write_node_batch(batch, generation)
+                    stats.add_batch(nodes=len(batch))
+                    node_batch_written(ticket)
+                else:
+                    wait_for_nodes(ticket)
+                    if failed.is_set():
+                        return
+                    batch_started = perf_counter()
+                    missing = self.writer.write_edge_batch(batch, generation)
+                    stats.add_batch(edges=len(batch) - len(missing))
+                    if missing:
+                        defer(seq, missing)
+                if checkpoint:
+                    checkpoint.commit(seq)
+            except BaseException as exc:  # noqa: BLE001 - surfaced by _execute()
+                errors.append(exc)
+                failed.set()
+                with progress:
+                    progress.notify_all()
+            finally:
+                stats.add_time("write", perf_counter() - batch_started)
+
+        def enqueue(kind: str, batch: list, seq: int | None):
+            nonlocal nodes_queued
+            if seq is None and checkpoint:
+                seq = checkpoint.add_batch(kind, batch)
+            if failed.is_set():
+                if checkpoint:
+                    # Keep collecting into the checkpoint only.
+                    return
+                raise RuntimeError("Graph writer stage failed") from errors[0]
+            blocked_since = perf_counter()
+            # Numbering and queueing happen together, so every batch an edge
+            # batch waits for sits ahead of it in its lane.
+            with queue_lock:
+                if kind == "nodes":
+                    lane = lanes[next(next_lane) % len(lanes)]
+                    ticket = nodes_queued
+                    nodes_queued += 1
+                else:
+                    # Every edge of a batch shares its partition.
+                    partition = edge_partition_key(batch[0], generation.cluster)
+                    lane = lanes[hash(partition) % len(lanes)]
+                    ticket = nodes_queued
+                while not failed.is_set():
+                    try:
+                        lane.put((kind, batch, seq, ticket), timeout=0.5)
+                        break
+                    except Full:
+                        continue
+            stats.add_time("backpressure", perf_counter() - blocked_since)
+
+        def submit(kind: str, batch: list, seq: int | None):
+            enqueue(kind, batch, seq)
+            # Edges whose endpoints were still being listed go round again
+            # once too many have piled up.
+            for retry_seq, edges in take_deferred():
+                enqueue("edges", edges, retry_seq)
+
+        def wait_until_written():
+            for lane in lanes:
+                lane.join()
+
+        threads = [
+            Thread(target=drain, args=(lane,), name=f"graph-writer-{index}", daemon=True)
+            for index, lane in enumerate(lanes)
+        ]
+        for thread in threads:
+            thread.start()
+        collect_started = perf_counter()
+        try:
+            try:
+                produce(submit)
+            finally:
+                stats.add_time("collect", perf_counter() - collect_started)
+            if not failed.is_set():
+                drain_started = perf_counter()
+                wait_until_written()
+                finishing.set()
+                for retry_seq, edges in take_deferred(final=True):
+                    enqueue("edges", edges, retry_seq)
+                # What is left failed after the last node batch was written.
+                for _, retry_seq, edges in deferred:
+                    stats.dropped_edges += len(edges)
+                    if checkpoint and retry_seq is not None:
+                        checkpoint.commit(retry_seq)
+                wait_until_written()
+                stats.add_time("drain", perf_counter() - drain_started)
+        except RuntimeError as exc:
+            # submit() stopped the collection because a writer failed; that
+            # writer's error is the one to report.
+            if not errors or exc.__cause__ is not errors[0]:
+                raise
+        finally:
+            for lane in lanes:
+                lane.put(_STOP)
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+        write_seconds = perf_counter() - collect_started
+        if write_seconds > 0:
+            stats.rows_per_second = (stats.nodes + stats.edges) / write_seconds
+        sweep_started = perf_counter()
+        stats.swept_nodes, stats.swept_edges = self.writer.publish_generation(generation)
+        stats.add_time("sweep", perf_counter() - sweep_started)
+        stats.add_time("total", perf_counter() - started)
+
+        logger.info(
+            "Pipeline wrote %s nodes and %s edges for cluster %s in %s batches "
+            "at %.0f rows/s (%s)",
+            stats.nodes,
+            stats.edges,
+            generation.cluster,
+            stats.batches,
+            stats.rows_per_second,
+            _format_timings(stats.timings),
+        )
+        if self.progress:
+            self.progress(
+                f"Wrote {stats.nodes} nodes and {stats.edges} edges in {stats.batches} "
+                f"batches; {stats.dropped_edges} edges without endpoints dropped"
+            )
+            self.progress(
+                f"Write throughput {stats.rows_per_second:.0f} rows/s with "
+                f"{len(lanes)} writers; final batch sizes "
+                f"{self.writer.node_batches.size} nodes / {self.writer.edge_batches.size} edges"
+            )
+            self.progress(
+                f"Published generation {generation.number}; swept {stats.swept_nodes} "
+                f"stale nodes and {stats.swept_edges} stale edges"
+            )
+            self.progress(f"Stage timings: {_format_timings(stats.timings)}")
+        return stats
+
+
+def _format_timings(timings: dict[str, float]) -> str:
+    return ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in timings.items())
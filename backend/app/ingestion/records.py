@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import sys
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from app.models.domain import AttackTechnique, NodeType
+
+
+class AssetRecord:
+    """Compact collector→writer form of an asset.
+
+    Collections hold hundreds of thousands of these, so they use ``__slots__``,
+    interned strings, a shared scan timestamp and a tuple of metadata pairs
+    instead of full ``AssetNode`` models. ``None`` metadata values are dropped,
+    as the writer never stores them.
+    """
+
+    __slots__ = (
+        "id",
+        "type",
+        "name",
+        "namespace",
+        "criticality",
+        "labels",
+        "cluster",
+        "last_seen",
+        "metadata",
+    )
+
+    def __init__(
+        self,
+        *,
+        id: str,
+        type: NodeType,
+        name: str,
+        namespace: str | None,
+        criticality: str,
+        labels: tuple[str, ...],
+        cluster: str,
+        last_seen: datetime | None,
+        metadata: dict[str, Any] | None = None,
+    ):
+        self.id = id
+        self.type = type
+        self.name = name
+        self.namespace = sys.intern(namespace) if namespace else None
+        self.criticality = criticality
+        self.labels = labels
+        self.cluster = cluster
+        self.last_seen = last_seen
+        self.metadata = tuple(
+            (key, value) for key, value in (metadata or {}).items() if value is not None
+        )
+
+    def meta(self, key: str, default: Any = None) -> Any:
+        for name, value in self.metadata:
+            if name == key:
+                return value
+        return default
+
+    def __repr__(self) -> str:
+        return f"AssetRecord({self.id!r}, {self.type.value})"
+
+
+class EdgeRecord:
+    """Compact collector→writer form of an ``ATTACK_REL`` edge."""
+
+    __slots__ = ("source", "target", "technique", "evidence", "confidence", "sequence")
+
+    def __init__(
+        self,
+        *,
+        source: str,
+        target: str,
+        technique: AttackTechnique | str,
+        evidence: str | None = None,
+        confidence: float | None = None,
+        sequence: int | None = None,
+    ):
+        self.source = source
+        self.target = target
+        self.technique = (
+            technique.value if isinstance(technique, AttackTechnique) else technique
+        )
+        self.evidence = evidence
+        self.confidence = confidence
+        self.sequence = sequence
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return (self.source, self.target, self.technique)
+
+    def __repr__(self) -> str:
+        return f"EdgeRecord({self.source!r} -> {self.target!r}, {self.technique})"
+
+
+def intern(value: str | None) -> str | None:
+    """Intern a value that repeats across objects (images, node names, secret types)."""
+    return sys.intern(value) if value else value
+
+
+def labels_to_tuple(labels: dict | None) -> tuple[str, ...]:
+    """Format ``k=v`` labels, interning them since most values repeat across objects."""
+    if not labels:
+        return ()
+    return tuple(sys.intern(f"{key}={value}") for key, value in labels.items())
+
+
+# Compact list rows used for on-disk snapshots of a collection.
+
+
+def asset_to_row(asset: AssetRecord) -> list:
+    return [
+        asset.id,
+        asset.type.value,
+        asset.name,
+        asset.namespace,
+        asset.criticality,
+        asset.labels,
+        asset.cluster,
+        asset.last_seen,
+        asset.metadata,
+    ]
+
+
+def asset_from_row(row: list) -> AssetRecord:
+    last_seen = _parse_time(row[7]) if row[7] else None
+    return AssetRecord(
+        id=row[0],
+        type=NodeType(row[1]),
+        name=row[2],
+        namespace=row[3],
+        criticality=row[4],
+        labels=tuple(sys.intern(label) for label in row[5]),
+        cluster=sys.intern(row[6]),
+        last_seen=last_seen,
+        metadata=dict(row[8]),
+    )
+
+
+@lru_cache(maxsize=8)
+def _parse_time(value: str) -> datetime:
+    # Rows of one snapshot share their scan timestamp; keep sharing one object.
+    return datetime.fromisoformat(value)
+
+
+def edge_to_row(edge: EdgeRecord) -> list:
+    return [
+        edge.source,
+        edge.target,
+        edge.technique,
+        edge.evidence,
+        edge.confidence,
+        edge.sequence,
+    ]
+
+
+def edge_from_row(row: list) -> EdgeRecord:
+    return EdgeRecord(
+        source=row[0],
+        target=row[1],
+        technique=row[2],
+        evidence=row[3],
+        confidence=row[4],
+        sequence=row[5],
+    )
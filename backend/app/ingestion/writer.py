@@ -1,15 +1,112 @@
 from __future__ import annotations
 
+import random
 from itertools import islice
-from typing import Iterable, List
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Any, Iterable, Iterator, List
 
+import orjson
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+
+from app.config import get_settings
 from app.core.logger import logger
-from app.ingestion.models import IngestionMode, IngestionResult
-from app.models.domain import AssetNode, AttackEdge
+from app.core.metrics import (
+    INGESTION_BATCHES,
+    INGESTION_ROWS,
+    INGESTION_WRITE_FAILURES,
+    INGESTION_WRITE_RETRIES,
+)
+from app.graph.engine import AttackGraph
+from app.graph.risk import risk_scores
+from app.ingestion.collectors import asset_resource, service_account_secret_edge
+from app.ingestion.models import IngestionDelta, IngestionMode, IngestionResult
+from app.ingestion.payloads import edge_to_payload, node_to_payload
+from app.ingestion.records import AssetRecord, EdgeRecord
+from app.models.domain import NodeType
+from app.repositories.choke_point_repository import choke_point_repository
+from app.repositories.generation_repository import Generation, generation_repository
+from app.repositories.graph_repository import attack_graph_repository
 from app.repositories.neo4j_client import neo4j_client
+from app.repositories.schema_repository import schema_repository
+
+NODE_BATCH_SIZE = 100
+EDGE_BATCH_SIZE = 200
+SWEEP_BATCH_SIZE = 1000
+RISK_BATCH_SIZE = 5000
+MIN_BATCH_SIZE = 10
+MAX_BATCH_SIZE = 10_000
+# Attempts per batch for errors worth retrying: deadlocks and other transient
+# errors, a lost connection or a cluster leader switch. The driver already
+# retries inside a transaction function; these outlast a longer outage.
+WRITE_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 0.5
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+
+# Endpoints shared by many edges. Edges are partitioned on them so concurrent
+# write transactions do not all contend for the same hub node's lock. The
+# non-hub endpoint may sit in several partitions, so deadlocks between
+# workers remain possible and are retried like any transient error.
+HUB_RESOURCES = frozenset({"master", "node", "serviceaccount", "secret"})
+
+
+class AdaptiveBatchSize:
+    """Batch size steered by measured transaction latency and payload size.
+
+    After every batch the size moves halfway towards the number of rows that
+    would take ``target_seconds`` and stay under ``max_bytes``, growing at most
+    twofold per step.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        target_seconds: float = 0.5,
+        max_bytes: int = 4_000_000,
+        minimum: int = MIN_BATCH_SIZE,
+        maximum: int = MAX_BATCH_SIZE,
+    ):
+        self.size = initial
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.minimum = minimum
+        self.maximum = maximum
+        self._lock = Lock()
+
+    def record(self, rows: int, seconds: float, payload_bytes: int) -> None:
+        if not rows:
+            return
+        ideal = float(self.maximum)
+        if seconds > 0:
+            ideal = min(ideal, rows * self.target_seconds / seconds)
+        if payload_bytes > 0:
+            ideal = min(ideal, rows * self.max_bytes / payload_bytes)
+        with self._lock:
+            size = min(self.size * 2, (self.size + ideal) / 2)
+            self.size = round(max(self.minimum, min(self.maximum, size)))
+
+    def chunks(self, items: Iterable) -> Iterator[list]:
+        """Like ``chunked`` but re-reads the current size for every batch."""
+        iterator = iter(items)
+        while True:
+            batch = list(islice(iterator, self.size))
+            if not batch:
+                break
+            yield batch
 
 
 class GraphWriter:
+    def __init__(
+        self, *, target_seconds: float = 0.5, max_batch_bytes: int = 4_000_000
+    ):
+        self.node_batches = AdaptiveBatchSize(
+            NODE_BATCH_SIZE, target_seconds=target_seconds, max_bytes=max_batch_bytes
+        )
+        self.edge_batches = AdaptiveBatchSize(
+            EDGE_BATCH_SIZE, target_seconds=target_seconds, max_bytes=max_batch_bytes
+        )
+
     def write(
         self,
         *,
@@ -23,73 +120,363 @@ class GraphWriter:
             len(result.relationships),
             cluster,
         )
-        if mode == IngestionMode.FULL:
-            neo4j_client.write(
-                "MATCH (n:Asset {cluster: $cluster}) DETACH DELETE n",
-                {"cluster": cluster},
+        self.ensure_schema()
+        generation = self.target_generation(cluster, mode)
+        self._write_nodes(result.assets, generation)
+        self._write_edges(result.relationships, generation)
+        self.publish_generation(generation)
+
+    def ensure_schema(self) -> None:
+        schema_repository.ensure()
+
+    def target_generation(self, cluster: str, mode: IngestionMode) -> Generation:
+        """FULL runs write a fresh generation; incremental ones update the current one."""
+        current = generation_repository.current(cluster)
+        if mode == IngestionMode.FULL or current is None:
+            return Generation(cluster, generation_repository.begin(cluster))
+        return Generation(cluster, current)
+
+    def publish_generation(self, generation: Generation) -> tuple[int, int]:
+        """Make ``generation`` current, then collect the cluster's other generations.
+
+        Returns the number of collected nodes and edges; nothing is collected
+        when ``generation`` already was the current one and nothing else exists.
+        """
+        if generation_repository.current(generation.cluster) != generation.number:
+            generation_repository.activate(generation.cluster, generation.number)
+        swept = self.sweep_cluster(generation)
+        graph = self._read_snapshot(generation)
+        self.score_risk(generation, graph)
+        if get_settings().graph_engine_enabled:
+            choke_point_repository.refresh(generation.key, graph)
+        return swept
+
+    def sweep_cluster(self, generation: Generation) -> tuple[int, int]:
+        """Delete the cluster's nodes and edges outside ``generation``.
+
+        Deletes ``SWEEP_BATCH_SIZE`` rows per transaction until none are left,
+        so neither one transaction nor this process has to hold the whole old
+        generation. Returns the number of swept nodes and edges.
+        """
+        params = {"cluster": generation.cluster, "genKey": generation.key}
+        stale_edges = self._delete_in_batches(
+            """
+            MATCH (n:Asset {cluster: $cluster})-[r:ATTACK_REL]->()
+            WHERE n.genKey <> $genKey
+            WITH r LIMIT $limit
+            DELETE r
+            RETURN count(*) AS deleted
+            """,
+            params,
+        )
+        stale_nodes = self._delete_in_batches(
+            """
+            MATCH (n:Asset {cluster: $cluster})
+            WHERE n.genKey <> $genKey
+            WITH n LIMIT $limit
+            DETACH DELETE n
+            RETURN count(*) AS deleted
+            """,
+            params,
+        )
+        if stale_nodes or stale_edges:
+            logger.info(
+                "Swept %s stale nodes and %s stale edges for cluster %s",
+                stale_nodes,
+                stale_edges,
+                generation.cluster,
+            )
+        return stale_nodes, stale_edges
+
+    def _delete_in_batches(self, query: str, parameters: dict[str, Any]) -> int:
+        """Run a ``LIMIT $limit`` delete until it deletes nothing; returns the total."""
+        total = 0
+        while True:
+            records = self._write_with_retry(
+                query, {**parameters, "limit": SWEEP_BATCH_SIZE}, "ingestion.sweep"
             )
-        self._write_nodes(result.assets)
-        self._write_edges(result.relationships)
+            deleted = records[0]["deleted"] if records else 0
+            total += deleted
+            if deleted < SWEEP_BATCH_SIZE:
+                return total
 
-    def _write_nodes(self, nodes: list[AssetNode]):
-        for chunk in _chunk(nodes, 100):
-            payload = [self._node_to_payload(node) for node in chunk]
-            neo4j_client.write(
+    def apply_delta(self, *, delta: IngestionDelta, cluster: str) -> None:
+        logger.info(
+            "Applying %s changed assets, %s relationships and %s deletions for cluster %s",
+            len(delta.assets),
+            len(delta.relationships),
+            len(delta.deleted_ids),
+            cluster,
+        )
+        self.ensure_schema()
+        # Deltas are small, so they are applied to the current generation in place.
+        generation = self.target_generation(cluster, IngestionMode.INCREMENTAL)
+        self._delete_nodes(delta.deleted_ids, generation)
+        self._write_nodes(delta.assets, generation)
+        self._write_edges(delta.relationships, generation)
+        self._prune_owned(delta.assets, generation)
+        self._link_service_accounts(delta, generation)
+        if generation_repository.current(cluster) != generation.number:
+            generation_repository.activate(cluster, generation.number)
+        graph = self._read_snapshot(generation)
+        self.score_risk(generation, graph)
+        if get_settings().graph_engine_enabled:
+            choke_point_repository.refresh(generation.key, graph)
+
+    def _read_snapshot(self, generation: Generation) -> AttackGraph | None:
+        """Reload ``generation``'s in-memory snapshot, or read one just for this
+        write when the graph engine keeps none; None if too large or unreadable."""
+        if get_settings().graph_engine_enabled:
+            return attack_graph_repository.refresh(generation.key)
+        try:
+            return attack_graph_repository.snapshot(generation.key)
+        except Exception as exc:  # noqa: BLE001 - the graph itself is written
+            logger.warning("Reading attack graph %s failed: %s", generation.key, exc)
+            return None
+
+    def score_risk(self, generation: Generation, graph: AttackGraph | None) -> None:
+        """Store every node's ``riskScore`` from ``graph``; never fails the caller.
+
+        Scores change wherever a write changed what lies downstream, so the
+        whole generation is scored from its graph snapshot each time.
+        """
+        if graph is None:
+            logger.info("No snapshot of %s to score risk from", generation.key)
+            return
+        started = perf_counter()
+        try:
+            settings = get_settings()
+            scores = risk_scores(
+                graph, damping=settings.risk_damping, max_hops=settings.risk_max_hops
+            )
+            rows = [
+                {"id": node_id, "score": round(score, 3)}
+                for node_id, score in zip(graph.ids, scores.tolist())
+            ]
+            for chunk in chunked(rows, RISK_BATCH_SIZE):
+                self._write_with_retry(
+                    """
+                    UNWIND $batch AS row
+                    MATCH (n:Asset {genKey: $genKey, id: row.id})
+                    SET n.riskScore = row.score
+                    """,
+                    {"batch": chunk, "genKey": generation.key},
+                    "ingestion.risk_scores",
+                )
+        except Exception as exc:  # noqa: BLE001 - the graph itself is written
+            logger.warning("Scoring risk of %s failed: %s", generation.key, exc)
+            return
+        logger.info(
+            "Scored risk of %s assets in %s in %.2fs",
+            len(rows),
+            generation.key,
+            perf_counter() - started,
+        )
+
+    def _delete_nodes(self, asset_ids: list[str], generation: Generation):
+        for chunk in chunked(asset_ids, NODE_BATCH_SIZE):
+            self._write_with_retry(
+                """
+                UNWIND $ids AS assetId
+                MATCH (n:Asset {genKey: $genKey, id: assetId})
+                OPTIONAL MATCH (child:Asset {genKey: $genKey, owner: assetId})
+                WITH n, collect(child) AS children
+                FOREACH (c IN children | DETACH DELETE c)
+                DETACH DELETE n
+                """,
+                {"ids": chunk, "genKey": generation.key},
+                "ingestion.delete_nodes",
+            )
+
+    def _prune_owned(self, assets: list[AssetRecord], generation: Generation):
+        """Drop containers/volumes/credentials a modified object no longer owns."""
+        owned: dict[str, list[str]] = {
+            asset.id: []
+            for asset in assets
+            if asset.type in (NodeType.POD, NodeType.SECRET)
+        }
+        for asset in assets:
+            owner = asset.meta("owner")
+            if owner in owned:
+                owned[owner].append(asset.id)
+        rows = [{"owner": owner, "children": children} for owner, children in owned.items()]
+        for chunk in chunked(rows, NODE_BATCH_SIZE):
+            self._write_with_retry(
                 """
                 UNWIND $batch AS row
-                MERGE (n:Asset {id: row.id})
-                SET n += row.props
+                MATCH (c:Asset {genKey: $genKey, owner: row.owner})
+                WHERE NOT c.id IN row.children
+                DETACH DELETE c
                 """,
-                {"batch": payload},
+                {"batch": chunk, "genKey": generation.key},
+                "ingestion.prune_owned",
             )
 
-    def _write_edges(self, edges: list[AttackEdge]):
-        for chunk in _chunk(edges, 200):
-            payload = [self._edge_to_payload(edge) for edge in chunk]
-            neo4j_client.write(
+    def _link_service_accounts(self, delta: IngestionDelta, generation: Generation):
+        """Rebuild SA→secret edges touched by a delta against the stored graph.
+
+        Edges to secrets a touched account no longer links to are deleted
+        first.
+        """
+        sa_ids = set(delta.mounted_service_accounts)
+        sa_ids.update(a.id for a in delta.assets if a.type == NodeType.SERVICE_ACCOUNT)
+        secret_ids = [a.id for a in delta.assets if a.type == NodeType.SECRET]
+        if secret_ids:
+            records = neo4j_client.execute(
                 """
-                UNWIND $batch AS rel
-                MATCH (src:Asset {id: rel.source})
-                MATCH (dst:Asset {id: rel.target})
-                MERGE (src)-[r:ATTACK_REL {sourceId: rel.source, targetId: rel.target, technique: rel.technique}]->(dst)
-                SET r.evidence = rel.evidence,
-                    r.confidence = rel.confidence,
-                    r.sequence = rel.sequence,
-                    r.discoveredAt = rel.discoveredAt
+                UNWIND $secretIds AS secretId
+                MATCH (secret:Asset {genKey: $genKey, id: secretId})
+                MATCH (sa:Asset {genKey: $genKey, namespace: secret.namespace, type: 'ServiceAccount'})
+                WHERE secret.name IN coalesce(sa.meta_secrets, [])
+                RETURN DISTINCT sa.id AS id
                 """,
-                {"batch": payload},
+                {"secretIds": secret_ids, "genKey": generation.key},
+                name="ingestion.link_service_accounts",
             )
+            sa_ids.update(record["id"] for record in records)
+        if not sa_ids:
+            return
+        records = neo4j_client.execute(
+            """
+            UNWIND $serviceAccountIds AS saId
+            MATCH (sa:Asset {genKey: $genKey, id: saId})
+            WHERE EXISTS { MATCH (:Asset {type: 'Pod'})-[:ATTACK_REL]->(sa) }
+            UNWIND coalesce(sa.meta_secrets, []) AS secretName
+            MATCH (secret:Asset {genKey: $genKey, namespace: sa.namespace, type: 'Secret', name: secretName})
+            RETURN DISTINCT sa.id AS source, secret.id AS target
+            """,
+            {"serviceAccountIds": sorted(sa_ids), "genKey": generation.key},
+            name="ingestion.link_service_accounts",
+        )
+        linked: dict[str, list[str]] = {sa_id: [] for sa_id in sa_ids}
+        for record in records:
+            linked[record["source"]].append(record["target"])
+        # Secrets an account no longer references (or no pod mounts it any more).
+        rows = [{"source": sa_id, "targets": targets} for sa_id, targets in linked.items()]
+        for chunk in chunked(rows, NODE_BATCH_SIZE):
+            self._write_with_retry(
+                """
+                UNWIND $batch AS row
+                MATCH (sa:Asset {genKey: $genKey, id: row.source})-[r:ATTACK_REL]->(secret:Asset)
+                WHERE sa.type = 'ServiceAccount' AND secret.type = 'Secret'
+                  AND NOT secret.id IN row.targets
+                DELETE r
+                """,
+                {"batch": chunk, "genKey": generation.key},
+                "ingestion.prune_service_account_links",
+            )
+        self._write_edges(
+            [service_account_secret_edge(r["source"], r["target"]) for r in records],
+            generation,
+        )
 
-    def _node_to_payload(self, node: AssetNode) -> dict:
-        props = {
-            "id": node.id,
-            "name": node.name,
-            "namespace": node.namespace,
-            "type": node.type.value,
-            "criticality": node.criticality,
-            "labels": node.labels,
-            "lastSeen": node.last_seen.isoformat() if node.last_seen else None,
-            "cluster": node.metadata.get("cluster") if node.metadata else None,
-        }
-        for key, value in (node.metadata or {}).items():
-            if value is None:
-                continue
-            props[f"meta_{key}"] = value
-        return {"id": node.id, "props": props}
-
-    def _edge_to_payload(self, edge: AttackEdge) -> dict:
-        return {
-            "source": edge.source,
-            "target": edge.target,
-            "technique": str(edge.technique),
-            "evidence": edge.evidence,
-            "confidence": edge.confidence,
-            "sequence": edge.sequence,
-            "discoveredAt": None,
-        }
+    def _write_nodes(self, nodes: list[AssetRecord], generation: Generation):
+        for chunk in self.node_batches.chunks(nodes):
+            self.write_node_batch(chunk, generation)
+
+    def _write_edges(self, edges: list[EdgeRecord], generation: Generation):
+        for chunk in self.edge_batches.chunks(edges):
+            self.write_edge_batch(chunk, generation)
+
+    def write_node_batch(self, nodes: list[AssetRecord], generation: Generation) -> None:
+        """MERGE one batch of nodes into ``generation``.
+
+        The generation is part of the MERGE key, so a FULL run creates every
+        node again in its new generation, unchanged or not.
+        """
+        payload = [node_to_payload(node) for node in nodes]
+        started = perf_counter()
+        self._write_with_retry(
+            """
+            UNWIND $batch AS row
+            MERGE (n:Asset {genKey: $genKey, id: row.id})
+            SET n += row.props, n.generation = $generation
+            """,
+            {"batch": payload, "genKey": generation.key, "generation": generation.number},
+            "ingestion.write_nodes",
+        )
+        self.node_batches.record(
+            len(payload), perf_counter() - started, _payload_bytes(payload)
+        )
+        INGESTION_BATCHES.labels("nodes").inc()
+        INGESTION_ROWS.labels("nodes").inc(len(payload))
+
+    def write_edge_batch(
+        self, edges: list[EdgeRecord], generation: Generation
+    ) -> list[EdgeRecord]:
+        """Write one batch of edges and return those whose endpoints do not exist yet."""
+        payload = [edge_to_payload(edge) for edge in edges]
+        started = perf_counter()
+        records = self._write_with_retry(
+            """
+            UNWIND $batch AS rel
+            MATCH (src:Asset {genKey: $genKey, id: rel.source})
+            MATCH (dst:Asset {genKey: $genKey, id: rel.target})
+            MERGE (src)-[r:ATTACK_REL {sourceId: rel.source, targetId: rel.target, technique: rel.technique}]->(dst)
+            SET r.evidence = rel.evidence,
+                r.confidence = rel.confidence,
+                r.sequence = rel.sequence,
+                r.discoveredAt = rel.discoveredAt
+            RETURN rel.source AS source, rel.target AS target, rel.technique AS technique
+            """,
+            {"batch": payload, "genKey": generation.key},
+            "ingestion.write_edges",
+        )
+        self.edge_batches.record(
+            len(payload), perf_counter() - started, _payload_bytes(payload)
+        )
+        INGESTION_BATCHES.labels("edges").inc()
+        INGESTION_ROWS.labels("edges").inc(len(records))
+        written = {(r["source"], r["target"], r["technique"]) for r in records}
+        return [
+            edge
+            for edge, row in zip(edges, payload)
+            if (row["source"], row["target"], row["technique"]) not in written
+        ]
+
+    def _write_with_retry(
+        self, query: str, parameters: dict[str, Any], name: str
+    ) -> list[dict]:
+        """Run a batch write, retrying retryable errors with jittered exponential backoff."""
+        attempt = 1
+        while True:
+            try:
+                return neo4j_client.write(query, parameters, name=name)
+            except RETRYABLE_ERRORS as exc:
+                if attempt >= WRITE_ATTEMPTS:
+                    INGESTION_WRITE_FAILURES.inc()
+                    raise
+                INGESTION_WRITE_RETRIES.inc()
+                delay = RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logger.warning(
+                    "Graph write failed (%s), retrying in %.1fs (%s/%s)",
+                    exc,
+                    delay,
+                    attempt,
+                    WRITE_ATTEMPTS,
+                )
+                sleep(delay)
+                attempt += 1
+            except Exception:
+                INGESTION_WRITE_FAILURES.inc()
+                raise
+
+
+def edge_partition_key(edge: EdgeRecord, cluster: str) -> str:
+    """The hub endpoint of an edge of ``cluster``, or its target when neither end is a hub."""
+    if asset_resource(edge.target, cluster) in HUB_RESOURCES:
+        return edge.target
+    if asset_resource(edge.source, cluster) in HUB_RESOURCES:
+        return edge.source
+    return edge.target
+
+
+def _payload_bytes(payload: list[dict]) -> int:
+    # JSON size is a close, cheap stand-in for the Bolt-encoded size.
+    return len(orjson.dumps(payload))
 
 
-def _chunk(iterable: Iterable, size: int):
+def chunked(iterable: Iterable, size: int):
     iterator = iter(iterable)
     while True:
         batch = list(islice(iterator, size))
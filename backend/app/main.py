@@ -1,9 +1,19 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import get_settings
 from app.core.logger import configure_logging
-from app.repositories.neo4j_client import neo4j_client
+from app.core.metrics import RequestMetricsMiddleware
+from app.repositories.neo4j_client import (
+    PoolTimeoutError,
+    QueryTimeoutError,
+    async_neo4j_client,
+    neo4j_client,
+)
+from app.repositories.schema_repository import schema_repository
 from app.routers import attack_paths, assets, system, ingestion, cypher
 
 configure_logging()
@@ -17,6 +27,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(system.router)
 app.include_router(attack_paths.router)
@@ -25,9 +36,33 @@ app.include_router(ingestion.router)
 app.include_router(cypher.router)
 
 
+@app.exception_handler(QueryTimeoutError)
+async def query_timeout_handler(request: Request, exc: QueryTimeoutError):
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": f"Query exceeded its {exc.timeout}s time budget"},
+    )
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Neo4j is busy; retry shortly"},
+    )
+
+
+@app.on_event("startup")
+async def startup_event():
+    # Neo4j may not be up yet; the graph writer retries before its first write.
+    # The DDL and backfills use the blocking driver, so keep them off the loop.
+    await asyncio.to_thread(schema_repository.ensure)
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     neo4j_client.close()
+    await async_neo4j_client.close()
 
 
 @app.get("/")
@@ -80,6 +80,13 @@ class AttackPathSearchRequest(BaseModel):
         return values
 
 
+class AttackPathStreamRequest(AttackPathSearchRequest):
+    limit: int = Field(20, ge=1, le=200)
+    # The search ends when either budget runs out; the final line says so.
+    time_budget_seconds: float = Field(10.0, alias="timeBudgetSeconds", gt=0, le=120)
+    max_expansions: int | None = Field(None, alias="maxExpansions", ge=1)
+
+
 class AttackPathSearchResponse(BaseModel):
     paths: list[AttackPath]
 
@@ -112,10 +119,72 @@ class HighValuePathRequest(BaseModel):
         return values
 
 
+class BatchPathSearchRequest(BaseModel):
+    start_node_ids: list[str] | None = Field(None, alias="startNodeIds", max_length=5000)
+    start_type: NodeType | None = Field(None, alias="startType")
+    namespace: str | None = None
+    # Kubernetes equality selector on asset labels, e.g. "app=web,tier=frontend".
+    label_selector: str | None = Field(None, alias="labelSelector")
+    target_types: list[NodeType] = Field(
+        default_factory=lambda: [NodeType.MASTER, NodeType.CREDENTIAL],
+        alias="targetTypes",
+    )
+    max_depth: int = Field(6, alias="maxDepth", ge=1, le=8)
+    limit: int = Field(3, ge=1, le=20)
+    max_starts: int = Field(500, alias="maxStarts", ge=1, le=5000)
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    @model_validator(mode="after")
+    def ensure_start(cls, values: "BatchPathSearchRequest"):
+        if not (
+            values.start_node_ids
+            or values.start_type
+            or values.namespace
+            or values.label_selector
+        ):
+            raise ValueError(
+                "startNodeIds, startType, namespace or labelSelector is required"
+            )
+        return values
+
+
+class BatchPath(BaseModel):
+    score: float
+    # Ids into BatchPathSearchResponse.nodes and positions in its edges.
+    nodes: list[str]
+    edges: list[int]
+    summary: str
+
+
+class StartPaths(BaseModel):
+    start_node_id: str = Field(alias="startNodeId")
+    paths: list[BatchPath]
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class BatchPathSearchResponse(BaseModel):
+    nodes: dict[str, AssetNode]
+    edges: list[AttackEdge]
+    results: list[StartPaths]
+    # Starts searched; results leave out those without a path.
+    total_starts: int = Field(alias="totalStarts")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class AssetSort(str, Enum):
+    LAST_SEEN = "lastSeen"
+    RISK = "risk"
+
+
 class AssetFilter(BaseModel):
     type: NodeType | None = None
     namespace: str | None = None
     search: str | None = None
+    min_risk: float | None = Field(None, alias="minRisk", ge=0)
+    sort: AssetSort = AssetSort.LAST_SEEN
     page: int = Field(1, ge=1)
     page_size: int = Field(25, alias="pageSize", ge=1, le=100)
 
@@ -129,6 +198,9 @@ class AssetSummary(BaseModel):
     namespace: str | None = None
     criticality: str
     labels: list[str] = Field(default_factory=list)
+    risk_score: float | None = Field(None, alias="riskScore")
+
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class AssetListResponse(BaseModel):
@@ -144,3 +216,69 @@ class AssetDetailResponse(BaseModel):
     node: AssetNode
     inbound_edges: list[AttackEdge]
     outbound_edges: list[AttackEdge]
+
+
+class ReachableTarget(BaseModel):
+    id: str
+    type: NodeType
+
+
+class ReachabilityResponse(BaseModel):
+    asset_id: str = Field(alias="assetId")
+    # Hops to the nearest target of each type; None when it cannot reach one.
+    distances: dict[NodeType, int | None]
+    targets: list[ReachableTarget]
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ExposedAsset(BaseModel):
+    id: str
+    type: NodeType
+    namespace: str | None = None
+    distances: dict[NodeType, int | None]
+
+
+class ExposedAssetsResponse(BaseModel):
+    items: list[ExposedAsset]
+    total: int
+    page: int
+    page_size: int = Field(alias="pageSize")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ChokeNode(BaseModel):
+    id: str
+    type: NodeType | None = None
+    namespace: str | None = None
+    # Assets that can no longer reach any Master/Credential once it is removed.
+    cut_off: int = Field(alias="cutOff")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ChokeEdge(BaseModel):
+    source: str
+    target: str
+    technique: AttackTechnique | str
+    cut_off: int = Field(alias="cutOff")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ClusterChokePoints(BaseModel):
+    cluster: str
+    generation: int
+    computed_at: datetime = Field(alias="computedAt")
+    elapsed_seconds: float = Field(alias="elapsedSeconds")
+    # Assets with at least one path to a Master/Credential.
+    exposed_assets: int = Field(alias="exposedAssets")
+    nodes: list[ChokeNode]
+    edges: list[ChokeEdge]
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ChokePointsResponse(BaseModel):
+    items: list[ClusterChokePoints]
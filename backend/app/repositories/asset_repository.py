@@ -1,43 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Any, AsyncIterator
+
 from app.models.domain import (
     AssetDetailResponse,
     AssetFilter,
     AssetNode,
+    AssetSort,
     AssetSummary,
     AttackEdge,
     NodeType,
 )
-from app.repositories.neo4j_client import neo4j_client
+from app.repositories.generation_repository import generation_repository
+from app.repositories.neo4j_client import async_neo4j_client
 
 
 class AssetRepository:
-    def list_assets(self, filters: AssetFilter) -> tuple[list[AssetSummary], int]:
-        where_clauses = []
-        params: dict[str, str | int] = {
+    async def list_assets(self, filters: AssetFilter) -> tuple[list[AssetSummary], int]:
+        params: dict[str, Any] = {
             "skip": (filters.page - 1) * filters.page_size,
             "limit": filters.page_size,
         }
-        if filters.type:
-            where_clauses.append("n.type = $type")
-            params["type"] = filters.type.value
-        if filters.namespace:
-            where_clauses.append("coalesce(n.namespace,'') CONTAINS $namespace")
-            params["namespace"] = filters.namespace
-        if filters.search:
-            where_clauses.append(
-                "(toLower(n.name) CONTAINS toLower($search) OR n.id = $search)"
-            )
-            params["search"] = filters.search
-        where = ""
-        if where_clauses:
-            where = "WHERE " + " AND ".join(where_clauses)
+        where = await self._where(filters, params)
+        order = "coalesce(n.lastSeen, datetime()) DESC"
+        if filters.sort == AssetSort.RISK:
+            order = "n.riskScore DESC"
 
         list_query = f"""
         MATCH (n:Asset)
         {where}
         RETURN n
-        ORDER BY coalesce(n.lastSeen, datetime()) DESC
+        ORDER BY {order}
         SKIP $skip
         LIMIT $limit
         """
@@ -46,8 +40,10 @@ class AssetRepository:
         {where}
         RETURN count(n) AS total
         """
-        result = neo4j_client.execute(list_query, params)
-        count_result = neo4j_client.execute(count_query, params)
+        result, count_result = await asyncio.gather(
+            async_neo4j_client.execute(list_query, params, name="assets.list"),
+            async_neo4j_client.execute(count_query, params, name="assets.list"),
+        )
         total = count_result[0]["total"] if count_result else 0
         summaries = [
             AssetSummary(
@@ -57,14 +53,49 @@ class AssetRepository:
                 namespace=record["n"].get("namespace"),
                 criticality=record["n"].get("criticality", "MEDIUM"),
                 labels=record["n"].get("labels", []),
+                risk_score=record["n"].get("riskScore"),
             )
             for record in result
         ]
         return summaries, total
 
-    def get_asset_detail(self, asset_id: str) -> AssetDetailResponse | None:
+    async def export_assets(self, filters: AssetFilter) -> AsyncIterator[AssetNode]:
+        """Every asset matching ``filters``, streamed without paging or sorting."""
+        params: dict[str, Any] = {}
+        where = await self._where(filters, params)
+        query = f"""
+        MATCH (n:Asset)
+        {where}
+        RETURN n
+        """
+        async for record in async_neo4j_client.stream(query, params, name="assets.export"):
+            yield self._node_from(record["n"])
+
+    async def _where(self, filters: AssetFilter, params: dict[str, Any]) -> str:
+        where_clauses = ["n.genKey IN $genKeys"]
+        params["genKeys"] = await generation_repository.current_keys()
+        # A range on riskScore lets the planner walk its index, already in
+        # score order; sorting by risk implies it, so unscored assets drop out.
+        if filters.min_risk is not None or filters.sort == AssetSort.RISK:
+            where_clauses.insert(0, "n.riskScore >= $minRisk")
+            params["minRisk"] = filters.min_risk or 0.0
+        if filters.type:
+            where_clauses.append("n.type = $type")
+            params["type"] = filters.type.value
+        if filters.namespace:
+            where_clauses.append("coalesce(n.namespace,'') CONTAINS $namespace")
+            params["namespace"] = filters.namespace
+        if filters.search:
+            where_clauses.append(
+                "(toLower(n.name) CONTAINS toLower($search) OR n.id = $search)"
+            )
+            params["search"] = filters.search
+        return "WHERE " + " AND ".join(where_clauses)
+
+    async def get_asset_detail(self, asset_id: str) -> AssetDetailResponse | None:
         query = """
         MATCH (n:Asset {id: $assetId})
+        WHERE n.genKey IN $genKeys
         OPTIONAL MATCH (src:Asset)-[inRel:ATTACK_REL]->(n)
         OPTIONAL MATCH (n)-[outRel:ATTACK_REL]->(dst:Asset)
         RETURN n,
@@ -85,7 +116,11 @@ class AssetRepository:
                  sequence: outRel.sequence
                }) AS outbound
         """
-        records = neo4j_client.execute(query, {"assetId": asset_id})
+        records = await async_neo4j_client.execute(
+            query,
+            {"assetId": asset_id, "genKeys": await generation_repository.current_keys()},
+            name="assets.detail",
+        )
         if not records:
             return None
         record = records[0]
@@ -122,7 +157,10 @@ class AssetRepository:
 
     def _node_from(self, node) -> AssetNode:
         metadata = dict(node)
-        for key in ["type", "id", "name", "namespace", "criticality", "labels", "lastSeen"]:
+        for key in [
+            "type", "id", "name", "namespace", "criticality", "labels", "lastSeen",
+            "generation", "genKey", "riskScore", "owner",
+        ]:
             metadata.pop(key, None)
         return AssetNode(
             id=node["id"],
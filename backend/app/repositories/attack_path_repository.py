@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
 import uuid
-from typing import Any, List
+from itertools import islice, repeat
+from time import perf_counter
+from typing import Any, AsyncIterator, Iterator, List
 
+import numpy as np
 from neo4j.graph import Path
 
 from app.models.domain import (
@@ -11,13 +16,43 @@ from app.models.domain import (
     AttackPath,
     AttackStep,
     AttackTechnique,
+    BatchPath,
+    BatchPathSearchResponse,
+    ExposedAsset,
     NodeType,
+    ReachabilityResponse,
+    ReachableTarget,
+    StartPaths,
 )
-from app.repositories.neo4j_client import neo4j_client
+from app.graph.engine import NODE_TYPES, AttackGraph, ScoredPath, SearchBudget
+from app.graph.reachability import UNREACHABLE, ReachabilityIndex
+from app.repositories.generation_repository import generation_repository
+from app.repositories.graph_repository import GraphUnavailable, attack_graph_repository
+from app.repositories.neo4j_client import (
+    QueryTimeoutError,
+    async_neo4j_client,
+    query_timeout,
+)
+
+# Properties of the nodes and edges on paths found in memory.
+PATH_NODES_QUERY = """
+UNWIND $keys AS key
+MATCH (n:Asset {genKey: key.genKey, id: key.id})
+RETURN key.genKey AS genKey, n
+"""
+
+PATH_EDGES_QUERY = """
+UNWIND $keys AS key
+MATCH (:Asset {genKey: key.genKey, id: key.source})-[r:ATTACK_REL]->
+      (:Asset {genKey: key.genKey, id: key.target})
+WHERE r.technique = key.technique
+RETURN key.genKey AS genKey, key.source AS source, key.target AS target,
+       key.technique AS technique, r
+"""
 
 
 class AttackPathRepository:
-    def search_paths(
+    async def search_paths(
         self,
         *,
         start_node_id: str | None,
@@ -27,11 +62,148 @@ class AttackPathRepository:
         namespace: str | None,
         max_depth: int,
         limit: int,
+        query_name: str = "attack_paths.search",
     ) -> list[AttackPath]:
-        filters = []
+        graphs = await attack_graph_repository.current()
+        if graphs is not None:
+            types = [target_type] if target_type else target_types
+            if target_type and target_types:
+                types = [target_type] if target_type in target_types else []
+            # The worker thread outlives a cancelled request, so the search is
+            # capped like the Cypher one and stopped once the caller is gone.
+            timeout = query_timeout(query_name)
+            budget = SearchBudget(seconds=timeout)
+            try:
+                found = await asyncio.to_thread(
+                    self._top_paths,
+                    graphs,
+                    start_node_id=start_node_id,
+                    start_type=start_type,
+                    target_types=types,
+                    namespace=namespace,
+                    max_depth=max(1, min(max_depth, 8)),
+                    limit=limit,
+                    budget=budget,
+                )
+            finally:
+                budget.cancel()
+            if budget.exceeded == "time":
+                raise QueryTimeoutError(query_name, timeout)
+            return await self._hydrate(found)
+
+        query, params = await self._search_query(
+            start_node_id=start_node_id,
+            start_type=start_type,
+            target_type=target_type,
+            target_types=target_types,
+            namespace=namespace,
+            max_depth=max_depth,
+            limit=limit,
+        )
+        records = await async_neo4j_client.query(query, params, name=query_name)
+        return [self._map_record(record) for record in records]
+
+    async def stream_paths(
+        self,
+        *,
+        start_node_id: str | None,
+        start_type: NodeType | None,
+        target_type: NodeType | None,
+        namespace: str | None,
+        max_depth: int,
+        limit: int,
+        budget: SearchBudget,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """``{"path": AttackPath}`` items as paths are found, then one
+        ``{"done": ...}`` item saying whether the search ran to completion.
+
+        In memory, paths come best first and each is hydrated and handed out
+        before the next is searched for; the budget caps the search. Neo4j
+        returns them in the order it finds them, within the time budget.
+        Closing the iterator (e.g. on client disconnect) cancels the search.
+        """
+        started = perf_counter()
+        count = 0
+        reason = "limit"
+        graphs = await attack_graph_repository.current()
+        try:
+            if graphs is not None:
+                # Setting the searches up computes their bounds tables, a pass
+                # over every edge, so it stays off the event loop as well.
+                found = await asyncio.to_thread(
+                    self._iter_top_paths,
+                    graphs,
+                    start_node_id=start_node_id,
+                    start_type=start_type,
+                    target_types=[target_type] if target_type else None,
+                    namespace=namespace,
+                    max_depth=max(1, min(max_depth, 8)),
+                    budget=budget,
+                )
+                while count < limit:
+                    item = await asyncio.to_thread(next, found, None)
+                    if item is None:
+                        reason = budget.exceeded or "exhausted"
+                        break
+                    for path in await self._hydrate([item]):
+                        count += 1
+                        yield {"path": path}
+            else:
+                query, params = await self._search_query(
+                    start_node_id=start_node_id,
+                    start_type=start_type,
+                    target_type=target_type,
+                    target_types=None,
+                    namespace=namespace,
+                    max_depth=max_depth,
+                    limit=limit,
+                    ordered=False,
+                )
+                remaining = None
+                if budget.deadline is not None:
+                    remaining = max(budget.deadline - perf_counter(), 0.001)
+                try:
+                    async for record in async_neo4j_client.stream(
+                        query, params, name="attack_paths.stream", timeout=remaining
+                    ):
+                        count += 1
+                        yield {"path": self._map_record(record)}
+                except QueryTimeoutError:
+                    reason = "time"
+                else:
+                    if count < limit:
+                        reason = "exhausted"
+        finally:
+            budget.cancel()
+        yield {
+            "done": {
+                "complete": reason in ("limit", "exhausted"),
+                "reason": reason,
+                "paths": count,
+                "expansions": budget.expansions,
+                "elapsedSeconds": round(perf_counter() - started, 3),
+            }
+        }
+
+    async def _search_query(
+        self,
+        *,
+        start_node_id: str | None,
+        start_type: NodeType | None,
+        target_type: NodeType | None,
+        target_types: list[NodeType] | None,
+        namespace: str | None,
+        max_depth: int,
+        limit: int,
+        ordered: bool = True,
+    ) -> tuple[str, dict[str, Any]]:
+        # Paths never leave the start node's generation, so filtering the start
+        # node is enough.
+        filters = ["start.genKey IN $genKeys"]
         params: dict[str, Any] = {
             "maxDepth": max_depth,
             "limit": limit,
+            "genKeys": await generation_repository.current_keys(),
         }
         if start_node_id:
             filters.append("start.id = $startNodeId")
@@ -43,9 +215,7 @@ class AttackPathRepository:
             filters.append("coalesce(start.namespace,'') = $namespace")
             params["namespace"] = namespace
 
-        where_clause = ""
-        if filters:
-            where_clause = "WHERE " + " AND ".join(filters)
+        where_clause = "WHERE " + " AND ".join(filters)
 
         target_filters = []
         if target_type:
@@ -77,14 +247,13 @@ class AttackPathRepository:
             END
         ) AS score
         RETURN path, score
-        ORDER BY score DESC
+        {"ORDER BY score DESC" if ordered else ""}
         LIMIT $limit
         """
         params.pop("maxDepth", None)
-        records = neo4j_client.execute(query, params)
-        return [self._map_record(record) for record in records]
+        return query, params
 
-    def search_high_value_paths(
+    async def search_high_value_paths(
         self,
         *,
         start_node_id: str | None,
@@ -94,7 +263,7 @@ class AttackPathRepository:
         limit: int,
         target_types: list[NodeType],
     ) -> list[AttackPath]:
-        return self.search_paths(
+        return await self.search_paths(
             start_node_id=start_node_id,
             start_type=start_type,
             target_type=None,
@@ -102,9 +271,10 @@ class AttackPathRepository:
             namespace=namespace,
             max_depth=max_depth,
             limit=limit,
+            query_name="attack_paths.high_value",
         )
 
-    def shortest_path(
+    async def shortest_path(
         self,
         *,
         start_node_id: str,
@@ -112,8 +282,24 @@ class AttackPathRepository:
         max_depth: int,
     ) -> list[AttackPath]:
         depth_clause = max(1, min(max_depth, 12))
+        graphs = await attack_graph_repository.current()
+        if graphs is not None:
+            for graph in graphs:
+                start = graph.index.get(start_node_id)
+                target = graph.index.get(target_node_id)
+                if start is None or target is None:
+                    continue
+                if graph.reachability and graph.reachability.reaches(start, target) is False:
+                    return []
+                path = await asyncio.to_thread(
+                    graph.shortest_path, start, target, max_depth=depth_clause
+                )
+                return await self._hydrate([(graph, path)] if path else [])
+            return []
+
         query = f"""
         MATCH (start:Asset {{id: $startNodeId}}), (target:Asset {{id: $targetNodeId}})
+        WHERE start.genKey IN $genKeys AND target.genKey = start.genKey
         CALL {{
             WITH start, target
             MATCH path = shortestPath((start)-[:ATTACK_REL*1..{depth_clause}]->(target))
@@ -130,46 +316,438 @@ class AttackPathRepository:
         ) AS score
         RETURN path, score
         """
-        records = neo4j_client.execute(
-            query, {"startNodeId": start_node_id, "targetNodeId": target_node_id}
+        records = await async_neo4j_client.query(
+            query,
+            {
+                "startNodeId": start_node_id,
+                "targetNodeId": target_node_id,
+                "genKeys": await generation_repository.current_keys(),
+            },
+            name="attack_paths.shortest",
         )
         return [self._map_record(record) for record in records if record.get("path")]
 
-    def _map_record(self, record: dict[str, Any]) -> AttackPath:
-        path: Path = record["path"]
-        score: float = record.get("score", 0.0)
-        nodes = list(path.nodes)
-        relationships = list(path.relationships)
+    async def reachability(self, asset_id: str) -> ReachabilityResponse | None:
+        for graph in await self._indexed_graphs():
+            node = graph.index.get(asset_id)
+            if node is None:
+                continue
+            index = graph.reachability
+            return ReachabilityResponse(
+                asset_id=asset_id,
+                distances=self._distances(index, node),
+                targets=[
+                    ReachableTarget(id=graph.ids[target], type=NODE_TYPES[graph.node_type[target]])
+                    for target in index.reachable_targets(node).tolist()
+                ],
+            )
+        return None
 
-        attack_steps: list[AttackStep] = []
-        if nodes:
-            attack_steps.append(
-                AttackStep(
-                    depth=0,
-                    nodes=[self._node_from_neo4j(nodes[0])],
-                    edges=[],
+    async def exposed_assets(
+        self,
+        *,
+        start_type: NodeType | None,
+        namespace: str | None,
+        target_types: list[NodeType],
+        max_depth: int | None,
+        page: int,
+        page_size: int,
+    ) -> tuple[list[ExposedAsset], int]:
+        matches: list[tuple[AttackGraph, np.ndarray]] = []
+        for graph in await self._indexed_graphs():
+            mask = graph.select(types=[start_type] if start_type else NODE_TYPES, namespace=namespace)
+            mask &= graph.reachability.within(target_types, max_depth)
+            matches.append((graph, np.flatnonzero(mask)))
+
+        total = sum(len(nodes) for _, nodes in matches)
+        skip = (page - 1) * page_size
+        items: list[ExposedAsset] = []
+        for graph, nodes in matches:
+            if skip >= len(nodes):
+                skip -= len(nodes)
+                continue
+            for node in nodes[skip : skip + page_size - len(items)].tolist():
+                items.append(
+                    ExposedAsset(
+                        id=graph.ids[node],
+                        type=NODE_TYPES[graph.node_type[node]],
+                        namespace=graph.namespaces[graph.namespace[node]] or None,
+                        distances=self._distances(graph.reachability, node),
+                    )
                 )
+            skip = 0
+            if len(items) == page_size:
+                break
+        return items, total
+
+    async def search_batch(
+        self,
+        *,
+        start_node_ids: list[str] | None,
+        start_type: NodeType | None,
+        namespace: str | None,
+        labels: list[str],
+        target_types: list[NodeType],
+        max_depth: int,
+        limit: int,
+        max_starts: int,
+    ) -> BatchPathSearchResponse:
+        """Top paths of every start matching all filters, at most ``max_starts`` of them.
+
+        ``namespace`` and ``labels`` only select starts; targets may live anywhere.
+        """
+        start_ids = set(start_node_ids) if start_node_ids else None
+        depth = max(1, min(max_depth, 8))
+        graphs = await attack_graph_repository.current()
+        if graphs is None:
+            starts = await self._batch_starts(
+                start_ids, start_type, namespace, labels, max_starts=max_starts
+            )
+            return await self._search_batch_cypher(starts, target_types, depth, limit)
+        if labels:
+            # Labels are not part of the in-memory snapshot.
+            start_ids = set(
+                await self._batch_starts(start_ids, start_type, namespace, labels, max_starts=None)
             )
-        for idx, rel in enumerate(relationships, start=1):
-            attack_steps.append(
-                AttackStep(
-                    depth=idx,
-                    nodes=[self._node_from_neo4j(rel.end_node)],
-                    edges=[self._edge_from_rel(rel)],
+
+        results, total = await asyncio.to_thread(
+            self._top_paths_by_start,
+            graphs,
+            start_ids=start_ids,
+            start_type=start_type,
+            namespace=namespace,
+            target_types=target_types,
+            max_depth=depth,
+            limit=limit,
+            max_starts=max_starts,
+        )
+        found = [(graph, path) for graph, _, paths in results for path in paths]
+        nodes, edges = await self._fetch_elements(found) if found else ({}, {})
+
+        node_table: dict[str, AssetNode] = {}
+        edge_table: list[AttackEdge] = []
+        edge_positions: dict[tuple, int] = {}
+        entries: list[StartPaths] = []
+        for graph, start, paths in results:
+            batch_paths: list[BatchPath] = []
+            for path in paths:
+                elements = self._path_elements(graph, path, nodes, edges)
+                if elements is None:
+                    continue
+                path_nodes, path_edges = elements
+                for node in path_nodes:
+                    node_table.setdefault(node.id, node)
+                positions = []
+                for hop, edge in enumerate(path_edges):
+                    key = _edge_key(graph, path, hop)
+                    if key not in edge_positions:
+                        edge_positions[key] = len(edge_table)
+                        edge_table.append(edge)
+                    positions.append(edge_positions[key])
+                batch_paths.append(
+                    BatchPath(
+                        score=round(path.score, 2),
+                        nodes=[node.id for node in path_nodes],
+                        edges=positions,
+                        summary=self._summary(path_nodes, path_edges),
+                    )
                 )
+            if batch_paths:
+                entries.append(StartPaths(start_node_id=graph.ids[start], paths=batch_paths))
+        entries.sort(key=lambda entry: entry.paths[0].score, reverse=True)
+        return BatchPathSearchResponse(
+            nodes=node_table, edges=edge_table, results=entries, total_starts=total
+        )
+
+    async def _batch_starts(
+        self,
+        start_ids: set[str] | None,
+        start_type: NodeType | None,
+        namespace: str | None,
+        labels: list[str],
+        *,
+        max_starts: int | None,
+    ) -> list[str]:
+        filters = ["n.genKey IN $genKeys"]
+        params: dict[str, Any] = {"genKeys": await generation_repository.current_keys()}
+        if start_ids is not None:
+            filters.append("n.id IN $ids")
+            params["ids"] = sorted(start_ids)
+        if start_type:
+            filters.append("n.type = $type")
+            params["type"] = start_type.value
+        if namespace:
+            filters.append("coalesce(n.namespace,'') = $namespace")
+            params["namespace"] = namespace
+        if labels:
+            filters.append("all(label IN $labels WHERE label IN n.labels)")
+            params["labels"] = labels
+        query = f"MATCH (n:Asset) WHERE {' AND '.join(filters)} RETURN n.id AS id ORDER BY id"
+        if max_starts is not None:
+            query += " LIMIT $limit"
+            params["limit"] = max_starts
+        records = await async_neo4j_client.execute(
+            query, params, name="attack_paths.batch_starts"
+        )
+        return [record["id"] for record in records]
+
+    async def _search_batch_cypher(
+        self, starts: list[str], target_types: list[NodeType], max_depth: int, limit: int
+    ) -> BatchPathSearchResponse:
+        """Batch search without in-memory graphs: one Cypher search per start."""
+        node_table: dict[str, AssetNode] = {}
+        edge_table: list[AttackEdge] = []
+        edge_positions: dict[tuple, int] = {}
+        entries: list[StartPaths] = []
+        for start in starts:
+            paths = await self.search_paths(
+                start_node_id=start,
+                start_type=None,
+                target_type=None,
+                target_types=target_types,
+                namespace=None,
+                max_depth=max_depth,
+                limit=limit,
+                query_name="attack_paths.batch",
+            )
+            batch_paths: list[BatchPath] = []
+            for path in paths:
+                path_nodes = [step.nodes[0] for step in path.steps]
+                positions = []
+                for step in path.steps[1:]:
+                    edge = step.edges[0]
+                    key = (edge.source, edge.target, edge.technique)
+                    if key not in edge_positions:
+                        edge_positions[key] = len(edge_table)
+                        edge_table.append(edge)
+                    positions.append(edge_positions[key])
+                for node in path_nodes:
+                    node_table.setdefault(node.id, node)
+                batch_paths.append(
+                    BatchPath(
+                        score=path.score,
+                        nodes=[node.id for node in path_nodes],
+                        edges=positions,
+                        summary=path.summary,
+                    )
+                )
+            if batch_paths:
+                entries.append(StartPaths(start_node_id=start, paths=batch_paths))
+        entries.sort(key=lambda entry: entry.paths[0].score, reverse=True)
+        return BatchPathSearchResponse(
+            nodes=node_table, edges=edge_table, results=entries, total_starts=len(starts)
+        )
+
+    async def _indexed_graphs(self) -> list[AttackGraph]:
+        graphs = await attack_graph_repository.current()
+        if graphs is None:
+            raise GraphUnavailable("Attack graphs are not loaded in memory")
+        return graphs
+
+    def _distances(self, index: ReachabilityIndex, node: int) -> dict[NodeType, int | None]:
+        return {
+            node_type: None if distances[node] == UNREACHABLE else int(distances[node])
+            for node_type, distances in index.distances.items()
+        }
+
+    def _top_paths(
+        self,
+        graphs: list[AttackGraph],
+        *,
+        start_node_id: str | None,
+        start_type: NodeType | None,
+        target_types: list[NodeType] | None,
+        namespace: str | None,
+        max_depth: int,
+        limit: int,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[AttackGraph, ScoredPath]]:
+        return list(
+            islice(
+                self._iter_top_paths(
+                    graphs,
+                    start_node_id=start_node_id,
+                    start_type=start_type,
+                    target_types=target_types,
+                    namespace=namespace,
+                    max_depth=max_depth,
+                    budget=budget,
+                ),
+                limit,
+            )
+        )
+
+    def _iter_top_paths(
+        self,
+        graphs: list[AttackGraph],
+        *,
+        start_node_id: str | None,
+        start_type: NodeType | None,
+        target_types: list[NodeType] | None,
+        namespace: str | None,
+        max_depth: int,
+        budget: SearchBudget | None = None,
+    ) -> Iterator[tuple[AttackGraph, ScoredPath]]:
+        """Paths of every graph, best first overall, searched lazily."""
+        searches = []
+        for graph in graphs:
+            starts = graph.select(
+                node_id=start_node_id,
+                types=[start_type] if start_type else None,
+                namespace=namespace,
+            )
+            index = graph.reachability
+            if index is not None and target_types and index.covers(target_types):
+                starts &= index.within(target_types, max_depth)
+            if not starts.any():
+                continue
+            paths = graph.iter_paths(
+                starts,
+                target_types=target_types,
+                namespace=namespace,
+                max_depth=max_depth,
+                budget=budget,
             )
+            searches.append(zip(repeat(graph), paths))
+        return heapq.merge(*searches, key=lambda item: -item[1].score)
 
-        summary = ""
+    def _top_paths_by_start(
+        self,
+        graphs: list[AttackGraph],
+        *,
+        start_ids: set[str] | None,
+        start_type: NodeType | None,
+        namespace: str | None,
+        target_types: list[NodeType],
+        max_depth: int,
+        limit: int,
+        max_starts: int,
+    ) -> tuple[list[tuple[AttackGraph, int, list[ScoredPath]]], int]:
+        results: list[tuple[AttackGraph, int, list[ScoredPath]]] = []
+        total = 0
+        for graph in graphs:
+            if total == max_starts:
+                break
+            starts = graph.select(types=[start_type] if start_type else None, namespace=namespace)
+            if start_ids is not None:
+                listed = np.zeros(graph.node_count, dtype=bool)
+                listed[[graph.index[node_id] for node_id in start_ids if node_id in graph.index]] = True
+                starts &= listed
+            selected = np.flatnonzero(starts)[: max_starts - total]
+            total += len(selected)
+            starts = np.zeros(graph.node_count, dtype=bool)
+            starts[selected] = True
+            index = graph.reachability
+            if index is not None and index.covers(target_types):
+                starts &= index.within(target_types, max_depth)
+            if not starts.any():
+                continue
+            by_start = graph.top_paths_by_start(
+                starts,
+                target_types=target_types,
+                namespace=None,
+                max_depth=max_depth,
+                limit=limit,
+            )
+            results.extend((graph, start, paths) for start, paths in by_start.items())
+        return results, total
+
+    async def _hydrate(self, found: list[tuple[AttackGraph, ScoredPath]]) -> list[AttackPath]:
+        """Turn in-memory paths into ``AttackPath`` models."""
+        if not found:
+            return []
+        nodes, edges = await self._fetch_elements(found)
+        paths: list[AttackPath] = []
+        for graph, path in found:
+            elements = self._path_elements(graph, path, nodes, edges)
+            if elements is not None:
+                paths.append(self._build_path(*elements, path.score))
+        return paths
+
+    async def _fetch_elements(
+        self, found: list[tuple[AttackGraph, ScoredPath]]
+    ) -> tuple[dict[tuple, AssetNode], dict[tuple, AttackEdge]]:
+        """Properties of the nodes and edges on ``found``'s paths, read from
+        Neo4j in one round trip each. Records are kept as the driver returns
+        them: ``Record.data()`` would turn each relationship into a tuple."""
+        node_keys = {
+            (graph.gen_key, graph.ids[node]) for graph, path in found for node in path.nodes
+        }
+        edge_keys = {
+            _edge_key(graph, path, hop) for graph, path in found for hop in range(len(path.edges))
+        }
+        node_records, edge_records = await asyncio.gather(
+            async_neo4j_client.query(
+                PATH_NODES_QUERY,
+                {"keys": [{"genKey": key, "id": node_id} for key, node_id in node_keys]},
+                name="attack_paths.hydrate",
+            ),
+            async_neo4j_client.query(
+                PATH_EDGES_QUERY,
+                {
+                    "keys": [
+                        {"genKey": key, "source": source, "target": target, "technique": technique}
+                        for key, source, target, technique in edge_keys
+                    ]
+                },
+                name="attack_paths.hydrate",
+            ),
+        )
+        nodes = {
+            (record["genKey"], record["n"]["id"]): self._node_from_neo4j(record["n"])
+            for record in node_records
+        }
+        edges = {
+            (record["genKey"], record["source"], record["target"], record["technique"]):
+            self._edge_from_properties(record["source"], record["target"], record["r"])
+            for record in edge_records
+        }
+        return nodes, edges
+
+    def _path_elements(
+        self,
+        graph: AttackGraph,
+        path: ScoredPath,
+        nodes: dict[tuple, AssetNode],
+        edges: dict[tuple, AttackEdge],
+    ) -> tuple[list[AssetNode], list[AttackEdge]] | None:
+        path_nodes = [nodes.get((graph.gen_key, graph.ids[node])) for node in path.nodes]
+        path_edges = [edges.get(_edge_key(graph, path, hop)) for hop in range(len(path.edges))]
+        # Ingestion may have removed part of the path since the snapshot was loaded.
+        if None in path_nodes or None in path_edges:
+            return None
+        return path_nodes, path_edges
+
+    def _map_record(self, record: dict[str, Any]) -> AttackPath:
+        path: Path = record["path"]
+        score: float = record.get("score", 0.0)
+        return self._build_path(
+            [self._node_from_neo4j(node) for node in path.nodes],
+            [self._edge_from_rel(rel) for rel in path.relationships],
+            score,
+        )
+
+    def _build_path(
+        self, nodes: list[AssetNode], edges: list[AttackEdge], score: float
+    ) -> AttackPath:
+        attack_steps: list[AttackStep] = []
         if nodes:
-            summary = f"{nodes[0]['name']} → {nodes[-1]['name']} ({len(relationships)} hops)"
+            attack_steps.append(AttackStep(depth=0, nodes=[nodes[0]], edges=[]))
+        for idx, (node, edge) in enumerate(zip(nodes[1:], edges), start=1):
+            attack_steps.append(AttackStep(depth=idx, nodes=[node], edges=[edge]))
 
         return AttackPath(
             id=str(uuid.uuid4()),
             score=round(score, 2),
             steps=attack_steps,
-            summary=summary,
+            summary=self._summary(nodes, edges),
         )
 
+    def _summary(self, nodes: list[AssetNode], edges: list[AttackEdge]) -> str:
+        if not nodes:
+            return ""
+        return f"{nodes[0].name} → {nodes[-1].name} ({len(edges)} hops)"
+
     def _node_from_neo4j(self, node) -> AssetNode:
         node_type = NodeType(node["type"])
         metadata = dict(node)
@@ -180,6 +758,10 @@ class AttackPathRepository:
         metadata.pop("criticality", None)
         metadata.pop("labels", None)
         metadata.pop("lastSeen", None)
+        metadata.pop("generation", None)
+        metadata.pop("genKey", None)
+        metadata.pop("riskScore", None)
+        metadata.pop("owner", None)
 
         return AssetNode(
             id=node["id"],
@@ -192,6 +774,9 @@ class AttackPathRepository:
         )
 
     def _edge_from_rel(self, rel) -> AttackEdge:
+        return self._edge_from_properties(rel.start_node["id"], rel.end_node["id"], rel)
+
+    def _edge_from_properties(self, source: str, target: str, rel) -> AttackEdge:
         technique_value = rel.get("technique")
         try:
             technique = AttackTechnique(technique_value)
@@ -199,8 +784,8 @@ class AttackPathRepository:
             technique = technique_value
 
         return AttackEdge(
-            source=rel.start_node["id"],
-            target=rel.end_node["id"],
+            source=source,
+            target=target,
             technique=technique,
             evidence=rel.get("evidence"),
             confidence=rel.get("confidence"),
@@ -208,4 +793,14 @@ class AttackPathRepository:
         )
 
 
+def _edge_key(graph: AttackGraph, path: ScoredPath, hop: int) -> tuple[str, str, str, str]:
+    edge = path.edges[hop]
+    return (
+        graph.gen_key,
+        graph.ids[path.nodes[hop]],
+        graph.ids[path.nodes[hop + 1]],
+        graph.techniques[graph.technique[edge]],
+    )
+
+
 attack_path_repository = AttackPathRepository()
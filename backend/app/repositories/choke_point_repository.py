@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from threading import Lock
+from time import perf_counter
+
+from app.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import CHOKE_POINT_SECONDS
+from app.graph.choke_points import (
+    CHOKE_POINT_LIMIT,
+    AnalysisTimeout,
+    ChokePointAnalysis,
+    choke_points,
+)
+from app.graph.engine import NODE_TYPES, UNKNOWN_TYPE, AttackGraph
+from app.models.domain import ChokeEdge, ChokeNode, ClusterChokePoints
+from app.repositories.generation_repository import Generation, generation_repository
+from app.repositories.graph_repository import attack_graph_repository
+
+
+class ChokePointRepository:
+    """Choke points of every cluster's current generation, computed once each.
+
+    Ingestion recomputes a generation's analysis after writing it; one nobody
+    has analysed yet (e.g. after a restart) is analysed by the first request
+    for it. A generation too large for memory, or whose analysis ran past
+    CHOKE_POINTS_TIMEOUT_SECONDS, is cached as ``None``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._results: dict[str, ClusterChokePoints | None] = {}
+        self._compute_locks: dict[str, Lock] = {}
+
+    async def current(self) -> dict[str, ClusterChokePoints | None]:
+        """Analysis of each cluster's current generation, by cluster."""
+        keys = await generation_repository.current_keys()
+        with self._lock:
+            for stale in set(self._results) - set(keys):
+                del self._results[stale]
+                self._compute_locks.pop(stale, None)
+            missing = [key for key in keys if key not in self._results]
+        if missing:
+            await asyncio.gather(
+                *(asyncio.to_thread(self._compute_missing, key) for key in missing)
+            )
+        with self._lock:
+            return {Generation.from_key(key).cluster: self._results.get(key) for key in keys}
+
+    def refresh(self, gen_key: str, graph: AttackGraph | None = None) -> None:
+        """Recompute ``gen_key`` after ingestion wrote to it; never fails the caller.
+
+        ``graph`` is the snapshot ingestion just loaded, if it has one.
+        """
+        with self._compute_lock(gen_key):
+            self._compute(gen_key, graph)
+
+    def _compute_missing(self, gen_key: str) -> None:
+        with self._compute_lock(gen_key):
+            with self._lock:
+                if gen_key in self._results:
+                    return
+            self._compute(gen_key)
+
+    def _compute(self, gen_key: str, graph: AttackGraph | None = None) -> None:
+        timeout = get_settings().choke_points_timeout_seconds
+        started = perf_counter()
+        try:
+            if graph is None:
+                graph = attack_graph_repository.snapshot(gen_key)
+            if graph is None:
+                logger.info("Generation %s is too large for choke-point analysis", gen_key)
+                result = None
+            else:
+                analysis = choke_points(
+                    graph, limit=CHOKE_POINT_LIMIT, deadline=started + timeout
+                )
+                result = self._to_model(gen_key, graph, analysis)
+                CHOKE_POINT_SECONDS.observe(analysis.seconds)
+                logger.info(
+                    "Choke points of %s: %s exposed assets, %s nodes and %s edges in %.2fs",
+                    gen_key,
+                    analysis.exposed,
+                    graph.node_count,
+                    graph.edge_count,
+                    analysis.seconds,
+                )
+        except AnalysisTimeout:
+            CHOKE_POINT_SECONDS.observe(perf_counter() - started)
+            logger.warning("Choke-point analysis of %s exceeded %ss", gen_key, timeout)
+            result = None
+        except Exception as exc:  # noqa: BLE001 - the next request retries
+            logger.warning("Choke-point analysis of %s failed: %s", gen_key, exc)
+            with self._lock:
+                self._results.pop(gen_key, None)
+            return
+        with self._lock:
+            self._results[gen_key] = result
+
+    def _to_model(
+        self, gen_key: str, graph: AttackGraph, analysis: ChokePointAnalysis
+    ) -> ClusterChokePoints:
+        sources = graph.edge_sources()
+        generation = Generation.from_key(gen_key)
+        return ClusterChokePoints(
+            cluster=generation.cluster,
+            generation=generation.number,
+            computed_at=datetime.utcnow(),
+            elapsed_seconds=round(analysis.seconds, 3),
+            exposed_assets=analysis.exposed,
+            nodes=[
+                ChokeNode(
+                    id=graph.ids[node],
+                    type=None
+                    if graph.node_type[node] == UNKNOWN_TYPE
+                    else NODE_TYPES[graph.node_type[node]],
+                    namespace=graph.namespaces[graph.namespace[node]] or None,
+                    cut_off=cut_off,
+                )
+                for node, cut_off in analysis.nodes
+            ],
+            edges=[
+                ChokeEdge(
+                    source=graph.ids[sources[edge]],
+                    target=graph.ids[graph.indices[edge]],
+                    technique=graph.techniques[graph.technique[edge]],
+                    cut_off=cut_off,
+                )
+                for edge, cut_off in analysis.edges
+            ],
+        )
+
+    def _compute_lock(self, gen_key: str) -> Lock:
+        with self._lock:
+            return self._compute_locks.setdefault(gen_key, Lock())
+
+
+choke_point_repository = ChokePointRepository()
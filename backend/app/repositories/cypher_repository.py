@@ -1,26 +1,24 @@
 from __future__ import annotations
 
-from typing import Any, List
+from typing import Any, AsyncIterator
 
+from neo4j import Record
 from neo4j.graph import Node, Relationship, Path
 
 from app.ingestion.models import CypherQueryResponse, GraphEdge, GraphNode
-from app.repositories.neo4j_client import neo4j_client
+from app.repositories.neo4j_client import async_neo4j_client
 
 
 class CypherRepository:
-    def run_query(self, query: str, params: dict | None = None) -> CypherQueryResponse:
-        records = neo4j_client.query(query, params or {})
+    async def run_query(self, query: str, params: dict | None = None) -> CypherQueryResponse:
         node_map: dict[str, GraphNode] = {}
         edge_map: dict[str, GraphEdge] = {}
         table: list[dict[str, Any]] = []
 
-        for record in records:
-            row = {}
-            for key, value in record.items():
-                converted = self._convert_value(value, node_map, edge_map)
-                row[key] = converted
-            table.append(row)
+        async for record in async_neo4j_client.stream(
+            query, params or {}, name="cypher.execute"
+        ):
+            table.append(self._convert_record(record, node_map, edge_map))
 
         return CypherQueryResponse(
             nodes=list(node_map.values()),
@@ -28,6 +26,43 @@ class CypherRepository:
             table=table,
         )
 
+    async def stream_query(
+        self, query: str, params: dict | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield ``{"node": ...}``, ``{"edge": ...}`` and ``{"row": ...}`` items.
+
+        Each node and edge is yielded once, before the first row that refers
+        to it; only their ids are kept across rows.
+        """
+        seen_nodes: set[str] = set()
+        seen_edges: set[str] = set()
+        async for record in async_neo4j_client.stream(
+            query, params or {}, name="cypher.stream"
+        ):
+            node_map: dict[str, GraphNode] = {}
+            edge_map: dict[str, GraphEdge] = {}
+            row = self._convert_record(record, node_map, edge_map)
+            for node_id, node in node_map.items():
+                if node_id not in seen_nodes:
+                    seen_nodes.add(node_id)
+                    yield {"node": node}
+            for edge_id, edge in edge_map.items():
+                if edge_id not in seen_edges:
+                    seen_edges.add(edge_id)
+                    yield {"edge": edge}
+            yield {"row": row}
+
+    def _convert_record(
+        self,
+        record: Record,
+        node_map: dict[str, GraphNode],
+        edge_map: dict[str, GraphEdge],
+    ) -> dict[str, Any]:
+        return {
+            key: self._convert_value(value, node_map, edge_map)
+            for key, value in record.items()
+        }
+
     def _convert_value(
         self,
         value,
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+
+from app.core.logger import logger
+from app.repositories.neo4j_client import async_neo4j_client, neo4j_client
+
+# How long readers reuse the cluster -> current generation map. Switches made
+# by this process update it immediately; the TTL only bounds staleness for
+# switches made by other processes.
+GENERATION_CACHE_SECONDS = 5.0
+
+CURRENT_GENERATIONS_QUERY = """
+MATCH (g:AssetGeneration)
+WHERE g.current IS NOT NULL
+RETURN g.cluster AS cluster, g.current AS generation
+"""
+
+
+def generation_key(cluster: str | None, generation: int) -> str:
+    """Value of the indexed ``genKey`` property shared by one cluster generation."""
+    return f"{cluster or ''}#{generation}"
+
+
+@dataclass(frozen=True)
+class Generation:
+    cluster: str
+    number: int
+
+    @property
+    def key(self) -> str:
+        return generation_key(self.cluster, self.number)
+
+    @classmethod
+    def from_key(cls, gen_key: str) -> "Generation":
+        cluster, _, number = gen_key.rpartition("#")
+        return cls(cluster, int(number))
+
+
+class GenerationRepository:
+    """Per-cluster graph generations and the pointer to the current one.
+
+    Every Asset node carries ``generation`` and ``genKey``. FULL ingestion
+    writes a new generation next to the current one and then moves the
+    ``(:AssetGeneration {cluster})`` pointer in a single transaction, so
+    readers filtering on ``genKey IN current_keys()`` switch atomically.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._current: dict[str, int] = {}
+        self._loaded_at: float | None = None
+
+    async def current_keys(self) -> list[str]:
+        """``genKey`` values of every cluster's current generation, for read filters."""
+        current = self._cached()
+        if current is None:
+            records = await async_neo4j_client.execute(
+                CURRENT_GENERATIONS_QUERY, name="generations.current"
+            )
+            current = self._store(records)
+        return [generation_key(cluster, generation) for cluster, generation in current.items()]
+
+    def current(self, cluster: str) -> int | None:
+        current = self._store(
+            neo4j_client.execute(CURRENT_GENERATIONS_QUERY, name="generations.current")
+        )
+        return current.get(cluster)
+
+    def begin(self, cluster: str) -> int:
+        """Reserve the next generation number for ``cluster`` without switching to it."""
+        records = neo4j_client.write(
+            """
+            MERGE (g:AssetGeneration {cluster: $cluster})
+            SET g.latest = coalesce(g.latest, g.current, 0) + 1
+            RETURN g.latest AS generation
+            """,
+            {"cluster": cluster},
+            name="generations.begin",
+        )
+        return records[0]["generation"]
+
+    def activate(self, cluster: str, generation: int) -> None:
+        neo4j_client.write(
+            """
+            MERGE (g:AssetGeneration {cluster: $cluster})
+            SET g.current = $generation,
+                g.latest = CASE WHEN coalesce(g.latest, 0) < $generation
+                                THEN $generation ELSE g.latest END,
+                g.switchedAt = datetime()
+            """,
+            {"cluster": cluster, "generation": generation},
+            name="generations.activate",
+        )
+        with self._lock:
+            self._current[cluster] = generation
+        logger.info("Cluster %s switched to generation %s", cluster, generation)
+
+    def _cached(self) -> dict[str, int] | None:
+        with self._lock:
+            if (
+                self._loaded_at is not None
+                and monotonic() - self._loaded_at < GENERATION_CACHE_SECONDS
+            ):
+                return dict(self._current)
+        return None
+
+    def _store(self, records: list[dict]) -> dict[str, int]:
+        current = {record["cluster"]: record["generation"] for record in records}
+        with self._lock:
+            self._current = current
+            self._loaded_at = monotonic()
+        return dict(current)
+
+
+generation_repository = GenerationRepository()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from threading import Lock
+from time import perf_counter
+from typing import Iterator
+
+from app.config import get_settings
+from app.core.logger import logger
+from app.graph.engine import AttackGraph
+from app.graph.reachability import ReachabilityIndex
+from app.repositories.generation_repository import generation_repository
+from app.repositories.neo4j_client import neo4j_client
+
+GRAPH_NODES_QUERY = """
+MATCH (n:Asset {genKey: $genKey})
+RETURN n.id AS id, n.type AS type, n.namespace AS namespace, n.criticality AS criticality
+"""
+
+GRAPH_EDGES_QUERY = """
+MATCH (src:Asset {genKey: $genKey})-[r:ATTACK_REL]->(dst:Asset)
+RETURN src.id AS source, dst.id AS target, r.confidence AS confidence, r.technique AS technique
+"""
+
+
+class GraphUnavailable(Exception):
+    """Some current generation has no in-memory snapshot, so only Cypher can answer."""
+
+
+class GraphTooLarge(Exception):
+    """The generation has more edges than GRAPH_ENGINE_MAX_EDGES allows in memory."""
+
+
+class AttackGraphRepository:
+    """In-memory ``AttackGraph`` snapshots of every cluster's current generation.
+
+    Ingestion reloads a generation's snapshot once its write is done; a
+    generation nobody has loaded yet (e.g. after a restart) is loaded by the
+    first search that needs it. Generations that are no longer current are
+    dropped on the next lookup. A generation with more than
+    GRAPH_ENGINE_MAX_EDGES edges is cached as ``None`` and searched in Neo4j.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._graphs: dict[str, AttackGraph | None] = {}
+        self._load_locks: dict[str, Lock] = {}
+
+    async def current(self) -> list[AttackGraph] | None:
+        """Snapshots of every current generation, or None when a search must go to Neo4j."""
+        if not get_settings().graph_engine_enabled:
+            return None
+        keys = await generation_repository.current_keys()
+        with self._lock:
+            for stale in set(self._graphs) - set(keys):
+                del self._graphs[stale]
+                self._load_locks.pop(stale, None)
+            missing = [key for key in keys if key not in self._graphs]
+        if missing:
+            try:
+                await asyncio.gather(
+                    *(asyncio.to_thread(self._load_missing, key) for key in missing)
+                )
+            except Exception as exc:  # noqa: BLE001 - Cypher search still works
+                logger.warning("Loading attack graphs failed, searching in Neo4j: %s", exc)
+                return None
+        with self._lock:
+            graphs = [self._graphs.get(key) for key in keys]
+        if any(graph is None for graph in graphs):
+            return None
+        return graphs
+
+    def load(self, gen_key: str) -> AttackGraph | None:
+        """Read ``gen_key``'s nodes and edges from Neo4j into a fresh snapshot."""
+        with self._load_lock(gen_key):
+            return self._load(gen_key)
+
+    def refresh(self, gen_key: str) -> AttackGraph | None:
+        """Reload ``gen_key`` after ingestion wrote to it and return the snapshot.
+
+        Never fails the caller: returns None when the engine is disabled, the
+        generation is too large or reading it failed.
+        """
+        if not get_settings().graph_engine_enabled:
+            return None
+        try:
+            return self.load(gen_key)
+        except Exception as exc:  # noqa: BLE001 - the next search loads it again
+            logger.warning("Reloading attack graph %s failed: %s", gen_key, exc)
+            with self._lock:
+                self._graphs.pop(gen_key, None)
+            return None
+
+    def snapshot(self, gen_key: str) -> AttackGraph | None:
+        """``gen_key``'s cached snapshot, else one read just for the caller
+        (without a reachability index); None if it is too large."""
+        with self._lock:
+            if gen_key in self._graphs:
+                return self._graphs[gen_key]
+        try:
+            return self._read(gen_key)
+        except GraphTooLarge:
+            return None
+
+    def _load_missing(self, gen_key: str) -> None:
+        with self._load_lock(gen_key):
+            with self._lock:
+                if gen_key in self._graphs:
+                    return
+            self._load(gen_key)
+
+    def _load(self, gen_key: str) -> AttackGraph | None:
+        started = perf_counter()
+        try:
+            graph = self._read(gen_key)
+            graph.reachability = ReachabilityIndex.build(graph)
+        except GraphTooLarge:
+            logger.info(
+                "Generation %s has over %s edges; its paths are searched in Neo4j",
+                gen_key,
+                get_settings().graph_engine_max_edges,
+            )
+            graph = None
+        else:
+            logger.info(
+                "Loaded attack graph %s: %s nodes, %s edges, %s high-value targets, "
+                "%.1f MiB in %.2fs",
+                gen_key,
+                graph.node_count,
+                graph.edge_count,
+                len(graph.reachability.targets),
+                graph.nbytes / 2**20,
+                perf_counter() - started,
+            )
+        with self._lock:
+            self._graphs[gen_key] = graph
+        return graph
+
+    def _read(self, gen_key: str) -> AttackGraph:
+        params = {"genKey": gen_key}
+        nodes = (
+            (record["id"], record["type"], record["namespace"], record["criticality"])
+            for record in neo4j_client.stream(
+                GRAPH_NODES_QUERY, params, name="graph.load_nodes"
+            )
+        )
+        return AttackGraph.build(gen_key, nodes, self._edges(params))
+
+    def _edges(self, params: dict) -> Iterator[tuple]:
+        limit = get_settings().graph_engine_max_edges
+        for count, record in enumerate(
+            neo4j_client.stream(GRAPH_EDGES_QUERY, params, name="graph.load_edges"), 1
+        ):
+            if count > limit:
+                raise GraphTooLarge()
+            yield record["source"], record["target"], record["confidence"], record["technique"]
+
+    def _load_lock(self, gen_key: str) -> Lock:
+        with self._lock:
+            return self._load_locks.setdefault(gen_key, Lock())
+
+
+attack_graph_repository = AttackGraphRepository()
@@ -1,47 +1,400 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import logging
+from time import perf_counter
+from typing import Any, AsyncIterator, Callable, Iterator
 
-from neo4j import GraphDatabase, Session, basic_auth
+from neo4j import (
+    READ_ACCESS,
+    AsyncGraphDatabase,
+    AsyncManagedTransaction,
+    GraphDatabase,
+    ManagedTransaction,
+    Record,
+    basic_auth,
+    unit_of_work,
+)
+from neo4j.exceptions import ClientError
 
 from app.config import get_settings
 from app.core.logger import logger
+from app.core.metrics import NEO4J_QUERY_ERRORS, NEO4J_QUERY_SECONDS, NEO4J_SLOW_QUERIES
+
+# Transaction timeout budget in seconds per named query, one per repository
+# method. NEO4J_QUERY_TIMEOUTS overrides single entries. Other API reads get
+# REQUEST_TIMEOUT; other ingestion queries (batches, sweeps) the server default.
+QUERY_TIMEOUTS: dict[str, float] = {
+    "assets.list": 10.0,
+    "assets.detail": 10.0,
+    "attack_paths.search": 30.0,
+    "attack_paths.high_value": 30.0,
+    "attack_paths.hydrate": 10.0,
+    "attack_paths.batch": 30.0,
+    "attack_paths.batch_starts": 10.0,
+    "attack_paths.shortest": 20.0,
+    "assets.export": 300.0,
+    "cypher.execute": 30.0,
+    "cypher.stream": 300.0,
+    "generations.current": 5.0,
+    "health.components": 3.0,
+    "schema.status": 5.0,
+}
+
+TIMED_OUT_CODE_PREFIX = "Neo.ClientError.Transaction.TransactionTimedOut"
+POOL_TIMEOUT_MESSAGE = "failed to obtain a connection from the pool"
+
+
+class QueryTimeoutError(Exception):
+    """A query ran past its transaction timeout and was terminated by the server."""
+
+    def __init__(self, name: str | None, timeout: float | None):
+        self.name = name
+        self.timeout = timeout
+        super().__init__(f"Query {name or 'unnamed'} exceeded its {timeout}s budget")
+
+
+class PoolTimeoutError(Exception):
+    """No pooled connection became free within the acquisition timeout."""
+
+
+def query_timeout(name: str | None) -> float | None:
+    overrides = get_settings().neo4j_query_timeouts
+    if name in overrides:
+        return overrides[name]
+    return QUERY_TIMEOUTS.get(name)
+
+
+def _driver_config() -> dict[str, Any]:
+    settings = get_settings()
+    return {
+        "auth": basic_auth(settings.neo4j_user, settings.neo4j_password),
+        "max_connection_pool_size": settings.neo4j_max_connection_pool_size,
+        "connection_acquisition_timeout": settings.neo4j_connection_acquisition_timeout,
+    }
+
+
+def _translate(exc: Exception, name: str | None, timeout: float | None) -> Exception:
+    if not isinstance(exc, ClientError):
+        return exc
+    if exc.code and exc.code.startswith(TIMED_OUT_CODE_PREFIX):
+        logger.warning("Query %s cancelled after its %ss timeout", name or "unnamed", timeout)
+        return QueryTimeoutError(name, timeout)
+    if exc.code is None and POOL_TIMEOUT_MESSAGE in str(exc):
+        logger.warning("Neo4j connection pool exhausted running query %s", name or "unnamed")
+        return PoolTimeoutError(str(exc))
+    return exc
+
+
+def plan_summary(plan: dict | None) -> str:
+    """Operator tree of an EXPLAIN plan on one line, with estimated rows.
+
+    E.g. ``ProduceResults~5(Limit~5(Expand(All)~1200(NodeIndexSeek~10)))``.
+    """
+    if not plan:
+        return "unavailable"
+    operator = plan["operatorType"].split("@")[0]
+    rows = plan.get("args", {}).get("EstimatedRows")
+    text = f"{operator}~{rows:.0f}" if rows is not None else operator
+    children = plan.get("children") or []
+    if children:
+        text += "(" + ", ".join(plan_summary(child) for child in children) + ")"
+    return text
+
+
+def _log_query(name: str, query: str, parameters: dict[str, Any] | None) -> None:
+    # Parameter values can be whole ingestion batches; only name them.
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Running query %s: %s (parameters: %s)",
+            name,
+            " ".join(query.split()),
+            ", ".join(sorted(parameters or {})),
+        )
+
+
+def _record(name: str, mode: str, seconds: float) -> bool:
+    """Observe a query's latency; true if it counts as slow."""
+    NEO4J_QUERY_SECONDS.labels(name, mode).observe(seconds)
+    threshold = get_settings().neo4j_slow_query_seconds
+    if threshold <= 0 or seconds < threshold:
+        return False
+    NEO4J_SLOW_QUERIES.labels(name).inc()
+    return True
 
 
 class Neo4jClient:
     def __init__(self) -> None:
         settings = get_settings()
-        self._driver = GraphDatabase.driver(
-            settings.neo4j_uri,
-            auth=basic_auth(settings.neo4j_user, settings.neo4j_password),
-        )
+        self._driver = GraphDatabase.driver(settings.neo4j_uri, **_driver_config())
         self._database = settings.neo4j_database
 
     def close(self) -> None:
         self._driver.close()
 
-    def execute(self, query: str, parameters: dict[str, Any] | None = None):
+    def execute(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        name: str | None = None,
+    ):
+        return self._run(query, parameters, name, _read_data, write=False)
+
+    def query(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        name: str | None = None,
+    ):
+        return self._run(query, parameters, name, _read_records, write=False)
+
+    def write(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        name: str | None = None,
+    ):
+        return self._run(query, parameters, name, _read_data, write=True)
+
+    def stream(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        name: str | None = None,
+        fetch_size: int | None = None,
+    ) -> Iterator[Record]:
+        """Blocking counterpart of ``AsyncNeo4jClient.stream``."""
         settings = get_settings()
-        parameters = parameters or {}
-        logger.debug("Running Cypher %s with %s", query, parameters)
-        with self._driver.session(database=self._database) as session:
-            return session.read_transaction(
-                lambda tx: tx.run(query, parameters).data()
-            )
-
-    def query(self, query: str, parameters: dict[str, Any] | None = None):
-        parameters = parameters or {}
-        with self._driver.session(database=self._database) as session:
-            return session.read_transaction(
-                lambda tx: list(tx.run(query, parameters))
-            )
-
-    def write(self, query: str, parameters: dict[str, Any] | None = None):
-        parameters = parameters or {}
-        with self._driver.session(database=self._database) as session:
-            return session.write_transaction(
-                lambda tx: tx.run(query, parameters).data()
-            )
+        label = name or "unnamed"
+        timeout = query_timeout(name)
+        _log_query(label, query, parameters)
+        started = perf_counter()
+        try:
+            with self._driver.session(
+                database=self._database,
+                default_access_mode=READ_ACCESS,
+                fetch_size=fetch_size or settings.neo4j_fetch_size,
+            ) as session:
+                with session.begin_transaction(timeout=timeout) as tx:
+                    yield from tx.run(query, parameters or {})
+        except Exception as exc:
+            NEO4J_QUERY_ERRORS.labels(label, type(exc).__name__).inc()
+            raise _translate(exc, name, timeout) from exc
+        finally:
+            NEO4J_QUERY_SECONDS.labels(label, "stream").observe(perf_counter() - started)
+
+    def _run(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None,
+        name: str | None,
+        work: Callable,
+        *,
+        write: bool,
+    ):
+        label = name or "unnamed"
+        timeout = query_timeout(name)
+        work = unit_of_work(timeout=timeout)(work)
+        _log_query(label, query, parameters)
+        started = perf_counter()
+        try:
+            with self._driver.session(database=self._database) as session:
+                execute = session.execute_write if write else session.execute_read
+                rows = execute(work, query, parameters or {})
+        except Exception as exc:
+            NEO4J_QUERY_ERRORS.labels(label, type(exc).__name__).inc()
+            raise _translate(exc, name, timeout) from exc
+        finally:
+            seconds = perf_counter() - started
+            slow = _record(label, "write" if write else "read", seconds)
+        if slow:
+            self._log_slow(label, seconds, query, parameters, write)
+        return rows
+
+    def _log_slow(
+        self,
+        name: str,
+        seconds: float,
+        query: str,
+        parameters: dict[str, Any] | None,
+        write: bool,
+    ) -> None:
+        plan = None
+        try:
+            with self._driver.session(database=self._database) as session:
+                execute = session.execute_write if write else session.execute_read
+                plan = execute(_explain, query, parameters or {})
+        except Exception as exc:  # noqa: BLE001 - the plan is best effort
+            logger.debug("EXPLAIN of slow query %s failed: %s", name, exc)
+        logger.warning("Slow query %s took %.2fs; plan: %s", name, seconds, plan_summary(plan))
+
+
+class AsyncNeo4jClient:
+    """Neo4j access for API requests, awaiting the driver instead of blocking the event loop.
+
+    Ingestion and schema bootstrap run in worker threads and keep using the
+    synchronous ``Neo4jClient``; each client has its own connection pool.
+    Cancelling the awaiting task (e.g. when the HTTP client disconnects)
+    closes the connection, which makes the server roll the transaction back.
+    """
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._driver = AsyncGraphDatabase.driver(settings.neo4j_uri, **_driver_config())
+        self._database = settings.neo4j_database
+
+    async def close(self) -> None:
+        await self._driver.close()
+
+    async def execute(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        name: str | None = None,
+    ):
+        return await self._run(query, parameters, name, _fetch_data, write=False)
+
+    async def query(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        name: str | None = None,
+    ):
+        return await self._run(query, parameters, name, _fetch_records, write=False)
+
+    async def write(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        name: str | None = None,
+    ):
+        return await self._run(query, parameters, name, _fetch_data, write=True)
+
+    async def stream(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        *,
+        name: str | None = None,
+        fetch_size: int | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[Record]:
+        """Yield a read query's records as the server sends them.
+
+        Records are pulled ``fetch_size`` at a time (NEO4J_FETCH_SIZE by
+        default), so memory stays bounded however many rows the query
+        returns. Unlike ``query`` the transaction is not retried: rows may
+        already have been handed out when it fails. ``timeout`` overrides
+        the one configured for ``name``.
+        """
+        settings = get_settings()
+        label = name or "unnamed"
+        if timeout is None:
+            timeout = query_timeout(name)
+        if timeout is None:
+            timeout = settings.request_timeout
+        _log_query(label, query, parameters)
+        started = perf_counter()
+        try:
+            async with self._driver.session(
+                database=self._database,
+                default_access_mode=READ_ACCESS,
+                fetch_size=fetch_size or settings.neo4j_fetch_size,
+            ) as session:
+                async with await session.begin_transaction(timeout=timeout) as tx:
+                    result = await tx.run(query, parameters or {})
+                    async for record in result:
+                        yield record
+        except Exception as exc:
+            NEO4J_QUERY_ERRORS.labels(label, type(exc).__name__).inc()
+            raise _translate(exc, name, timeout) from exc
+        finally:
+            # Includes the time the consumer spent between records, so
+            # streams are kept out of the slow query log.
+            NEO4J_QUERY_SECONDS.labels(label, "stream").observe(perf_counter() - started)
+
+    async def _run(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None,
+        name: str | None,
+        work: Callable,
+        *,
+        write: bool,
+    ):
+        label = name or "unnamed"
+        timeout = query_timeout(name)
+        if timeout is None and not write:
+            timeout = get_settings().request_timeout
+        work = unit_of_work(timeout=timeout)(work)
+        _log_query(label, query, parameters)
+        started = perf_counter()
+        try:
+            async with self._driver.session(database=self._database) as session:
+                execute = session.execute_write if write else session.execute_read
+                rows = await execute(work, query, parameters or {})
+        except Exception as exc:
+            NEO4J_QUERY_ERRORS.labels(label, type(exc).__name__).inc()
+            raise _translate(exc, name, timeout) from exc
+        finally:
+            seconds = perf_counter() - started
+            slow = _record(label, "write" if write else "read", seconds)
+        if slow:
+            await self._log_slow(label, seconds, query, parameters, write)
+        return rows
+
+    async def _log_slow(
+        self,
+        name: str,
+        seconds: float,
+        query: str,
+        parameters: dict[str, Any] | None,
+        write: bool,
+    ) -> None:
+        plan = None
+        try:
+            async with self._driver.session(database=self._database) as session:
+                execute = session.execute_write if write else session.execute_read
+                plan = await execute(_explain_async, query, parameters or {})
+        except Exception as exc:  # noqa: BLE001 - the plan is best effort
+            logger.debug("EXPLAIN of slow query %s failed: %s", name, exc)
+        logger.warning("Slow query %s took %.2fs; plan: %s", name, seconds, plan_summary(plan))
+
+
+def _read_data(tx: ManagedTransaction, query: str, parameters: dict[str, Any]):
+    return tx.run(query, parameters).data()
+
+
+def _read_records(tx: ManagedTransaction, query: str, parameters: dict[str, Any]):
+    return list(tx.run(query, parameters))
+
+
+def _explain(tx: ManagedTransaction, query: str, parameters: dict[str, Any]):
+    return tx.run(f"EXPLAIN {query}", parameters).consume().plan
+
+
+async def _fetch_data(tx: AsyncManagedTransaction, query: str, parameters: dict[str, Any]):
+    result = await tx.run(query, parameters)
+    return await result.data()
+
+
+async def _fetch_records(tx: AsyncManagedTransaction, query: str, parameters: dict[str, Any]):
+    result = await tx.run(query, parameters)
+    return [record async for record in result]
+
+
+async def _explain_async(
+    tx: AsyncManagedTransaction, query: str, parameters: dict[str, Any]
+):
+    result = await tx.run(f"EXPLAIN {query}", parameters)
+    return (await result.consume()).plan
 
 
 neo4j_client = Neo4jClient()
+async_neo4j_client = AsyncNeo4jClient()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Any
+
+from app.core.logger import logger
+from app.repositories.neo4j_client import async_neo4j_client, neo4j_client
+
+# Run before SCHEMA_STATEMENTS. Asset ids are only unique within a graph
+# generation, so the original single-property constraint has to go.
+SCHEMA_MIGRATIONS: list[str] = [
+    "DROP CONSTRAINT asset_id IF EXISTS",
+]
+
+# Index name -> idempotent DDL. The (genKey, id) uniqueness constraint backs
+# the MERGE/MATCH done by every ingestion batch and the genKey index the
+# current-generation filter of every read; the other indexes cover the
+# properties asset listing and attack path search filter on.
+SCHEMA_STATEMENTS: dict[str, str] = {
+    "asset_generation_id": "CREATE CONSTRAINT asset_generation_id IF NOT EXISTS "
+    "FOR (n:Asset) REQUIRE (n.genKey, n.id) IS UNIQUE",
+    "asset_gen_key": "CREATE INDEX asset_gen_key IF NOT EXISTS FOR (n:Asset) ON (n.genKey)",
+    "asset_generation_cluster": "CREATE CONSTRAINT asset_generation_cluster IF NOT EXISTS "
+    "FOR (g:AssetGeneration) REQUIRE g.cluster IS UNIQUE",
+    "asset_type": "CREATE INDEX asset_type IF NOT EXISTS FOR (n:Asset) ON (n.type)",
+    "asset_namespace": "CREATE INDEX asset_namespace IF NOT EXISTS "
+    "FOR (n:Asset) ON (n.namespace)",
+    "asset_cluster": "CREATE INDEX asset_cluster IF NOT EXISTS FOR (n:Asset) ON (n.cluster)",
+    "asset_last_seen": "CREATE INDEX asset_last_seen IF NOT EXISTS "
+    "FOR (n:Asset) ON (n.lastSeen)",
+    "asset_risk_score": "CREATE INDEX asset_risk_score IF NOT EXISTS "
+    "FOR (n:Asset) ON (n.riskScore)",
+}
+
+BACKFILL_BATCH_SIZE = 10_000
+
+
+class SchemaRepository:
+    """Creates the Asset constraints and indexes once per process."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._applied = False
+        self._error: str | None = None
+
+    def ensure(self) -> bool:
+        """Apply the schema unless already done; safe to call before every write."""
+        if self._applied:
+            return True
+        with self._lock:
+            if self._applied:
+                return True
+            try:
+                for statement in SCHEMA_MIGRATIONS:
+                    neo4j_client.write(statement, name="schema.ensure")
+                for name, statement in SCHEMA_STATEMENTS.items():
+                    neo4j_client.write(statement, name="schema.ensure")
+                    logger.debug("Ensured schema object %s", name)
+                self._backfill_generations()
+                self._backfill_owners()
+            except Exception as exc:  # noqa: BLE001 - must not break startup or ingestion
+                # Either Neo4j is unreachable (retried before the next write) or
+                # duplicate Asset ids block the constraint; ingestion still works.
+                self._error = str(exc)
+                logger.error("Schema bootstrap failed: %s", exc)
+                return False
+            self._applied = True
+            self._error = None
+            logger.info("Neo4j schema ready (%s)", ", ".join(SCHEMA_STATEMENTS))
+            return True
+
+    def _backfill_generations(self) -> None:
+        """Put assets written before graph generations existed into generation 0."""
+        updated = self._update_in_batches(
+            """
+            MATCH (n:Asset)
+            WHERE n.genKey IS NULL
+            WITH n LIMIT $limit
+            SET n.generation = 0, n.genKey = coalesce(n.cluster, '') + '#0'
+            RETURN count(n) AS updated
+            """
+        )
+        if not updated:
+            return
+        neo4j_client.write(
+            """
+            MATCH (n:Asset {generation: 0})
+            WITH DISTINCT coalesce(n.cluster, '') AS cluster
+            MERGE (g:AssetGeneration {cluster: cluster})
+            ON CREATE SET g.current = 0, g.latest = 0
+            """,
+            name="schema.backfill",
+        )
+        logger.info("Moved %s pre-generation assets into generation 0", updated)
+
+    def _backfill_owners(self) -> None:
+        """Move the owner of derived assets out of their metadata (``meta_owner``)."""
+        updated = self._update_in_batches(
+            """
+            MATCH (n:Asset)
+            WHERE n.meta_owner IS NOT NULL
+            WITH n LIMIT $limit
+            SET n.owner = n.meta_owner
+            REMOVE n.meta_owner
+            RETURN count(n) AS updated
+            """
+        )
+        if updated:
+            logger.info("Moved the owner of %s assets out of their metadata", updated)
+
+    def _update_in_batches(self, query: str) -> int:
+        updated = 0
+        while True:
+            records = neo4j_client.write(
+                query, {"limit": BACKFILL_BATCH_SIZE}, name="schema.backfill"
+            )
+            batch = records[0]["updated"] if records else 0
+            updated += batch
+            if batch < BACKFILL_BATCH_SIZE:
+                return updated
+
+    async def status(self) -> dict[str, Any]:
+        indexes: dict[str, str] = {}
+        try:
+            records = await async_neo4j_client.execute(
+                "SHOW INDEXES YIELD name, state WHERE name IN $names RETURN name, state",
+                {"names": list(SCHEMA_STATEMENTS)},
+                name="schema.status",
+            )
+            indexes = {record["name"]: record["state"] for record in records}
+        except Exception as exc:  # noqa: BLE001 - reported through the health check
+            logger.error("Schema status check failed: %s", exc)
+            return {"status": "unknown", "error": str(exc)}
+        objects = {name: indexes.get(name, "MISSING") for name in SCHEMA_STATEMENTS}
+        if all(state == "ONLINE" for state in objects.values()):
+            status = "ready"
+        elif self._error:
+            status = "error"
+        else:
+            status = "pending"
+        result: dict[str, Any] = {"status": status, "indexes": objects}
+        if self._error:
+            result["error"] = self._error
+        return result
+
+
+schema_repository = SchemaRepository()
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from app.dependencies import verify_api_key
+from app.dependencies import cancel_on_disconnect, ndjson_response, verify_api_key
 from app.models.domain import (
     AssetDetailResponse,
     AssetFilter,
     AssetListResponse,
+    AssetSort,
     NodeType,
 )
 from app.services.asset_service import asset_service
@@ -18,9 +19,12 @@ router = APIRouter(
 
 @router.get("", response_model=AssetListResponse)
 async def list_assets(
+    request: Request,
     type: NodeType | None = Query(default=None),
     namespace: str | None = Query(default=None),
     search: str | None = Query(default=None),
+    min_risk: float | None = Query(default=None, ge=0, alias="minRisk"),
+    sort: AssetSort = Query(default=AssetSort.LAST_SEEN),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=25, ge=1, le=100, alias="pageSize"),
 ):
@@ -28,15 +32,29 @@ async def list_assets(
         type=type,
         namespace=namespace,
         search=search,
+        min_risk=min_risk,
+        sort=sort,
         page=page,
         page_size=page_size,
     )
-    return asset_service.list_assets(filters)
+    return await cancel_on_disconnect(request, asset_service.list_assets(filters))
+
+
+@router.get("/export")
+async def export_assets(
+    request: Request,
+    type: NodeType | None = Query(default=None),
+    namespace: str | None = Query(default=None),
+    search: str | None = Query(default=None),
+    min_risk: float | None = Query(default=None, ge=0, alias="minRisk"),
+):
+    filters = AssetFilter(type=type, namespace=namespace, search=search, min_risk=min_risk)
+    return await ndjson_response(request, asset_service.export_assets(filters))
 
 
 @router.get("/{asset_id}", response_model=AssetDetailResponse)
-async def get_asset(asset_id: str):
-    asset = asset_service.get_asset(asset_id)
+async def get_asset(asset_id: str, request: Request):
+    asset = await cancel_on_disconnect(request, asset_service.get_asset(asset_id))
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     return asset
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 
-from app.dependencies import verify_api_key
+from app.dependencies import cancel_on_disconnect, ndjson_response, verify_api_key
 from app.models.domain import (
     AttackPathSearchRequest,
     AttackPathSearchResponse,
+    AttackPathStreamRequest,
+    BatchPathSearchRequest,
+    BatchPathSearchResponse,
+    ChokePointsResponse,
+    ExposedAssetsResponse,
     HighValuePathRequest,
+    NodeType,
+    ReachabilityResponse,
     ShortestPathRequest,
 )
+from app.graph.choke_points import CHOKE_POINT_LIMIT
+from app.graph.reachability import HIGH_VALUE_TYPES
 from app.services.attack_path_service import attack_path_service
 
 router = APIRouter(
@@ -17,15 +26,57 @@ router = APIRouter(
 
 
 @router.post("/search", response_model=AttackPathSearchResponse)
-async def search_attack_paths(payload: AttackPathSearchRequest):
-    return attack_path_service.search(payload)
+async def search_attack_paths(payload: AttackPathSearchRequest, request: Request):
+    return await cancel_on_disconnect(request, attack_path_service.search(payload))
+
+
+@router.post("/search/stream")
+async def stream_attack_paths(payload: AttackPathStreamRequest, request: Request):
+    return await ndjson_response(request, attack_path_service.stream_search(payload))
 
 
 @router.post("/high-value", response_model=AttackPathSearchResponse)
-async def search_high_value_paths(payload: HighValuePathRequest):
-    return attack_path_service.search_high_value(payload)
+async def search_high_value_paths(payload: HighValuePathRequest, request: Request):
+    return await cancel_on_disconnect(request, attack_path_service.search_high_value(payload))
+
+
+@router.post("/batch", response_model=BatchPathSearchResponse)
+async def search_batch_paths(payload: BatchPathSearchRequest, request: Request):
+    return await cancel_on_disconnect(request, attack_path_service.search_batch(payload))
 
 
 @router.post("/shortest", response_model=AttackPathSearchResponse)
-async def shortest_path(payload: ShortestPathRequest):
-    return attack_path_service.shortest_path(payload)
+async def shortest_path(payload: ShortestPathRequest, request: Request):
+    return await cancel_on_disconnect(request, attack_path_service.shortest_path(payload))
+
+
+@router.get("/reachability/{asset_id}", response_model=ReachabilityResponse)
+async def reachability(asset_id: str):
+    return await attack_path_service.reachability(asset_id)
+
+
+@router.get("/choke-points", response_model=ChokePointsResponse)
+async def choke_points(
+    cluster: str | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=CHOKE_POINT_LIMIT),
+):
+    return await attack_path_service.choke_points(cluster=cluster, limit=limit)
+
+
+@router.get("/exposed", response_model=ExposedAssetsResponse)
+async def exposed_assets(
+    type: NodeType | None = Query(default=None),
+    namespace: str | None = Query(default=None),
+    target_types: list[NodeType] = Query(default=list(HIGH_VALUE_TYPES), alias="targetTypes"),
+    max_depth: int | None = Query(default=None, ge=1, alias="maxDepth"),
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=50, ge=1, le=500, alias="pageSize"),
+):
+    return await attack_path_service.exposed_assets(
+        start_type=type,
+        namespace=namespace,
+        target_types=target_types,
+        max_depth=max_depth,
+        page=page,
+        page_size=page_size,
+    )
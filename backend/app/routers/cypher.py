@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
-from app.dependencies import verify_api_key
+from app.dependencies import cancel_on_disconnect, ndjson_response, verify_api_key
 from app.ingestion.models import CypherQueryRequest, CypherQueryResponse
 from app.services.cypher_service import cypher_service
 
@@ -12,5 +12,10 @@ router = APIRouter(
 
 
 @router.post("/execute", response_model=CypherQueryResponse)
-async def execute_query(payload: CypherQueryRequest):
-    return cypher_service.execute(payload)
+async def execute_query(payload: CypherQueryRequest, request: Request):
+    return await cancel_on_disconnect(request, cypher_service.execute(payload))
+
+
+@router.post("/stream")
+async def stream_query(payload: CypherQueryRequest, request: Request):
+    return await ndjson_response(request, cypher_service.stream(payload))
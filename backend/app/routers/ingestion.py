@@ -36,6 +36,11 @@ async def list_jobs():
     return ingestion_service.list_jobs()
 
 
+@router.post("/jobs/{job_id}/resume", response_model=IngestionJob)
+async def resume_job(job_id: str, background_tasks: BackgroundTasks):
+    return ingestion_service.resume_job(background_tasks=background_tasks, job_id=job_id)
+
+
 @router.get("/jobs/{job_id}", response_model=IngestionJob)
 async def get_job(job_id: str):
     return ingestion_service.get_job(job_id)
@@ -1,5 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
+from app.core.metrics import render
 from app.services.health_service import health_service
 
 router = APIRouter(prefix="/api/system", tags=["system"])
@@ -7,4 +8,10 @@ router = APIRouter(prefix="/api/system", tags=["system"])
 
 @router.get("/health")
 async def health():
-    return health_service.check()
+    return await health_service.check()
+
+
+@router.get("/metrics")
+async def metrics():
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
@@ -1,22 +1,28 @@
 from __future__ import annotations
 
+from typing import AsyncIterator
+
 from app.models.domain import (
     AssetDetailResponse,
     AssetFilter,
     AssetListResponse,
+    AssetNode,
 )
 from app.repositories.asset_repository import asset_repository
 
 
 class AssetService:
-    def list_assets(self, filters: AssetFilter) -> AssetListResponse:
-        items, total = asset_repository.list_assets(filters)
+    async def list_assets(self, filters: AssetFilter) -> AssetListResponse:
+        items, total = await asset_repository.list_assets(filters)
         return AssetListResponse(
             items=items, total=total, page=filters.page, page_size=filters.page_size
         )
 
-    def get_asset(self, asset_id: str) -> AssetDetailResponse | None:
-        return asset_repository.get_asset_detail(asset_id)
+    async def get_asset(self, asset_id: str) -> AssetDetailResponse | None:
+        return await asset_repository.get_asset_detail(asset_id)
+
+    def export_assets(self, filters: AssetFilter) -> AsyncIterator[AssetNode]:
+        return asset_repository.export_assets(filters)
 
 
 asset_service = AssetService()
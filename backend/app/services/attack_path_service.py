@@ -1,18 +1,33 @@
 from __future__ import annotations
 
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException, status
+
 from app.models.domain import (
     AttackPath,
     AttackPathSearchRequest,
     AttackPathSearchResponse,
+    AttackPathStreamRequest,
+    BatchPathSearchRequest,
+    BatchPathSearchResponse,
+    ChokePointsResponse,
+    ExposedAssetsResponse,
     HighValuePathRequest,
+    NodeType,
+    ReachabilityResponse,
     ShortestPathRequest,
 )
+from app.graph.engine import SearchBudget
+from app.graph.reachability import HIGH_VALUE_TYPES
 from app.repositories.attack_path_repository import attack_path_repository
+from app.repositories.choke_point_repository import choke_point_repository
+from app.repositories.graph_repository import GraphUnavailable
 
 
 class AttackPathService:
-    def search(self, params: AttackPathSearchRequest) -> AttackPathSearchResponse:
-        paths: list[AttackPath] = attack_path_repository.search_paths(
+    async def search(self, params: AttackPathSearchRequest) -> AttackPathSearchResponse:
+        paths: list[AttackPath] = await attack_path_repository.search_paths(
             start_node_id=params.start_node_id,
             start_type=params.start_type,
             target_type=params.target_type,
@@ -23,8 +38,23 @@ class AttackPathService:
         )
         return AttackPathSearchResponse(paths=paths)
 
-    def search_high_value(self, params: HighValuePathRequest) -> AttackPathSearchResponse:
-        paths = attack_path_repository.search_high_value_paths(
+    def stream_search(self, params: AttackPathStreamRequest) -> AsyncIterator[dict[str, Any]]:
+        return attack_path_repository.stream_paths(
+            start_node_id=params.start_node_id,
+            start_type=params.start_type,
+            target_type=params.target_type,
+            namespace=params.namespace,
+            max_depth=params.max_depth,
+            limit=params.limit,
+            budget=SearchBudget(
+                seconds=params.time_budget_seconds, max_expansions=params.max_expansions
+            ),
+        )
+
+    async def search_high_value(
+        self, params: HighValuePathRequest
+    ) -> AttackPathSearchResponse:
+        paths = await attack_path_repository.search_high_value_paths(
             start_node_id=params.start_node_id,
             start_type=params.start_type,
             namespace=params.namespace,
@@ -34,13 +64,106 @@ class AttackPathService:
         )
         return AttackPathSearchResponse(paths=paths)
 
-    def shortest_path(self, params: ShortestPathRequest) -> AttackPathSearchResponse:
-        paths = attack_path_repository.shortest_path(
+    async def search_batch(self, params: BatchPathSearchRequest) -> BatchPathSearchResponse:
+        return await attack_path_repository.search_batch(
+            start_node_ids=params.start_node_ids,
+            start_type=params.start_type,
+            namespace=params.namespace,
+            labels=_parse_label_selector(params.label_selector),
+            target_types=params.target_types,
+            max_depth=params.max_depth,
+            limit=params.limit,
+            max_starts=params.max_starts,
+        )
+
+    async def shortest_path(self, params: ShortestPathRequest) -> AttackPathSearchResponse:
+        paths = await attack_path_repository.shortest_path(
             start_node_id=params.start_node_id,
             target_node_id=params.target_node_id,
             max_depth=params.max_depth,
         )
         return AttackPathSearchResponse(paths=paths)
 
+    async def reachability(self, asset_id: str) -> ReachabilityResponse:
+        try:
+            result = await attack_path_repository.reachability(asset_id)
+        except GraphUnavailable as exc:
+            raise _index_unavailable(exc) from exc
+        if result is None:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        return result
+
+    async def exposed_assets(
+        self,
+        *,
+        start_type: NodeType | None,
+        namespace: str | None,
+        target_types: list[NodeType],
+        max_depth: int | None,
+        page: int,
+        page_size: int,
+    ) -> ExposedAssetsResponse:
+        unindexed = [node_type.value for node_type in target_types if node_type not in HIGH_VALUE_TYPES]
+        if unindexed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Reachability is only indexed for {', '.join(t.value for t in HIGH_VALUE_TYPES)}; "
+                f"got {', '.join(unindexed)}",
+            )
+        try:
+            items, total = await attack_path_repository.exposed_assets(
+                start_type=start_type,
+                namespace=namespace,
+                target_types=target_types,
+                max_depth=max_depth,
+                page=page,
+                page_size=page_size,
+            )
+        except GraphUnavailable as exc:
+            raise _index_unavailable(exc) from exc
+        return ExposedAssetsResponse(items=items, total=total, page=page, page_size=page_size)
+
+    async def choke_points(self, *, cluster: str | None, limit: int) -> ChokePointsResponse:
+        results = await choke_point_repository.current()
+        if cluster is not None:
+            if cluster not in results:
+                raise HTTPException(status_code=404, detail="Cluster not found")
+            results = {cluster: results[cluster]}
+            if results[cluster] is None:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Choke points of cluster {cluster} are unavailable; see the backend log",
+                )
+        items = [
+            result.model_copy(update={"nodes": result.nodes[:limit], "edges": result.edges[:limit]})
+            for result in results.values()
+            if result is not None
+        ]
+        return ChokePointsResponse(items=items)
+
+
+def _parse_label_selector(selector: str | None) -> list[str]:
+    """``k=v`` terms of an equality-based selector, as labels are stored on assets."""
+    labels = []
+    for term in (selector or "").split(","):
+        term = term.strip()
+        if not term:
+            continue
+        key, sep, value = term.replace("==", "=").partition("=")
+        if not sep or not key.strip() or key.endswith("!"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported label selector term {term!r}; only key=value is supported",
+            )
+        labels.append(f"{key.strip()}={value.strip()}")
+    return labels
+
+
+def _index_unavailable(exc: GraphUnavailable) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Reachability index unavailable: {exc}",
+    )
+
 
 attack_path_service = AttackPathService()
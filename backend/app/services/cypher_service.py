@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from typing import Any, AsyncIterator
 
 from fastapi import HTTPException, status
 
@@ -14,7 +15,15 @@ class CypherService:
         re.IGNORECASE,
     )
 
-    def execute(self, payload: CypherQueryRequest) -> CypherQueryResponse:
+    async def execute(self, payload: CypherQueryRequest) -> CypherQueryResponse:
+        self._validate(payload)
+        return await cypher_repository.run_query(payload.query, payload.params or {})
+
+    def stream(self, payload: CypherQueryRequest) -> AsyncIterator[dict[str, Any]]:
+        self._validate(payload)
+        return cypher_repository.stream_query(payload.query, payload.params or {})
+
+    def _validate(self, payload: CypherQueryRequest) -> None:
         if not payload.query or not payload.query.strip():
             raise HTTPException(status_code=400, detail="Query is required")
         if self.FORBIDDEN.search(payload.query):
@@ -22,7 +31,6 @@ class CypherService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Query contains forbidden keywords",
             )
-        return cypher_repository.run_query(payload.query, payload.params or {})
 
 
 cypher_service = CypherService()
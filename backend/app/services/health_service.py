@@ -1,28 +1,34 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Any
 
 from neo4j.exceptions import Neo4jError
 
 from app.config import get_settings
 from app.core.logger import logger
-from app.repositories.neo4j_client import neo4j_client
+from app.repositories.neo4j_client import async_neo4j_client
+from app.repositories.schema_repository import schema_repository
 
 
 class HealthService:
-    def check(self) -> dict[str, str]:
+    async def check(self) -> dict[str, Any]:
         status = "down"
         version = "unknown"
         try:
-            result = neo4j_client.execute("CALL dbms.components() YIELD name, versions")
+            result = await async_neo4j_client.execute(
+                "CALL dbms.components() YIELD name, versions", name="health.components"
+            )
             if result:
                 status = "up"
                 version = result[0]["versions"][0]
         except Neo4jError as exc:
             logger.error("Health check failed: %s", exc)
+        schema = await schema_repository.status() if status == "up" else {"status": "unknown"}
         return {
             "neo4j": status,
             "version": version,
+            "schema": schema,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
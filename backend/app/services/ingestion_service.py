@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import resource
 from datetime import datetime
 from pathlib import Path
 
@@ -7,14 +8,20 @@ from fastapi import BackgroundTasks, HTTPException, UploadFile, status
 
 from app.config import get_settings
 from app.core.logger import logger
-from app.ingestion.collectors import KubernetesCollector
-from app.ingestion.manager import IngestionJobStore, KubeconfigRegistry
+from app.ingestion.checkpoints import CheckpointStore, IngestionCheckpoint
+from app.ingestion.collectors import KubernetesCollector, ResourceVersionExpired
+from app.ingestion.manager import (
+    IngestionJobStore,
+    KubeconfigRegistry,
+    ResourceVersionStore,
+)
 from app.ingestion.models import (
     IngestionJob,
     IngestionJobStatus,
     IngestionMode,
     KubeConfigInfo,
 )
+from app.ingestion.pipeline import IngestionPipeline
 from app.ingestion.writer import GraphWriter
 
 
@@ -23,7 +30,14 @@ class IngestionService:
         settings = get_settings()
         self.registry = KubeconfigRegistry(Path(settings.kubeconfig_dir))
         self.job_store = IngestionJobStore(settings.ingestion_job_retention_hours)
-        self.graph_writer = GraphWriter()
+        self.resource_versions = ResourceVersionStore(
+            Path(settings.storage_dir) / "resource_versions"
+        )
+        self.checkpoints = CheckpointStore(Path(settings.storage_dir) / "checkpoints")
+        self.graph_writer = GraphWriter(
+            target_seconds=settings.ingestion_batch_target_seconds,
+            max_batch_bytes=settings.ingestion_batch_max_bytes,
+        )
 
     def upload_kubeconfig(self, file: UploadFile) -> KubeConfigInfo:
         if not file.filename:
@@ -50,6 +64,33 @@ class IngestionService:
         background_tasks.add_task(self._run_job, job.id, config, mode)
         return job
 
+    def resume_job(self, *, background_tasks: BackgroundTasks, job_id: str) -> IngestionJob:
+        """Start a job writing the uncommitted batches of a failed job's checkpoint."""
+        try:
+            checkpoint = self.checkpoints.get(job_id)
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        try:
+            if self.job_store.get(job_id).status != IngestionJobStatus.FAILED:
+                raise HTTPException(status_code=409, detail=f"Job {job_id} has not failed")
+        except KeyError:
+            pass  # The job record expired or the API restarted; the checkpoint remains.
+        if not checkpoint.collected:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Job {job_id} failed before its collection finished; run it again",
+            )
+        try:
+            config = self.registry.get(checkpoint.meta["config_id"])
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        job = self.job_store.create(
+            config, IngestionMode(checkpoint.meta["mode"]), resumed_from=job_id
+        )
+        checkpoint = self.checkpoints.adopt(job_id, job.id)
+        background_tasks.add_task(self._run_resume, job.id, config, checkpoint)
+        return job
+
     def list_jobs(self) -> list[IngestionJob]:
         return self.job_store.list()
 
@@ -68,12 +109,34 @@ class IngestionService:
         )
         self.job_store.append_log(job_id, "Connecting to cluster")
         kubeconfig_path = self.registry.path_for(config.id)
-        collector = KubernetesCollector(kubeconfig_path, cluster_name=config.name)
+        settings = get_settings()
+        collector = KubernetesCollector(
+            kubeconfig_path,
+            cluster_name=config.name,
+            page_size=settings.k8s_list_page_size,
+            max_workers=settings.k8s_collect_workers,
+            watch_timeout=settings.k8s_watch_timeout_seconds,
+            raw_listing=settings.k8s_raw_listing,
+            metadata_only_secrets=settings.k8s_metadata_only_secrets,
+            progress=lambda message: self.job_store.append_log(job_id, message),
+        )
         try:
-            result = collector.collect()
-            self.job_store.append_log(job_id, f"Collected {len(result.assets)} assets")
-            self.graph_writer.write(result=result, cluster=config.name, mode=mode)
+            versions = self.resource_versions.load(config.id)
+            if mode == IngestionMode.INCREMENTAL and versions:
+                try:
+                    self._apply_changes(job_id, collector, config, versions)
+                except ResourceVersionExpired as exc:
+                    self.job_store.append_log(
+                        job_id, f"{exc}; falling back to a full collection"
+                    )
+                    self._collect_and_write(job_id, collector, config, IngestionMode.FULL)
+            else:
+                self._collect_and_write(job_id, collector, config, mode)
+            self.resource_versions.save(config.id, collector.resource_versions)
             self.job_store.append_log(job_id, "Graph write completed")
+            self.job_store.append_log(
+                job_id, f"API process peak RSS so far: {_process_peak_rss_mib():.0f} MiB"
+            )
             self.job_store.update_status(
                 job_id,
                 status=IngestionJobStatus.SUCCEEDED,
@@ -89,5 +152,100 @@ class IngestionService:
                 finished_at=datetime.utcnow(),
             )
 
+    def _collect_and_write(
+        self,
+        job_id: str,
+        collector: KubernetesCollector,
+        config: KubeConfigInfo,
+        mode: IngestionMode,
+    ):
+        settings = get_settings()
+        checkpoint = None
+        if settings.ingestion_checkpoints:
+            checkpoint = self.checkpoints.create(
+                job_id, config_id=config.id, cluster=config.name, mode=mode.value
+            )
+        try:
+            stats = self._pipeline(job_id).run(
+                collector, cluster=config.name, mode=mode, checkpoint=checkpoint
+            )
+        except Exception:
+            if checkpoint and checkpoint.collected:
+                committed, total = checkpoint.progress()
+                self.job_store.append_log(
+                    job_id,
+                    f"Checkpoint kept with {committed} of {total} batches committed; "
+                    f"resume with POST /api/ingestion/jobs/{job_id}/resume",
+                )
+            elif checkpoint:
+                self.checkpoints.remove(job_id)
+            raise
+        self.job_store.record_timings(job_id, stats.timings)
+        if checkpoint:
+            self.checkpoints.remove(job_id)
+
+    def _run_resume(
+        self, job_id: str, config: KubeConfigInfo, checkpoint: IngestionCheckpoint
+    ):
+        logger.info("Resuming ingestion job %s for config %s", job_id, config.id)
+        self.job_store.update_status(
+            job_id,
+            status=IngestionJobStatus.RUNNING,
+            started_at=datetime.utcnow(),
+        )
+        try:
+            stats = self._pipeline(job_id).resume(checkpoint)
+            self.job_store.record_timings(job_id, stats.timings)
+            self.resource_versions.save(config.id, checkpoint.meta["resource_versions"])
+            self.checkpoints.remove(job_id)
+            self.job_store.append_log(job_id, "Graph write completed")
+            self.job_store.update_status(
+                job_id,
+                status=IngestionJobStatus.SUCCEEDED,
+                finished_at=datetime.utcnow(),
+            )
+            logger.info("Ingestion job %s succeeded", job_id)
+        except Exception as exc:  # pragma: no cover
+            logger.exception("Ingestion job %s failed", job_id)
+            self.job_store.append_log(
+                job_id, f"Failed: {exc}; the checkpoint is kept for another resume"
+            )
+            self.job_store.update_status(
+                job_id,
+                status=IngestionJobStatus.FAILED,
+                finished_at=datetime.utcnow(),
+            )
+
+    def _pipeline(self, job_id: str) -> IngestionPipeline:
+        settings = get_settings()
+        return IngestionPipeline(
+            self.graph_writer,
+            queue_size=settings.ingestion_queue_size,
+            workers=settings.ingestion_writer_workers,
+            deferred_limit=settings.ingestion_deferred_edge_limit,
+            progress=lambda message: self.job_store.append_log(job_id, message),
+        )
+
+    def _apply_changes(
+        self,
+        job_id: str,
+        collector: KubernetesCollector,
+        config: KubeConfigInfo,
+        versions: dict[str, str],
+    ):
+        delta = collector.collect_changes(versions)
+        self.job_store.append_log(
+            job_id,
+            f"Collected {len(delta.assets)} changed assets and "
+            f"{len(delta.deleted_ids)} deletions",
+        )
+        self.graph_writer.apply_delta(delta=delta, cluster=config.name)
+
+
+def _process_peak_rss_mib() -> float:
+    # High-water mark of the whole API process since it started, not of one
+    # job (others may run alongside it); ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
 
 ingestion_service = IngestionService()
@@ -0,0 +1,125 @@
+import asyncio
+
+import numpy as np
+from neo4j import Record
+from neo4j._codec.hydration.v2 import HydrationHandler
+from neo4j.graph import Path
+
+from app.graph.engine import AttackGraph
+from app.models.domain import AttackTechnique, NodeType
+from app.repositories import attack_path_repository as module
+from app.repositories.attack_path_repository import PATH_EDGES_QUERY, AttackPathRepository
+
+GEN_KEY = "prod#3"
+NODES = {
+    "pod-a": {"type": "Pod", "name": "web", "namespace": "shop", "criticality": "LOW"},
+    "sa-a": {"type": "ServiceAccount", "name": "web-sa", "namespace": "shop"},
+    "secret-a": {"type": "Secret", "name": "db-pass", "namespace": "shop", "criticality": "HIGH"},
+}
+EDGES = [
+    ("pod-a", "sa-a", 0.9, AttackTechnique.BELONGS_TO.value),
+    ("sa-a", "secret-a", 0.6, AttackTechnique.PRIV_DISCOVERY.value),
+]
+
+
+class FakeNeo4j:
+    """Answers the hydration queries with records shaped like the driver's."""
+
+    def __init__(self) -> None:
+        hydrator = HydrationHandler().new_hydration_scope()._graph_hydrator
+        self.nodes = {}
+        positions = {node_id: position for position, node_id in enumerate(NODES)}
+        for position, (node_id, properties) in enumerate(NODES.items()):
+            stored = {
+                "id": node_id,
+                "genKey": GEN_KEY,
+                "riskScore": 1.5,
+                "owner": "prod:pod:shop:web",
+                "shared": True,
+            }
+            self.nodes[node_id] = hydrator.hydrate_node(
+                position, ["Asset"], {**stored, **properties}
+            )
+        self.rels = {}
+        for position, (source, target, confidence, technique) in enumerate(EDGES):
+            properties = {"confidence": confidence, "technique": technique, "evidence": "rbac"}
+            self.rels[(source, target, technique)] = hydrator.hydrate_relationship(
+                100 + position,
+                positions[source],
+                positions[target],
+                "ATTACK_REL",
+                properties,
+            )
+
+    async def query(self, query, parameters, *, name=None):
+        records = []
+        for key in parameters["keys"]:
+            if query is PATH_EDGES_QUERY:
+                rel = self.rels[(key["source"], key["target"], key["technique"])]
+                records.append(
+                    Record(
+                        {
+                            "genKey": key["genKey"],
+                            "source": key["source"],
+                            "target": key["target"],
+                            "technique": key["technique"],
+                            "r": rel,
+                        }
+                    )
+                )
+            else:
+                records.append(Record({"genKey": key["genKey"], "n": self.nodes[key["id"]]}))
+        return records
+
+    async def execute(self, query, parameters, *, name=None):
+        return [record.data() for record in await self.query(query, parameters, name=name)]
+
+
+def _graph() -> AttackGraph:
+    return AttackGraph.build(
+        GEN_KEY,
+        [
+            (node_id, properties["type"], properties["namespace"], properties.get("criticality"))
+            for node_id, properties in NODES.items()
+        ],
+        EDGES,
+    )
+
+
+def test_hydrate_reads_driver_records(monkeypatch):
+    monkeypatch.setattr(module, "async_neo4j_client", FakeNeo4j())
+    graph = _graph()
+    starts = np.zeros(graph.node_count, dtype=bool)
+    starts[graph.index["pod-a"]] = True
+    found = graph.top_paths(
+        starts, target_types=[NodeType.SECRET], namespace=None, max_depth=3, limit=5
+    )
+
+    paths = asyncio.run(AttackPathRepository()._hydrate([(graph, path) for path in found]))
+
+    assert len(paths) == 1
+    path = paths[0]
+    assert [step.nodes[0].id for step in path.steps] == ["pod-a", "sa-a", "secret-a"]
+    assert path.steps[2].nodes[0].type == NodeType.SECRET
+    assert path.steps[2].nodes[0].metadata == {"shared": True}
+    edge = path.steps[2].edges[0]
+    assert (edge.source, edge.target) == ("sa-a", "secret-a")
+    assert edge.technique == AttackTechnique.PRIV_DISCOVERY
+    assert edge.confidence == 0.6
+    assert edge.evidence == "rbac"
+    assert path.score == round(found[0].score, 2)
+    assert path.summary == "web → db-pass (2 hops)"
+
+
+def test_map_record_reads_driver_paths():
+    fake = FakeNeo4j()
+    path = Path(
+        fake.nodes["pod-a"],
+        *(fake.rels[(source, target, technique)] for source, target, _, technique in EDGES),
+    )
+
+    mapped = AttackPathRepository()._map_record(Record({"path": path, "score": 4.5}))
+
+    assert [step.nodes[0].id for step in mapped.steps] == ["pod-a", "sa-a", "secret-a"]
+    assert mapped.steps[1].edges[0].technique == AttackTechnique.BELONGS_TO
+    assert mapped.score == 4.5
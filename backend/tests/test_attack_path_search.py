@@ -0,0 +1,109 @@
+import asyncio
+import random
+
+import numpy as np
+import pytest
+
+from app.graph.engine import (
+    CRITICALITY_WEIGHTS,
+    DEFAULT_CONFIDENCE,
+    DEFAULT_CRITICALITY_WEIGHT,
+    NODE_TYPE_CODES,
+    AttackGraph,
+)
+from app.models.domain import NodeType
+from app.repositories import attack_path_repository as module
+from app.repositories.attack_path_repository import AttackPathRepository
+from app.repositories.neo4j_client import QueryTimeoutError
+
+TYPES = [NodeType.POD, NodeType.SERVICE_ACCOUNT, NodeType.SECRET, NodeType.NODE, NodeType.MASTER]
+CRITICALITIES = ["HIGH", "MEDIUM", "LOW", None]
+
+
+def _random_graph(seed: int):
+    rng = random.Random(seed)
+    nodes = [
+        (f"n{i}", rng.choice(TYPES).value, rng.choice(["a", "b"]), rng.choice(CRITICALITIES))
+        for i in range(12)
+    ]
+    edges = [
+        (
+            f"n{rng.randrange(12)}",
+            f"n{rng.randrange(12)}",
+            rng.choice([None, 0.3, 0.5, 0.9]),
+            rng.choice(["t1", "t2"]),
+        )
+        for _ in range(30)
+    ]
+    return nodes, edges
+
+
+def _brute_force_scores(nodes, edges, starts, target_types, max_depth):
+    """Scores of every path the Cypher search matches, best first: 1..max_depth
+    hops, no relationship used twice, each hop adding confidence plus the
+    criticality weight of the node it enters."""
+    node_types = {node_id: node_type for node_id, node_type, _, _ in nodes}
+    weights = {
+        node_id: CRITICALITY_WEIGHTS.get(criticality, DEFAULT_CRITICALITY_WEIGHT)
+        for node_id, _, _, criticality in nodes
+    }
+    scores = []
+
+    def walk(node, used, score):
+        if used and node_types[node] in target_types:
+            scores.append(score)
+        if len(used) == max_depth:
+            return
+        for position, (source, target, confidence, _) in enumerate(edges):
+            if source == node and position not in used:
+                hop = (DEFAULT_CONFIDENCE if confidence is None else confidence) + weights[target]
+                walk(target, used | {position}, score + hop)
+
+    for start in starts:
+        walk(start, frozenset(), 0.0)
+    return sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_top_paths_match_brute_force_ranking(seed):
+    nodes, edges = _random_graph(seed)
+    graph = AttackGraph.build("prod#1", nodes, edges)
+    targets = [NodeType.SECRET, NodeType.MASTER]
+    starts = graph.select(types=[NodeType.POD])
+    expected = _brute_force_scores(
+        nodes,
+        edges,
+        [graph.ids[node] for node in np.flatnonzero(starts)],
+        {node_type.value for node_type in targets},
+        max_depth=4,
+    )
+
+    found = graph.top_paths(starts, target_types=targets, namespace=None, max_depth=4, limit=25)
+
+    assert [path.score for path in found] == pytest.approx(expected[:25], abs=1e-4)
+    for path in found:
+        assert graph.node_type[path.nodes[0]] == NODE_TYPE_CODES[NodeType.POD.value]
+        assert len(set(path.edges)) == len(path.edges)
+
+
+def test_search_paths_in_memory_is_capped_by_query_timeout(monkeypatch):
+    nodes, edges = _random_graph(2)
+    graph = AttackGraph.build("prod#1", nodes, edges)
+
+    async def current():
+        return [graph]
+
+    monkeypatch.setattr(module.attack_graph_repository, "current", current)
+    monkeypatch.setattr(module, "query_timeout", lambda name: 0.0)
+
+    with pytest.raises(QueryTimeoutError):
+        asyncio.run(
+            AttackPathRepository().search_paths(
+                start_node_id=None,
+                start_type=NodeType.POD,
+                target_type=NodeType.SECRET,
+                namespace=None,
+                max_depth=4,
+                limit=5,
+            )
+        )
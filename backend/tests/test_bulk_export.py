@@ -0,0 +1,131 @@
+import csv
+from datetime import datetime
+
+from app.ingestion.bulk_export import export_result
+from app.ingestion.models import IngestionResult
+from app.ingestion.records import AssetRecord, EdgeRecord
+from app.models.domain import AttackTechnique, NodeType
+
+SCAN_TIME = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def _asset(asset_id: str, node_type: NodeType, **kwargs) -> AssetRecord:
+    return AssetRecord(
+        id=asset_id,
+        type=node_type,
+        name=kwargs.pop("name", asset_id.rsplit(":", 1)[-1]),
+        namespace=kwargs.pop("namespace", "shop"),
+        criticality=kwargs.pop("criticality", "MEDIUM"),
+        labels=kwargs.pop("labels", ()),
+        cluster="prod",
+        last_seen=SCAN_TIME,
+        **kwargs,
+    )
+
+
+def _read(path):
+    with path.open(encoding="utf-8", newline="") as handle:
+        return list(csv.reader(handle))
+
+
+def test_export_writes_neo4j_admin_csvs(tmp_path):
+    web, api, token = "prod:pod:shop:web", "prod:pod:shop:api", "prod:secret:shop:token"
+    technique = AttackTechnique.PRIV_DISCOVERY
+    result = IngestionResult(
+        assets=[
+            _asset(
+                web,
+                NodeType.POD,
+                labels=("app=web", "tier=front"),
+                metadata={"k8sUid": "u1", "nodeName": "node-1"},
+            ),
+            _asset(api, NodeType.POD, metadata={"k8sUid": "u2"}),
+            _asset(web, NodeType.POD, metadata={"k8sUid": "dup"}),
+            _asset(
+                token, NodeType.SECRET, criticality="HIGH", metadata={"secretType": "Opaque\nnote"}
+            ),
+        ],
+        relationships=[
+            EdgeRecord(
+                source=web, target=token, technique=technique, evidence="mounted", confidence=0.6
+            ),
+            EdgeRecord(
+                source=web, target=token, technique=technique, evidence="again", confidence=0.1
+            ),
+            EdgeRecord(source=api, target=token, technique=technique, confidence=1),
+            EdgeRecord(source="prod:pod:shop:gone", target=token, technique=technique),
+        ],
+    )
+
+    summary = export_result(result, tmp_path, cluster="prod", generation=3)
+
+    assert (summary.nodes, summary.edges) == (3, 2)
+    assert (summary.duplicate_nodes, summary.dropped_edges) == (1, 1)
+    assert summary.counts_by_type == {"Pod": 2, "Secret": 1}
+    assert summary.multiline
+    assert not (tmp_path / ".spool").exists()
+    assert summary.import_command("graph")[-1] == "graph"
+    assert "--multiline-fields=true" in summary.import_command()
+
+    assert _read(tmp_path / "generations.csv") == [
+        ["cluster:ID(AssetGeneration)", ":LABEL", "current:long", "latest:long"],
+        ["prod", "AssetGeneration", "3", "3"],
+    ]
+
+    pods = _read(tmp_path / "assets-pod.csv")
+    assert pods[0] == [
+        "id:ID(Asset)",
+        ":LABEL",
+        "genKey",
+        "generation:long",
+        "name",
+        "namespace",
+        "type",
+        "criticality",
+        "labels:string[]",
+        "lastSeen",
+        "cluster",
+        "meta_cluster",
+        "meta_k8sUid",
+        "meta_nodeName",
+    ]
+    seen = "2024-05-01T12:00:00"
+    assert pods[1] == [web, "Asset", "prod#3", "3", "web", "shop", "Pod", "MEDIUM"] + [
+        "app=web;tier=front",
+        seen,
+        "prod",
+        "prod",
+        "u1",
+        "node-1",
+    ]
+    assert pods[2] == [api, "Asset", "prod#3", "3", "api", "shop", "Pod", "MEDIUM"] + [
+        "",
+        seen,
+        "prod",
+        "prod",
+        "u2",
+        "",
+    ]
+    assert len(pods) == 3
+
+    secrets = _read(tmp_path / "assets-secret.csv")
+    assert secrets[0][-1] == "meta_secretType"
+    assert secrets[1][-1] == "Opaque\nnote"
+
+    rels = _read(tmp_path / "attack-rels.csv")
+    assert rels[0] == [
+        ":START_ID(Asset)",
+        ":END_ID(Asset)",
+        ":TYPE",
+        "sourceId",
+        "targetId",
+        "technique",
+        "evidence",
+        "confidence:double",
+        "sequence",
+        "discoveredAt",
+    ]
+    assert rels[1:] == [
+        [web, token, "ATTACK_REL", web, token, technique.value, "mounted", "0.6", "", ""],
+        [api, token, "ATTACK_REL", api, token, technique.value, "", "1", "", ""],
+    ]
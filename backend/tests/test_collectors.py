@@ -0,0 +1,183 @@
+import time
+
+import orjson
+import pytest
+
+from app.ingestion import collectors
+from app.ingestion.collectors import KubernetesCollector
+
+CLUSTER = "prod"
+
+NODES = [
+    {"metadata": {"name": "node-1", "uid": "n1"}, "status": {"nodeInfo": {"osImage": "linux"}}},
+    {"metadata": {"name": "node-2", "uid": "n2"}},
+]
+SERVICE_ACCOUNTS = [
+    {"metadata": {"name": "web-sa", "namespace": "shop"}, "secrets": [{"name": "web-token"}]},
+    {"metadata": {"name": "default", "namespace": "jobs"}, "secrets": [{"name": "missing"}]},
+]
+SECRETS = [
+    ("shop", "web-token", "kubernetes.io/service-account-token"),
+    ("shop", "db-pass", "Opaque"),
+]
+PODS = [
+    {
+        "metadata": {"name": "web-1", "namespace": "shop"},
+        "spec": {
+            "nodeName": "node-1",
+            "serviceAccountName": "web-sa",
+            "volumes": [{"name": "logs", "hostPath": {"path": "/var/log"}}],
+            "containers": [{"name": "app", "image": "web:1"}],
+            "initContainers": [{"name": "init", "image": "busybox"}],
+        },
+    },
+    {
+        "metadata": {"name": "web-2", "namespace": "shop"},
+        "spec": {
+            "nodeName": "node-2",
+            "serviceAccountName": "web-sa",
+            "containers": [{"name": "app", "image": "web:1"}],
+        },
+    },
+    {
+        "metadata": {"name": "job-1", "namespace": "jobs"},
+        "spec": {
+            "nodeName": "node-1",
+            "serviceAccountName": "default",
+            "containers": [{"name": "run", "image": "job:2"}],
+        },
+    },
+]
+
+# The listings above in listing order (master, nodes, service accounts,
+# secrets, pods), with the join-phase SA→secret edge last.
+EXPECTED_ASSETS = [
+    "prod:master:global:api-server",
+    "prod:node:global:node-1",
+    "prod:node:global:node-2",
+    "prod:serviceaccount:shop:web-sa",
+    "prod:serviceaccount:jobs:default",
+    "prod:secret:shop:web-token",
+    "prod:secret:shop:web-token:credential",
+    "prod:secret:shop:db-pass",
+    "prod:pod:shop:web-1",
+    "prod:volume:shop:web-1-logs",
+    "prod:container:shop:web-1-app",
+    "prod:container:shop:web-1-init",
+    "prod:pod:shop:web-2",
+    "prod:container:shop:web-2-app",
+    "prod:pod:jobs:job-1",
+    "prod:container:jobs:job-1-run",
+]
+EXPECTED_EDGES = [
+    ("prod:secret:shop:web-token", "prod:secret:shop:web-token:credential"),
+    ("prod:secret:shop:web-token:credential", "prod:master:global:api-server"),
+    ("prod:node:global:node-1", "prod:pod:shop:web-1"),
+    ("prod:pod:shop:web-1", "prod:serviceaccount:shop:web-sa"),
+    ("prod:pod:shop:web-1", "prod:volume:shop:web-1-logs"),
+    ("prod:container:shop:web-1-app", "prod:pod:shop:web-1"),
+    ("prod:container:shop:web-1-init", "prod:pod:shop:web-1"),
+    ("prod:node:global:node-2", "prod:pod:shop:web-2"),
+    ("prod:pod:shop:web-2", "prod:serviceaccount:shop:web-sa"),
+    ("prod:container:shop:web-2-app", "prod:pod:shop:web-2"),
+    ("prod:node:global:node-1", "prod:pod:jobs:job-1"),
+    ("prod:pod:jobs:job-1", "prod:serviceaccount:jobs:default"),
+    ("prod:container:jobs:job-1-run", "prod:pod:jobs:job-1"),
+    ("prod:serviceaccount:shop:web-sa", "prod:secret:shop:web-token"),
+]
+
+
+class FakeResponse:
+    def __init__(self, body: dict):
+        self.data = orjson.dumps(body)
+
+    def release_conn(self):
+        pass
+
+
+def _pager(items: list[dict], delay: float):
+    """A raw list call serving ``items`` one ``limit``-sized page at a time."""
+
+    def list_fn(*, limit, _continue=None, _preload_content=True, **_):
+        time.sleep(delay)
+        start = int(_continue or 0)
+        end = start + limit
+        metadata = {"resourceVersion": "42"}
+        if end < len(items):
+            metadata["continue"] = str(end)
+        return FakeResponse({"metadata": metadata, "items": items[start:end]})
+
+    return list_fn
+
+
+class FakeApiClient:
+    def __init__(self, delay: float):
+        rows = [
+            {
+                "cells": [name, secret_type, 1, "1d"],
+                "object": {"metadata": {"name": name, "namespace": namespace}},
+            }
+            for namespace, name, secret_type in SECRETS
+        ]
+        self._list = _pager(rows, delay)
+
+    def call_api(self, path, method, *, query_params, **_):
+        params = dict(query_params)
+        response = self._list(limit=params["limit"], _continue=params.get("continue"))
+        body = orjson.loads(response.data)
+        body.update(
+            kind="Table",
+            columnDefinitions=[{"name": name} for name in ("Name", "Type", "Data", "Age")],
+            rows=body.pop("items"),
+        )
+        return FakeResponse(body)
+
+
+class FakeCoreV1Api:
+    """Listings that finish in reverse order when run concurrently."""
+
+    def __init__(self):
+        self.list_node = _pager(NODES, 0.04)
+        self.list_service_account_for_all_namespaces = _pager(SERVICE_ACCOUNTS, 0.03)
+        self.api_client = FakeApiClient(0.02)
+        self.list_pod_for_all_namespaces = _pager(PODS, 0.0)
+
+
+@pytest.fixture(autouse=True)
+def fake_cluster(monkeypatch):
+    monkeypatch.setattr(collectors.config, "load_kube_config", lambda **_: None)
+    monkeypatch.setattr(collectors.client, "CoreV1Api", FakeCoreV1Api)
+
+
+def _collect(max_workers: int):
+    collector = KubernetesCollector("kubeconfig", CLUSTER, page_size=1, max_workers=max_workers)
+    return collector.collect()
+
+
+@pytest.mark.parametrize("max_workers", [1, 5])
+def test_collect_keeps_listing_order_whichever_listing_finishes_first(max_workers):
+    """Results come in listing order even when the listings finish in reverse."""
+    result = _collect(max_workers)
+
+    assert [asset.id for asset in result.assets] == EXPECTED_ASSETS
+    assert [(edge.source, edge.target) for edge in result.relationships] == EXPECTED_EDGES
+
+
+def test_collect_result_does_not_depend_on_worker_count():
+    """Five concurrent workers yield the same records, in the same order, as one."""
+    serial, concurrent = _collect(1), _collect(5)
+
+    assert [
+        (asset.id, asset.type, asset.name, asset.namespace, asset.criticality, asset.metadata)
+        for asset in concurrent.assets
+    ] == [
+        (asset.id, asset.type, asset.name, asset.namespace, asset.criticality, asset.metadata)
+        for asset in serial.assets
+    ]
+    assert [
+        (edge.source, edge.target, edge.technique, edge.evidence, edge.confidence)
+        for edge in concurrent.relationships
+    ] == [
+        (edge.source, edge.target, edge.technique, edge.evidence, edge.confidence)
+        for edge in serial.relationships
+    ]
@@ -0,0 +1,184 @@
+import time
+from datetime import datetime
+from threading import Lock
+
+import pytest
+
+from app.ingestion.models import IngestionMode
+from app.ingestion.pipeline import IngestionPipeline
+from app.ingestion.records import AssetRecord, EdgeRecord
+from app.ingestion.writer import AdaptiveBatchSize, edge_partition_key
+from app.models.domain import AttackTechnique, NodeType
+from app.repositories.generation_repository import Generation
+
+
+class WriteFailed(Exception):
+    pass
+
+
+class FailingWriter:
+    def __init__(self):
+        self.node_batches = AdaptiveBatchSize(1, minimum=1)
+        self.edge_batches = AdaptiveBatchSize(1, minimum=1)
+
+    def ensure_schema(self):
+        pass
+
+    def target_generation(self, cluster, mode):
+        return Generation(cluster, 2)
+
+    def write_node_batch(self, batch, generation):
+        raise WriteFailed("constraint violated")
+
+
+class FakeCollector:
+    def __init__(self, pages: int):
+        self.pages = pages
+
+    def stream(self, sink):
+        for page in range(self.pages):
+            sink(
+                [
+                    AssetRecord(
+                        id=f"prod:pod:shop:p{page}",
+                        type=NodeType.POD,
+                        name=f"p{page}",
+                        namespace="shop",
+                        criticality="MEDIUM",
+                        labels=(),
+                        cluster="prod",
+                        last_seen=datetime(2024, 5, 1),
+                    )
+                ],
+                [],
+            )
+
+
+def test_run_reports_the_writer_error():
+    pipeline = IngestionPipeline(FailingWriter(), queue_size=2, workers=1)
+
+    # Enough pages that the collector is still submitting when the writer fails.
+    with pytest.raises(WriteFailed, match="constraint violated"):
+        pipeline.run(FakeCollector(pages=200), cluster="prod", mode=IngestionMode.FULL)
+
+
+class RecordingWriter:
+    """Stands in for Neo4j: edges are written only when both endpoints exist."""
+
+    def __init__(self):
+        self.node_batches = AdaptiveBatchSize(2, minimum=1, maximum=2)
+        self.edge_batches = AdaptiveBatchSize(2, minimum=1, maximum=2)
+        self.nodes: set[str] = set()
+        self.edges: set[tuple[str, str]] = set()
+        self._lock = Lock()
+
+    def ensure_schema(self):
+        pass
+
+    def target_generation(self, cluster, mode):
+        return Generation(cluster, 2)
+
+    def write_node_batch(self, batch, generation):
+        time.sleep(0.002)
+        with self._lock:
+            self.nodes.update(asset.id for asset in batch)
+
+    def write_edge_batch(self, batch, generation):
+        with self._lock:
+            missing = [
+                edge
+                for edge in batch
+                if edge.source not in self.nodes or edge.target not in self.nodes
+            ]
+            self.edges.update((edge.source, edge.target) for edge in batch if edge not in missing)
+        return missing
+
+    def publish_generation(self, generation):
+        return 0, 0
+
+
+class PagedCollector:
+    """Pages of pods with their containers, plus edges to nodes listed last."""
+
+    def __init__(self, pages: int, *, late_nodes: bool = False, dangling: bool = False):
+        self.pages = pages
+        self.late_nodes = late_nodes
+        self.dangling = dangling
+
+    def stream(self, sink):
+        for page in range(self.pages):
+            pod, container = f"prod:pod:shop:p{page}", f"prod:container:shop:p{page}-app"
+            edges = [
+                EdgeRecord(source=container, target=pod, technique=AttackTechnique.BELONGS_TO)
+            ]
+            if self.late_nodes:
+                edges.append(
+                    EdgeRecord(
+                        source=f"prod:node:global:n{page}",
+                        target=pod,
+                        technique=AttackTechnique.ROOT_ACCESS,
+                    )
+                )
+            sink([_pod(pod, NodeType.POD), _pod(container, NodeType.CONTAINER)], edges)
+        if self.late_nodes:
+            nodes = [_pod(f"prod:node:global:n{page}", NodeType.NODE) for page in range(self.pages)]
+            sink(nodes, [])
+        if self.dangling:
+            sink([], [EdgeRecord(source="prod:pod:shop:gone", target=pod, technique="x")])
+
+
+def _pod(asset_id: str, node_type: NodeType) -> AssetRecord:
+    return AssetRecord(
+        id=asset_id,
+        type=node_type,
+        name=asset_id.rsplit(":", 1)[-1],
+        namespace="shop",
+        criticality="MEDIUM",
+        labels=(),
+        cluster="prod",
+        last_seen=datetime(2024, 5, 1),
+    )
+
+
+def test_edges_wait_for_the_node_batches_queued_before_them():
+    writer = RecordingWriter()
+    pipeline = IngestionPipeline(writer, queue_size=8, workers=4)
+
+    stats = pipeline.run(PagedCollector(100), cluster="prod", mode=IngestionMode.FULL)
+
+    assert stats.deferred_edges_peak == 0
+    assert (stats.edges, stats.dropped_edges) == (100, 0)
+    assert len(writer.edges) == 100
+
+
+def test_edges_to_nodes_listed_later_are_retried_in_the_lanes():
+    writer = RecordingWriter()
+    pipeline = IngestionPipeline(writer, queue_size=8, workers=4, deferred_limit=10)
+    collector = PagedCollector(100, late_nodes=True, dangling=True)
+
+    stats = pipeline.run(collector, cluster="prod", mode=IngestionMode.FULL)
+
+    # Only the edges to the late nodes and the dangling one are ever held back.
+    assert 0 < stats.deferred_edges_peak <= 101
+    # Retried every ten new failures rather than on every batch.
+    assert stats.batches < 2_000
+    assert (stats.edges, stats.dropped_edges) == (200, 1)
+    assert len(writer.edges) == 200
+
+
+def test_edge_partition_key_reads_credential_ids():
+    cluster = "arn:aws:eks:prod"
+    secret = f"{cluster}:secret:node:token"
+    # Its namespace is named like a hub resource, but a credential is no hub.
+    credential = f"{secret}:credential"
+    pod = f"{cluster}:pod:node:web"
+
+    def key(source, target):
+        return edge_partition_key(EdgeRecord(source=source, target=target, technique="x"), cluster)
+
+    assert key(credential, pod) == pod
+    assert key(pod, credential) == credential
+    assert key(secret, credential) == secret
+    assert key(credential, f"{cluster}:master:global:api-server") == (
+        f"{cluster}:master:global:api-server"
+    )
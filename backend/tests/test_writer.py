@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from app.ingestion import writer as module
+from app.ingestion.models import IngestionDelta
+from app.ingestion.records import AssetRecord
+from app.ingestion.writer import GraphWriter
+from app.models.domain import NodeType
+from app.repositories.generation_repository import Generation
+
+SA = "prod:serviceaccount:shop:web-sa"
+TOKEN = "prod:secret:shop:web-token"
+OLD_TOKEN = "prod:secret:shop:old-token"
+
+
+class FakeNeo4j:
+    """Just the SA→secret edges of a graph, answered by query name."""
+
+    def __init__(self, edges: set[tuple[str, str]], secrets: dict[str, list[str]]):
+        self.edges = edges
+        # ServiceAccount id -> ids of the secrets it references now.
+        self.secrets = secrets
+
+    def execute(self, query, parameters, *, name=None):
+        if "serviceAccountIds" not in parameters:
+            return []
+        return [
+            {"source": sa_id, "target": secret_id}
+            for sa_id in parameters["serviceAccountIds"]
+            for secret_id in self.secrets.get(sa_id, [])
+        ]
+
+    def write(self, query, parameters, *, name=None):
+        if name == "ingestion.prune_service_account_links":
+            for row in parameters["batch"]:
+                self.edges -= {
+                    (source, target)
+                    for source, target in self.edges
+                    if source == row["source"] and target not in row["targets"]
+                }
+        elif name == "ingestion.write_edges":
+            self.edges |= {(rel["source"], rel["target"]) for rel in parameters["batch"]}
+            return [
+                {"source": rel["source"], "target": rel["target"], "technique": rel["technique"]}
+                for rel in parameters["batch"]
+            ]
+        return []
+
+
+def _service_account(secret_names: list[str]) -> AssetRecord:
+    return AssetRecord(
+        id=SA,
+        type=NodeType.SERVICE_ACCOUNT,
+        name="web-sa",
+        namespace="shop",
+        criticality="MEDIUM",
+        labels=(),
+        cluster="prod",
+        last_seen=datetime(2024, 5, 1),
+        metadata={"secrets": secret_names},
+    )
+
+
+def test_apply_delta_unlinks_secrets_a_service_account_dropped(monkeypatch):
+    fake = FakeNeo4j({(SA, TOKEN), (SA, OLD_TOKEN)}, {SA: [TOKEN]})
+    monkeypatch.setattr(module, "neo4j_client", fake)
+    monkeypatch.setattr(GraphWriter, "ensure_schema", lambda self: None)
+    monkeypatch.setattr(
+        GraphWriter, "target_generation", lambda self, cluster, mode: Generation(cluster, 3)
+    )
+    monkeypatch.setattr(GraphWriter, "_read_snapshot", lambda self, generation: None)
+    monkeypatch.setattr(GraphWriter, "score_risk", lambda self, generation, graph: None)
+    monkeypatch.setattr(module.generation_repository, "current", lambda cluster: 3)
+    monkeypatch.setattr(module.choke_point_repository, "refresh", lambda key, graph: None)
+
+    GraphWriter().apply_delta(
+        delta=IngestionDelta(assets=[_service_account(["web-token"])]), cluster="prod"
+    )
+
+    assert fake.edges == {(SA, TOKEN)}
@@ -0,0 +1,111 @@
+"""Compare the raw-JSON and model-based pod listing paths of KubernetesCollector.
+
+Record a fixture from a real cluster with
+
+    kubectl get pods -A -o json > pods.json
+
+and run ``python scripts/benchmark_collector.py --fixture pods.json``. Without a
+fixture a synthetic PodList is generated.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from kubernetes.client import ApiClient  # noqa: E402
+
+from app.ingestion.collectors import CollectionBuffer, KubernetesCollector  # noqa: E402
+
+
+class FixtureCoreV1:
+    """Serves a recorded PodList the way CoreV1Api would, in a single page."""
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self.api_client = ApiClient()
+
+    def list_pod_for_all_namespaces(self, _preload_content=True, **kwargs):
+        if not _preload_content:
+            return SimpleNamespace(data=self.raw, release_conn=lambda: None)
+        return self.api_client.deserialize(SimpleNamespace(data=self.raw), "V1PodList")
+
+
+def synthetic_pod_list(count: int) -> bytes:
+    pods = []
+    for index in range(count):
+        pods.append(
+            {
+                "metadata": {
+                    "name": f"pod-{index}",
+                    "namespace": f"ns-{index % 50}",
+                    "uid": f"uid-{index}",
+                    "labels": {"app": f"app-{index % 200}", "tier": "backend"},
+                    "annotations": {"checksum/config": "x" * 64},
+                },
+                "spec": {
+                    "nodeName": f"node-{index % 100}",
+                    "serviceAccountName": "default",
+                    "volumes": [
+                        {"name": "host", "hostPath": {"path": "/var/run"}},
+                        {"name": "config", "configMap": {"name": "cfg"}},
+                    ],
+                    "containers": [
+                        {
+                            "name": "app",
+                            "image": "registry.local/app:1.0",
+                            "env": [{"name": f"VAR_{n}", "value": "v"} for n in range(10)],
+                            "resources": {"limits": {"cpu": "1", "memory": "1Gi"}},
+                        },
+                        {"name": "sidecar", "image": "registry.local/proxy:2.0"},
+                    ],
+                },
+                "status": {
+                    "phase": "Running",
+                    "conditions": [{"type": "Ready", "status": "True"}],
+                },
+            }
+        )
+    return json.dumps({"kind": "PodList", "metadata": {}, "items": pods}).encode()
+
+
+def measure(raw: bytes, raw_listing: bool, rounds: int) -> tuple[float, int]:
+    best = float("inf")
+    assets = 0
+    for _ in range(rounds):
+        collector = KubernetesCollector(
+            Path("fixture"), "bench", page_size=0, raw_listing=raw_listing
+        )
+        collector.core_v1 = FixtureCoreV1(raw)
+        buffer = CollectionBuffer()
+        started = time.process_time()
+        collector._collect_pods(buffer)
+        best = min(best, time.process_time() - started)
+        assets = len(buffer.assets)
+    return best, assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", type=Path, help="Recorded PodList JSON")
+    parser.add_argument("--pods", type=int, default=5000, help="Synthetic pod count")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    raw = args.fixture.read_bytes() if args.fixture else synthetic_pod_list(args.pods)
+    model_time, model_assets = measure(raw, raw_listing=False, rounds=args.rounds)
+    raw_time, raw_assets = measure(raw, raw_listing=True, rounds=args.rounds)
+    if model_assets != raw_assets:
+        raise SystemExit(f"Asset count mismatch: {model_assets} vs {raw_assets}")
+
+    print(f"fixture size: {len(raw) / 1024 / 1024:.1f} MiB, assets: {raw_assets}")
+    print(f"model path: {model_time:.3f}s CPU")
+    print(f"raw path:   {raw_time:.3f}s CPU")
+    print(f"speedup:    {model_time / raw_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
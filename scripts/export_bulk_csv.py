@@ -0,0 +1,95 @@
+"""Write neo4j-admin import CSVs for the first load of a large cluster.
+
+Either collect a cluster directly
+
+    python scripts/export_bulk_csv.py --kubeconfig prod.yaml --cluster prod --output out/
+
+or export the batches saved by a failed ingestion job's checkpoint
+
+    python scripts/export_bulk_csv.py --checkpoint backend/storage/checkpoints/<job id> --output out/
+
+then stop Neo4j and run the printed ``neo4j-admin database import full`` command.
+"""
+import argparse
+import shlex
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.ingestion.bulk_export import BulkCsvExport  # noqa: E402
+from app.ingestion.checkpoints import CheckpointStore  # noqa: E402
+
+
+def export_checkpoint(path: Path, output: Path, generation: int) -> BulkCsvExport:
+    checkpoint = CheckpointStore(path.parent).get(path.name)
+    if not checkpoint.collected:
+        print("warning: the checkpoint's collection did not finish; the export is partial")
+    export = BulkCsvExport(
+        output,
+        cluster=checkpoint.meta["cluster"],
+        generation=checkpoint.meta.get("generation") or generation,
+    )
+    for _, kind, items in checkpoint.batches():
+        if kind == "nodes":
+            export.add(items, [])
+        else:
+            export.add([], items)
+    return export
+
+
+def export_cluster(
+    kubeconfig: Path, cluster: str, output: Path, generation: int
+) -> BulkCsvExport:
+    from app.ingestion.collectors import KubernetesCollector
+
+    export = BulkCsvExport(output, cluster=cluster, generation=generation)
+    KubernetesCollector(kubeconfig, cluster_name=cluster, progress=print).stream(export.add)
+    return export
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--checkpoint", type=Path, help="Ingestion checkpoint directory")
+    source.add_argument("--kubeconfig", type=Path, help="Kubeconfig to collect from")
+    parser.add_argument("--cluster", help="Cluster name (required with --kubeconfig)")
+    parser.add_argument("--output", type=Path, required=True, help="Directory for the CSVs")
+    parser.add_argument(
+        "--generation",
+        type=int,
+        default=1,
+        help="Graph generation to import as, unless the checkpoint names one",
+    )
+    parser.add_argument("--database", default="neo4j", help="Target database name")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    args.output.mkdir(parents=True, exist_ok=True)
+    if args.checkpoint:
+        export = export_checkpoint(args.checkpoint, args.output, args.generation)
+    else:
+        if not args.cluster:
+            parser.error("--cluster is required with --kubeconfig")
+        export = export_cluster(args.kubeconfig, args.cluster, args.output, args.generation)
+    summary = export.finish()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Exported {summary.nodes} nodes and {summary.edges} relationships "
+        f"in {elapsed:.1f}s to {summary.directory}"
+    )
+    for node_type, count in sorted(summary.counts_by_type.items()):
+        print(f"  {node_type}: {count}")
+    if summary.duplicate_nodes or summary.dropped_edges:
+        print(
+            f"Skipped {summary.duplicate_nodes} duplicate nodes and "
+            f"{summary.dropped_edges} relationships with missing endpoints"
+        )
+    print("Import with (Neo4j stopped):")
+    print("  " + shlex.join(summary.import_command(args.database)))
+
+
+if __name__ == "__main__":
+    main()
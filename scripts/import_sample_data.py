@@ -1,56 +1,339 @@
+"""Import an attack graph JSON file into Neo4j.
+
+The file is ``{"nodes": [...], "relationships": [...]}`` as in
+``data/sample_attack_graph.json``. It is parsed incrementally and written in
+batched UNWIND transactions using the backend's payload format, so
+multi-million-edge dumps import without loading the file into memory.
+"""
 import argparse
 import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import IO, Iterator
 
 from neo4j import GraphDatabase, basic_auth
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
 
-def normalize_properties(node: dict) -> dict:
-    metadata = node.get("metadata", {})
-    flattened = {f"meta_{key}": value for key, value in metadata.items()}
-    return {
-        "id": node["id"],
-        "name": node.get("name"),
-        "namespace": node.get("namespace"),
-        "criticality": node.get("criticality", "MEDIUM"),
-        "labels": node.get("labels", []),
-        "type": node["type"],
-        "cluster": metadata.get("cluster"),
-        **flattened,
-    }
+from app.ingestion.payloads import edge_to_payload, node_to_payload  # noqa: E402
+from app.ingestion.records import AssetRecord, EdgeRecord  # noqa: E402
+from app.models.domain import NodeType  # noqa: E402
 
+# A data file is imported as generation 0 of one cluster, the generation the
+# backend assigns to data written without one.
+SAMPLE_GENERATION = 0
 
-def load_data(file_path: Path):
-    with file_path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+READ_CHUNK_SIZE = 1 << 20
 
+# The backend creates the same constraint on startup; the importer needs it
+# too, since every batch MERGEs on (genKey, id).
+SCHEMA_STATEMENTS = [
+    "DROP CONSTRAINT asset_id IF EXISTS",
+    "CREATE CONSTRAINT asset_generation_id IF NOT EXISTS "
+    "FOR (n:Asset) REQUIRE (n.genKey, n.id) IS UNIQUE",
+]
 
-def import_data(uri: str, user: str, password: str, payload: dict):
-    driver = GraphDatabase.driver(uri, auth=basic_auth(user, password))
-    with driver.session() as session:
-        for node in payload["nodes"]:
-            labels = ":".join(["Asset", node["type"]])
-            props = normalize_properties(node)
-            session.run(
-                f"""
-                MERGE (n:{labels} {{id: $id}})
-                SET n += $props
-                """,
-                {"props": props, "id": node["id"]},
+NODE_QUERY = """
+UNWIND $batch AS row
+MERGE (n:Asset {{genKey: $genKey, id: row.id}})
+SET n += row.props, n.generation = $generation, n:`{label}`
+"""
+
+EDGE_QUERY = """
+UNWIND $batch AS rel
+MATCH (src:Asset {genKey: $genKey, id: rel.source})
+MATCH (dst:Asset {genKey: $genKey, id: rel.target})
+MERGE (src)-[r:ATTACK_REL {sourceId: rel.source, targetId: rel.target, technique: rel.technique}]->(dst)
+SET r.evidence = rel.evidence,
+    r.confidence = rel.confidence,
+    r.sequence = rel.sequence,
+    r.discoveredAt = rel.discoveredAt
+RETURN count(r) AS written
+"""
+
+
+def iter_sections(handle: IO[str]) -> Iterator[tuple[str, object]]:
+    """Yield ``(key, element)`` for each element of the top-level arrays of a JSON object.
+
+    Only one element is held in memory at a time; non-array values are
+    yielded whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = handle.read(READ_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip(chars: str = "") -> str:
+        """Skip whitespace and ``chars``; return the next character ('' at EOF)."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in chars):
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ""
+
+    def value():
+        nonlocal pos
+        while True:
+            try:
+                result, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A number running into the end of the buffer may continue in the next chunk.
+            if end == len(buffer) and not eof and fill():
+                continue
+            pos = end
+            return result
+
+    if skip() != "{":
+        raise ValueError("Expected a JSON object")
+    pos += 1
+    while True:
+        char = skip(",")
+        if char == "}":
+            return
+        if char != '"':
+            raise ValueError(f"Unexpected {char!r} in JSON object")
+        key = value()
+        if skip() != ":":
+            raise ValueError(f"Expected ':' after {key!r}")
+        pos += 1
+        if skip() != "[":
+            yield key, value()
+            continue
+        pos += 1
+        while True:
+            char = skip(",")
+            if char == "]":
+                pos += 1
+                break
+            if not char:
+                raise ValueError(f"Unterminated array {key!r}")
+            yield key, value()
+
+
+def dataset_cluster(file_path: Path) -> str:
+    """The cluster named by the file's nodes; nodes without one belong to it too.
+
+    A file is imported as one cluster generation, so nodes naming different
+    clusters are rejected before anything is written.
+    """
+    cluster = ""
+    with file_path.open("r", encoding="utf-8") as handle:
+        for key, node in iter_sections(handle):
+            if key != "nodes":
+                break
+            own = node.get("metadata", {}).get("cluster")
+            if not own or own == cluster:
+                continue
+            if cluster:
+                raise ValueError(
+                    f"Node {node['id']!r} belongs to cluster {own!r}, not {cluster!r}; "
+                    "import one cluster per file"
+                )
+            cluster = own
+    return cluster
+
+
+def node_record(node: dict, cluster: str) -> AssetRecord:
+    """``node`` as an asset of ``cluster``, unless the node names its own."""
+    metadata = dict(node.get("metadata", {}))
+    cluster = metadata.pop("cluster", None) or cluster
+    return AssetRecord(
+        id=node["id"],
+        type=NodeType(node["type"]),
+        name=node.get("name"),
+        namespace=node.get("namespace"),
+        criticality=node.get("criticality", "MEDIUM"),
+        labels=tuple(node.get("labels", [])),
+        cluster=cluster,
+        last_seen=None,
+        metadata=metadata,
+    )
+
+
+def edge_record(rel: dict) -> EdgeRecord:
+    return EdgeRecord(
+        source=rel["source"],
+        target=rel["target"],
+        technique=rel["technique"],
+        evidence=rel.get("evidence"),
+        confidence=rel.get("confidence"),
+        sequence=rel.get("sequence"),
+    )
+
+
+class Throughput:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.reported = self.started
+        self.counts = {"nodes": 0, "relationships": 0}
+        self.unmatched = 0
+
+    def add(self, kind: str, rows: int) -> None:
+        self.counts[kind] += rows
+        now = time.perf_counter()
+        if now - self.reported >= self.interval:
+            self.reported = now
+            print(self.line(now), flush=True)
+
+    def line(self, now: float) -> str:
+        elapsed = max(now - self.started, 1e-9)
+        rows = sum(self.counts.values())
+        return (
+            f"[{elapsed:7.1f}s] {self.counts['nodes']} nodes, "
+            f"{self.counts['relationships']} relationships, {rows / elapsed:,.0f} rows/s"
+        )
+
+
+class BatchImporter:
+    """Writes node and relationship batches, optionally several at a time."""
+
+    def __init__(self, driver, *, gen_key: str, workers: int, throughput: Throughput):
+        self.driver = driver
+        self.gen_key = gen_key
+        self.throughput = throughput
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_pending = workers * 2
+        self.pending: set[Future] = set()
+
+    def submit(self, fn, *args) -> None:
+        while len(self.pending) >= self.max_pending:
+            self._collect(wait(self.pending, return_when=FIRST_COMPLETED).done)
+        self.pending.add(self.executor.submit(fn, *args))
+
+    def drain(self) -> None:
+        """Wait for every submitted batch, e.g. before relationships need the nodes."""
+        if self.pending:
+            self._collect(wait(self.pending).done)
+
+    def close(self) -> None:
+        self.drain()
+        self.executor.shutdown()
+
+    def write_nodes(self, label: str, batch: list[dict]) -> tuple[str, int, int]:
+        query = NODE_QUERY.format(label=label)
+        with self.driver.session() as session:
+            session.execute_write(
+                lambda tx: tx.run(
+                    query,
+                    batch=batch,
+                    genKey=self.gen_key,
+                    generation=SAMPLE_GENERATION,
+                ).consume()
+            )
+        return "nodes", len(batch), 0
+
+    def write_relationships(self, batch: list[dict]) -> tuple[str, int, int]:
+        with self.driver.session() as session:
+            written = session.execute_write(
+                lambda tx: tx.run(EDGE_QUERY, batch=batch, genKey=self.gen_key).single()[
+                    "written"
+                ]
             )
-        for rel in payload["relationships"]:
+        return "relationships", written, len(batch) - written
+
+    def _collect(self, done: set[Future]) -> None:
+        for future in done:
+            self.pending.discard(future)
+            kind, rows, unmatched = future.result()
+            self.throughput.unmatched += unmatched
+            self.throughput.add(kind, rows)
+
+
+def import_data(
+    uri: str,
+    user: str,
+    password: str,
+    file_path: Path,
+    *,
+    batch_size: int = 1000,
+    workers: int = 1,
+    progress_interval: float = 5.0,
+) -> Throughput:
+    cluster = dataset_cluster(file_path)
+    gen_key = f"{cluster}#{SAMPLE_GENERATION}"
+    driver = GraphDatabase.driver(uri, auth=basic_auth(user, password))
+    throughput = Throughput(progress_interval)
+    importer = BatchImporter(driver, gen_key=gen_key, workers=workers, throughput=throughput)
+    try:
+        with driver.session() as session:
+            # Generation 0 is never made current over a later one, which the
+            # imported data would then never replace.
+            pointer = session.run(
+                "MATCH (g:AssetGeneration {cluster: $cluster}) RETURN g.latest AS latest",
+                {"cluster": cluster},
+            ).single()
+            if pointer and (pointer["latest"] or 0) > SAMPLE_GENERATION:
+                raise ValueError(
+                    f"Cluster {cluster!r} already has generation {pointer['latest']}; "
+                    "import into an empty database or under another cluster name"
+                )
+            for statement in SCHEMA_STATEMENTS:
+                session.run(statement).consume()
+
+        # Nodes are grouped per type so each batch can set its type label.
+        nodes: dict[str, list[dict]] = {}
+        relationships: list[dict] = []
+        with file_path.open("r", encoding="utf-8") as handle:
+            for key, item in iter_sections(handle):
+                if key == "nodes":
+                    record = node_record(item, cluster)
+                    batch = nodes.setdefault(record.type.value, [])
+                    batch.append(node_to_payload(record))
+                    if len(batch) >= batch_size:
+                        importer.submit(importer.write_nodes, record.type.value, batch)
+                        nodes[record.type.value] = []
+                elif key == "relationships":
+                    if nodes:
+                        for label, batch in nodes.items():
+                            if batch:
+                                importer.submit(importer.write_nodes, label, batch)
+                        nodes = {}
+                        importer.drain()
+                    relationships.append(edge_to_payload(edge_record(item)))
+                    if len(relationships) >= batch_size:
+                        importer.submit(
+                            importer.write_relationships, relationships
+                        )
+                        relationships = []
+        for label, batch in nodes.items():
+            if batch:
+                importer.submit(importer.write_nodes, label, batch)
+        if relationships:
+            importer.drain()
+            importer.submit(importer.write_relationships, relationships)
+        importer.close()
+
+        with driver.session() as session:
             session.run(
                 """
-                MATCH (src:Asset {id: $source}), (dst:Asset {id: $target})
-                MERGE (src)-[r:ATTACK_REL]->(dst)
-                SET r.technique = $technique,
-                    r.evidence = $evidence,
-                    r.confidence = $confidence,
-                    r.sequence = $sequence
+                MERGE (g:AssetGeneration {cluster: $cluster})
+                SET g.current = $generation, g.latest = $generation
                 """,
-                rel,
-            )
-    driver.close()
+                {"cluster": cluster, "generation": SAMPLE_GENERATION},
+            ).consume()
+    finally:
+        importer.executor.shutdown(cancel_futures=True)
+        driver.close()
+    return throughput
 
 
 def main():
@@ -66,10 +349,38 @@ def main():
     parser.add_argument("--uri", default="bolt://localhost:7687")
     parser.add_argument("--user", default="neo4j")
     parser.add_argument("--password", default="neo4jpassword")
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Rows per UNWIND transaction"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Batches written concurrently"
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between throughput lines",
+    )
     args = parser.parse_args()
 
-    payload = load_data(args.file)
-    import_data(args.uri, args.user, args.password, payload)
+    try:
+        throughput = import_data(
+            args.uri,
+            args.user,
+            args.password,
+            args.file,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            progress_interval=args.progress_interval,
+        )
+    except ValueError as exc:
+        raise SystemExit(f"Import failed: {exc}")
+    print(throughput.line(time.perf_counter()))
+    if throughput.unmatched:
+        print(
+            f"Skipped {throughput.unmatched} relationships whose endpoints are not "
+            "among the file's nodes"
+        )
     print("Import completed")
 
 
@@ -0,0 +1,131 @@
+"""Measure API throughput under concurrent slow Cypher queries.
+
+Sends a deliberately slow read query to ``/api/cypher/execute`` from an
+increasing number of concurrent clients while probing ``/api/system/health``.
+With the async Neo4j path, throughput grows with concurrency up to the
+backend's ``NEO4J_MAX_CONNECTION_POOL_SIZE`` and health checks stay fast;
+restart the backend with different pool sizes to compare, e.g.
+
+    NEO4J_MAX_CONNECTION_POOL_SIZE=4 uvicorn app.main:app
+    python scripts/load_test_api.py --concurrency 1,2,4,8,16
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SLOW_QUERY = "UNWIND range(1, $n) AS x WITH x WHERE x % 7 = 0 RETURN count(x) AS matches"
+
+
+def post_json(url: str, payload: dict, api_key: str | None, timeout: float) -> float:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json", **_auth(api_key)},
+        method="POST",
+    )
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def get(url: str, api_key: str | None, timeout: float) -> float:
+    request = urllib.request.Request(url, headers=_auth(api_key))
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def _auth(api_key: str | None) -> dict:
+    return {"X-API-Key": api_key} if api_key else {}
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_level(args, concurrency: int) -> dict:
+    query_url = f"{args.url}/api/cypher/execute"
+    health_url = f"{args.url}/api/system/health"
+    payload = {"query": SLOW_QUERY, "params": {"n": args.rows}}
+    total = max(args.requests_per_client * concurrency, concurrency)
+
+    health_latencies: list[float] = []
+    stop = threading.Event()
+
+    def probe():
+        while not stop.is_set():
+            try:
+                health_latencies.append(get(health_url, args.api_key, args.timeout))
+            except OSError:
+                health_latencies.append(args.timeout)
+            stop.wait(args.probe_interval)
+
+    prober = threading.Thread(target=probe, daemon=True)
+    prober.start()
+    errors = 0
+    latencies: list[float] = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(post_json, query_url, payload, args.api_key, args.timeout)
+            for _ in range(total)
+        ]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except OSError:
+                errors += 1
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) if latencies else float("nan"),
+        "p95": percentile(latencies, 0.95),
+        "health_p95": percentile(health_latencies, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--api-key")
+    parser.add_argument(
+        "--concurrency", default="1,2,4,8,16", help="Comma-separated client counts"
+    )
+    parser.add_argument("--requests-per-client", type=int, default=5)
+    parser.add_argument(
+        "--rows", type=int, default=3_000_000, help="Rows the slow query scans"
+    )
+    parser.add_argument("--probe-interval", type=float, default=0.2)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'clients':>7} {'reqs':>5} {'errors':>6} {'req/s':>7} "
+        f"{'p50 s':>7} {'p95 s':>7} {'health p95 s':>12}"
+    )
+    for concurrency in (int(value) for value in args.concurrency.split(",")):
+        result = run_level(args, concurrency)
+        print(
+            f"{result['concurrency']:>7} {result['requests']:>5} {result['errors']:>6} "
+            f"{result['throughput']:>7.2f} {result['p50']:>7.2f} {result['p95']:>7.2f} "
+            f"{result['health_p95']:>12.3f}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()